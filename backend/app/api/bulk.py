@@ -0,0 +1,118 @@
+"""Request parsing shared by bulk upload and batch endpoints."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Sequence, TypeVar
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+from ..schemas.bulk import BulkItemResult, BulkResult
+
+NDJSON = "application/x-ndjson"
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def is_ndjson(request: Request) -> bool:
+    return request.headers.get("content-type", "").split(";")[0].strip() == NDJSON
+
+
+def too_many_items(limit: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"at most {limit} items per request",
+    )
+
+
+def validation_errors(exc: ValidationError) -> list[dict[str, Any]]:
+    return exc.errors(include_url=False, include_context=False)
+
+
+async def ndjson_lines(request: Request) -> AsyncIterator[tuple[int, bytes]]:
+    """Yield ``(line number, line)`` for each non-blank line as the body arrives."""
+    number = 0
+    tail = b""
+    async for chunk in request.stream():
+        *lines, tail = (tail + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if tail.strip():
+        yield number + 1, tail
+
+
+async def read_items(request: Request, *, max_items: int) -> list[Any]:
+    """Read a JSON array body, or one JSON document per line for NDJSON bodies.
+
+    NDJSON lines are returned undecoded so a malformed line only fails its
+    own item; a malformed JSON array fails the request.
+    """
+    if is_ndjson(request):
+        items: list[Any] = []
+        async for _, line in ndjson_lines(request):
+            if len(items) >= max_items:
+                raise too_many_items(max_items)
+            items.append(line)
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"invalid JSON: {exc}"
+            ) from exc
+        if not isinstance(items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="expected a JSON array of items"
+            )
+        if len(items) > max_items:
+            raise too_many_items(max_items)
+    if not items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="no items")
+    return items
+
+
+def validate_items(
+    raw: Sequence[Any], model: type[M]
+) -> tuple[list[int], list[M], dict[int, BulkItemResult]]:
+    """Validate each item on its own; returns valid positions, their models and the failures."""
+    positions: list[int] = []
+    valid: list[M] = []
+    invalid: dict[int, BulkItemResult] = {}
+    for index, item in enumerate(raw):
+        try:
+            if isinstance(item, bytes):
+                parsed = model.model_validate_json(item)
+            else:
+                parsed = model.model_validate(item)
+        except ValidationError as exc:
+            invalid[index] = BulkItemResult(
+                index=index, status="invalid", errors=validation_errors(exc)
+            )
+            continue
+        positions.append(index)
+        valid.append(parsed)
+    return positions, valid, invalid
+
+
+def bulk_result(
+    positions: Sequence[int],
+    outcomes: Sequence[tuple[str, bool]],
+    invalid: dict[int, BulkItemResult],
+) -> BulkResult:
+    """Merge ``(id, stored)`` outcomes for valid items with the validation failures."""
+    results = dict(invalid)
+    for index, (record_id, stored) in zip(positions, outcomes):
+        results[index] = BulkItemResult(
+            index=index, status="created" if stored else "duplicate", id=record_id
+        )
+    created = sum(stored for _, stored in outcomes)
+    return BulkResult(
+        created=created,
+        duplicates=len(outcomes) - created,
+        invalid=len(invalid),
+        items=[results[index] for index in sorted(results)],
+    )
@@ -0,0 +1,58 @@
+"""Shared query parameters for paginated listing endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import HTTPException, Query, Response, status
+
+from ..repositories import Page, PageQuery, SortKey, decode_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Ranked results page by offset, since their order has no stable sort key.
+NEXT_OFFSET_HEADER = "X-Next-Offset"
+
+SINCE_VERSION = Query(
+    0, ge=0, description="Version returned by the previous sync; 0 fetches everything"
+)
+CHANGES_LIMIT = Query(500, ge=1, le=1000, description="Maximum changes to return")
+
+
+def page_query(
+    limit: int = Query(100, ge=1, le=500, description="Maximum records to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous X-Next-Cursor header"),
+    since: Optional[datetime] = Query(None, description="Inclusive lower time bound"),
+    until: Optional[datetime] = Query(None, description="Exclusive upper time bound"),
+    order: Literal["asc", "desc"] = Query("asc", description="Chronological order"),
+) -> PageQuery:
+    """Parse paging parameters into a repository page query."""
+    return PageQuery(
+        limit=limit,
+        since=since,
+        until=until,
+        after=_decode(cursor),
+        descending=order == "desc",
+    )
+
+
+def snapshot_after(
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page of a full sync"
+    ),
+) -> SortKey | None:
+    """Parse the cursor that continues a paged full sync."""
+    return _decode(cursor)
+
+
+def _decode(cursor: str | None) -> SortKey | None:
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+def expose_cursor(response: Response, page: Page) -> None:
+    """Advertise the next page cursor, if any, in a response header."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, status
+from collections.abc import AsyncIterator
 
-from ...schemas.chat import ChatRequest, ChatResponse
+from fastapi import APIRouter, HTTPException, Path, Response, status
+from fastapi.responses import StreamingResponse
+
+from ...schemas.chat import ChatRequest, ChatResponse, ChatTranscript
 from ...services.conversation import conversation_service
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -22,3 +25,53 @@ async def chat_session(payload: ChatRequest) -> ChatResponse:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="messages cannot be empty")
 
     return await conversation_service.generate_reply(payload)
+
+
+@router.post(
+    "/session/stream",
+    summary="Stream a supportive reply as NDJSON",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def chat_session_stream(payload: ChatRequest) -> StreamingResponse:
+    """Stream reply text as it is generated.
+
+    Each line is a JSON object: ``{"type": "delta", "content": ...}`` frames
+    carry partial reply text and a single ``{"type": "final", ...}`` trailer
+    carries the full reply with safety, emotion and suggestion results.
+    """
+    if not payload.messages:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="messages cannot be empty")
+
+    async def frames() -> AsyncIterator[str]:
+        async for event in conversation_service.stream_reply(payload):
+            yield event.model_dump_json() + "\n"
+
+    return StreamingResponse(
+        frames(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/sessions/{session_id}",
+    response_model=ChatTranscript,
+    summary="Fetch a stored chat transcript",
+)
+async def get_session(session_id: str = Path(..., min_length=1, max_length=128)) -> ChatTranscript:
+    messages = await conversation_service.sessions.load(session_id)
+    if messages is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="session not found")
+    return ChatTranscript(session_id=session_id, messages=messages)
+
+
+@router.delete(
+    "/sessions/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a stored chat transcript",
+)
+async def delete_session(session_id: str = Path(..., min_length=1, max_length=128)) -> Response:
+    if not await conversation_service.sessions.delete(session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="session not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
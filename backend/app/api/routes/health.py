@@ -4,6 +4,10 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
+from ...services.conversation import conversation_service
+from ...services.journal import journal_service
+from ...services.mood import mood_service
+
 router = APIRouter(tags=["health"])
 
 
@@ -11,3 +15,16 @@ router = APIRouter(tags=["health"])
 async def health_check() -> dict[str, str]:
     """Return a simple health status."""
     return {"status": "ok"}
+
+
+@router.get("/metrics", summary="Service metrics")
+async def service_metrics() -> dict[str, object]:
+    """Return in-process counters for caches and pipelines."""
+    return {
+        **conversation_service.metrics(),
+        "single_flight": {
+            "chat": conversation_service.single_flight.stats(),
+            "mood": mood_service.single_flight.stats(),
+            "journal": journal_service.single_flight.stats(),
+        },
+    }
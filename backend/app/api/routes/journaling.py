@@ -2,10 +2,32 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Path, status
+from typing import Union
 
-from ...schemas.journal import JournalEntry, JournalEntryCreate, JournalSummary
-from ...services.journal import journal_service
+from fastapi import APIRouter, Depends, Path, Query, Request, Response, status
+
+from ...core.config import settings
+from ...repositories import PageQuery, SearchQuery, SortKey
+from ...schemas.bulk import BulkResult
+from ...schemas.journal import (
+    JournalChanges,
+    JournalEntry,
+    JournalEntryCreate,
+    JournalEntryImport,
+    JournalEntryPreview,
+    JournalSearchHit,
+    JournalSummary,
+)
+from ...services.journal import DEFAULT_SUMMARY_WEEKS, journal_service
+from ..bulk import NDJSON, bulk_result, read_items, validate_items
+from ..pagination import (
+    CHANGES_LIMIT,
+    NEXT_OFFSET_HEADER,
+    SINCE_VERSION,
+    expose_cursor,
+    page_query,
+    snapshot_after,
+)
 
 router = APIRouter(prefix="/journal", tags=["journal"])
 
@@ -23,13 +45,96 @@ async def create_entry(
     return await journal_service.create_entry(user_id, payload)
 
 
+@router.post(
+    "/{user_id}/entries/bulk",
+    response_model=BulkResult,
+    summary="Upload many journal entries at once",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": JournalEntryImport.model_json_schema()}
+                },
+                NDJSON: {"schema": JournalEntryImport.model_json_schema()},
+            },
+        }
+    },
+)
+async def import_entries(
+    request: Request,
+    user_id: str = Path(..., min_length=1),
+) -> BulkResult:
+    """Store a JSON array (or NDJSON stream) of entries in one write.
+
+    Each item may carry its own ``created_at`` and an ``idempotency_key``;
+    re-sending a key reports the stored entry as ``duplicate``. Invalid
+    items are reported by position and do not block the rest.
+    """
+    raw = await read_items(request, max_items=settings.bulk_max_items)
+    positions, items, invalid = validate_items(raw, JournalEntryImport)
+    outcomes = await journal_service.import_entries(user_id, items) if items else []
+    return bulk_result(positions, [(entry.id, stored) for entry, stored in outcomes], invalid)
+
+
 @router.get(
     "/{user_id}/entries",
-    response_model=list[JournalEntry],
+    response_model=list[Union[JournalEntry, JournalEntryPreview]],
     summary="List journal entries",
 )
-async def list_entries(user_id: str = Path(..., min_length=1)) -> list[JournalEntry]:
-    return await journal_service.list_entries(user_id)
+async def list_entries(
+    response: Response,
+    user_id: str = Path(..., min_length=1),
+    query: PageQuery = Depends(page_query),
+    include_content: bool = Query(True, description="Set to false to omit entry content"),
+) -> list[JournalEntry] | list[JournalEntryPreview]:
+    """List entries a page at a time; the next page cursor is sent as ``X-Next-Cursor``."""
+    page = await journal_service.list_entries(user_id, query, include_content=include_content)
+    expose_cursor(response, page)
+    return page.items
+
+
+@router.get(
+    "/{user_id}/changes",
+    response_model=JournalChanges,
+    summary="Sync journal entries written since a version",
+)
+async def entry_changes(
+    user_id: str = Path(..., min_length=1),
+    since_version: int = SINCE_VERSION,
+    limit: int = CHANGES_LIMIT,
+    after: SortKey | None = Depends(snapshot_after),
+) -> JournalChanges:
+    """Return entries written after ``since_version`` plus removed ids.
+
+    Store the returned ``version`` and send it on the next sync, along with
+    ``cursor`` when one is returned; repeat while ``has_more`` is set. When
+    ``full`` is set, ``entries`` starts the whole journal and replaces the
+    local copy; the pages that follow add the rest.
+    """
+    return await journal_service.changes(user_id, since_version, limit, after=after)
+
+
+@router.get(
+    "/{user_id}/search",
+    response_model=list[JournalSearchHit],
+    summary="Search journal entries",
+)
+async def search_entries(
+    response: Response,
+    user_id: str = Path(..., min_length=1),
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    tag: list[str] = Query([], description="Only entries carrying every given tag"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum results to return"),
+    offset: int = Query(0, ge=0, le=1000, description="Results to skip"),
+) -> list[JournalSearchHit]:
+    """Rank entries by relevance; the next page offset is sent as ``X-Next-Offset``."""
+    hits, next_offset = await journal_service.search(
+        user_id, SearchQuery(text=q, tags=tuple(tag), limit=limit, offset=offset)
+    )
+    if next_offset is not None:
+        response.headers[NEXT_OFFSET_HEADER] = str(next_offset)
+    return hits
 
 
 @router.get(
@@ -37,5 +142,10 @@ async def list_entries(user_id: str = Path(..., min_length=1)) -> list[JournalEn
     response_model=JournalSummary,
     summary="Summarize journal activity",
 )
-async def journal_summary(user_id: str = Path(..., min_length=1)) -> JournalSummary:
-    return await journal_service.summary(user_id)
+async def journal_summary(
+    user_id: str = Path(..., min_length=1),
+    weeks: int = Query(
+        DEFAULT_SUMMARY_WEEKS, ge=1, le=104, description="Weeks of activity to include"
+    ),
+) -> JournalSummary:
+    return await journal_service.summary(user_id, weeks)
@@ -2,10 +2,22 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response, status
 
-from ...schemas.mood import MoodLog, MoodLogCreate, MoodTrendPoint
-from ...services.mood import mood_service
+from ...core.config import settings
+from ...repositories import Granularity, PageQuery, SortKey
+from ...repositories.aggregates import DEFAULT_ZONE, resolve_zone
+from ...schemas.bulk import BulkResult
+from ...schemas.mood import MoodChanges, MoodLog, MoodLogCreate, MoodLogImport, MoodTrendPoint
+from ...services.mood import TrendRange, mood_service
+from ..bulk import NDJSON, bulk_result, read_items, validate_items
+from ..pagination import (
+    CHANGES_LIMIT,
+    SINCE_VERSION,
+    expose_cursor,
+    page_query,
+    snapshot_after,
+)
 
 router = APIRouter(prefix="/mood", tags=["mood"])
 
@@ -23,13 +35,67 @@ async def log_mood(
     return await mood_service.log_mood(user_id, payload)
 
 
+@router.post(
+    "/{user_id}/logs/bulk",
+    response_model=BulkResult,
+    summary="Upload many mood logs at once",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": MoodLogImport.model_json_schema()}
+                },
+                NDJSON: {"schema": MoodLogImport.model_json_schema()},
+            },
+        }
+    },
+)
+async def import_logs(
+    request: Request,
+    user_id: str = Path(..., min_length=1),
+) -> BulkResult:
+    """Store a JSON array (or NDJSON stream) of logs in one write.
+
+    Items may carry ``recorded_at`` and an ``idempotency_key``, as for journal
+    bulk uploads; trends include the new logs as soon as this returns.
+    """
+    raw = await read_items(request, max_items=settings.bulk_max_items)
+    positions, items, invalid = validate_items(raw, MoodLogImport)
+    outcomes = await mood_service.import_logs(user_id, items) if items else []
+    return bulk_result(positions, [(log.id, stored) for log, stored in outcomes], invalid)
+
+
 @router.get(
     "/{user_id}/logs",
     response_model=list[MoodLog],
     summary="Retrieve mood logs",
 )
-async def list_logs(user_id: str = Path(..., min_length=1)) -> list[MoodLog]:
-    return await mood_service.get_logs(user_id)
+async def list_logs(
+    response: Response,
+    user_id: str = Path(..., min_length=1),
+    query: PageQuery = Depends(page_query),
+    include_notes: bool = Query(True, description="Set to false to omit notes"),
+) -> list[MoodLog]:
+    """List logs a page at a time; the next page cursor is sent as ``X-Next-Cursor``."""
+    page = await mood_service.get_logs(user_id, query, include_notes=include_notes)
+    expose_cursor(response, page)
+    return page.items
+
+
+@router.get(
+    "/{user_id}/changes",
+    response_model=MoodChanges,
+    summary="Sync mood logs written since a version",
+)
+async def log_changes(
+    user_id: str = Path(..., min_length=1),
+    since_version: int = SINCE_VERSION,
+    limit: int = CHANGES_LIMIT,
+    after: SortKey | None = Depends(snapshot_after),
+) -> MoodChanges:
+    """Return logs written after ``since_version``, as for journal entry changes."""
+    return await mood_service.changes(user_id, since_version, limit, after=after)
 
 
 @router.get(
@@ -37,5 +103,18 @@ async def list_logs(user_id: str = Path(..., min_length=1)) -> list[MoodLog]:
     response_model=list[MoodTrendPoint],
     summary="Get mood trend data",
 )
-async def mood_trend(user_id: str = Path(..., min_length=1)) -> list[MoodTrendPoint]:
-    return await mood_service.trend(user_id)
+async def mood_trend(
+    user_id: str = Path(..., min_length=1),
+    granularity: Granularity = Query("day", description="Bucket size: day, week or month"),
+    trend_range: TrendRange = Query(
+        "all", alias="range", description="How far back to chart: week, month, quarter, year or all"
+    ),
+    timezone: str = Query(
+        DEFAULT_ZONE, max_length=64, description="IANA timezone whose calendar days to bucket by"
+    ),
+) -> list[MoodTrendPoint]:
+    try:
+        resolve_zone(timezone)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return await mood_service.trend(user_id, granularity, trend_range, timezone)
@@ -2,10 +2,23 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, status
+from collections.abc import AsyncIterator
 
-from ...schemas.safety import SafetyCheckRequest, SafetyCheckResult
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ...core.config import settings
+from ...schemas.safety import (
+    SafetyBatchItem,
+    SafetyBatchRequest,
+    SafetyBatchResult,
+    SafetyCheckRequest,
+    SafetyCheckResult,
+)
 from ...services.safety import safety_service
+from ...services.screening import safety_screener
+from ..bulk import NDJSON, is_ndjson, ndjson_lines, too_many_items, validation_errors
 
 router = APIRouter(prefix="/safety", tags=["safety"])
 
@@ -18,3 +31,82 @@ router = APIRouter(prefix="/safety", tags=["safety"])
 )
 async def safety_check(payload: SafetyCheckRequest) -> SafetyCheckResult:
     return safety_service.evaluate_text(payload.text, locale=payload.locale)
+
+
+def _invalid(exc: ValidationError, **location: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail={**location, "errors": validation_errors(exc)},
+    )
+
+
+async def _read_ndjson(request: Request) -> list[SafetyBatchItem]:
+    """Parse one item per line as the body arrives, without buffering it whole."""
+    items: list[SafetyBatchItem] = []
+    async for number, line in ndjson_lines(request):
+        if len(items) >= settings.safety_batch_max_items:
+            raise too_many_items(settings.safety_batch_max_items)
+        try:
+            items.append(SafetyBatchItem.model_validate_json(line))
+        except ValidationError as exc:
+            raise _invalid(exc, line=number) from exc
+    return items
+
+
+@router.post(
+    "/check/batch",
+    summary="Screen many texts, streaming results as NDJSON",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": SafetyBatchRequest.model_json_schema()},
+                NDJSON: {"schema": SafetyBatchItem.model_json_schema()},
+            },
+        }
+    },
+)
+async def safety_check_batch(
+    request: Request,
+    locale: str = Query("en-US", description="Default locale for NDJSON request bodies"),
+) -> StreamingResponse:
+    """Screen a batch of texts for crisis language.
+
+    Send either ``{"items": [...], "locale": ...}`` as JSON or one item per
+    line with ``Content-Type: application/x-ndjson``. Each response line is
+    a safety result carrying the item's ``index`` and ``id``, in input order.
+    """
+    if is_ndjson(request):
+        items = await _read_ndjson(request)
+        if not items:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="no items")
+    else:
+        try:
+            payload = SafetyBatchRequest.model_validate_json(await request.body())
+        except ValidationError as exc:
+            raise _invalid(exc) from exc
+        if len(payload.items) > settings.safety_batch_max_items:
+            raise too_many_items(settings.safety_batch_max_items)
+        items, locale = payload.items, payload.locale
+
+    async def results() -> AsyncIterator[str]:
+        index = 0
+        async for matches in safety_screener.screen([item.text for item in items]):
+            lines = []
+            for categories in matches:
+                item = items[index]
+                result = safety_service.build_result(categories, locale=item.locale or locale)
+                lines.append(
+                    SafetyBatchResult(**result.model_dump(), index=index, id=item.id)
+                    .model_dump_json()
+                )
+                index += 1
+            yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(
+        results(),
+        media_type=NDJSON,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
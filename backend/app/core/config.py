@@ -19,12 +19,69 @@ class Settings(BaseSettings):
 
     gemini_api_key: str | None = None
     openai_api_key: str | None = None
+    llm_provider: str = "gemini"
+    llm_model: str | None = None
+    llm_max_output_tokens: int = 1024
+    llm_temperature: float = 0.7
+    llm_max_concurrency: int = 256
+    llm_context_token_budget: int = 6000
+    llm_summary_token_budget: int = 400
+    llm_timeout_seconds: float = 30.0
+    llm_timeout_min_seconds: float = 2.0
+    llm_timeout_latency_factor: float = 3.0
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    llm_hedge_enabled: bool = False
+    llm_hedge_quantile: float = 0.95
+    openai_base_url: str = "https://api.openai.com/v1"
+    fake_llm_latency_ms: float = 0.0
+    fake_llm_tokens_per_second: float = 0.0
+
+    reply_cache_enabled: bool = False
+    reply_cache_ttl_seconds: float = 600.0
+    reply_cache_max_entries: int = 2048
+    reply_cache_max_bytes: int = 8 * 1024 * 1024
+
+    session_store: str = "memory"
+    session_store_path: str = "lyra_sessions.db"
+    session_max_sessions: int = 10_000
+    session_max_messages: int = 400
+    session_state_max_sessions: int = 10_000
+
+    emotion_lexicon_path: str | None = None
+
+    safety_cache_max_entries: int = 4096
+    safety_hotlines_path: str | None = None
+    safety_batch_max_items: int = 10_000
+    safety_batch_workers: int = 2
+    safety_batch_parallel_threshold: int = 2_000
+
+    memory_enabled: bool = False
+    memory_backend: str = "local"
+    memory_index_path: str | None = None
+    memory_top_k: int = 3
+    memory_min_score: float = 0.15
+    memory_token_budget: int = 300
+    memory_max_users: int = 1024
+    memory_flush_seconds: float = 30.0
+    embedding_provider: str = "hashing"
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: int = 256
+
     pinecone_api_key: str | None = None
     pinecone_environment: str | None = None
     pinecone_index: str | None = None
+    pinecone_index_host: str | None = None
+
+    bulk_max_items: int = 1_000
+
+    single_flight_enabled: bool = True
 
+    storage_backend: str = "memory"
+    sqlite_path: str = "lyra.db"
     mongodb_uri: str = "mongodb://localhost:27017"
     mongodb_database: str = "lyra"
+    mongodb_max_pool_size: int = 100
 
     allow_origins: List[str] = ["*"]
 
@@ -4,6 +4,10 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 
+from ..services.conversation import conversation_service
+from ..services.journal import journal_service
+from ..services.mood import mood_service
+from ..services.screening import safety_screener
 from .config import settings
 from .logging import configure_logging
 
@@ -12,7 +16,10 @@ async def on_startup() -> None:
     """Execute actions when the application starts."""
     configure_logging()
 
-    # Placeholder for future integrations (e.g., database connection checks)
+    # Create tables/indexes for the configured storage backend.
+    await journal_service.initialize()
+    await mood_service.initialize()
+
     if settings.environment != "test":
         # In production we might warm up models or verify external services here.
         pass
@@ -20,8 +27,11 @@ async def on_startup() -> None:
 
 async def on_shutdown() -> None:
     """Execute actions when the application shuts down."""
-    # Close database connections, flush telemetry buffers, etc.
-    pass
+    # Close pooled provider connections, flush telemetry buffers, etc.
+    await conversation_service.aclose()
+    await journal_service.close()
+    await mood_service.close()
+    safety_screener.close()
 
 
 def register_events(app: FastAPI) -> None:
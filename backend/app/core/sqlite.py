@@ -0,0 +1,62 @@
+"""Async access to embedded SQLite databases."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SQLiteDatabase:
+    """Run SQLite work on one dedicated thread owned by the database.
+
+    SQLite serialises writers anyway, so a single connection on a private
+    executor avoids both per-call connection setup and borrowing threads from
+    the event loop's default pool.
+    """
+
+    def __init__(self, path: str, *, schema: str = "") -> None:
+        self.path = path
+        self._schema = schema
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._connection: sqlite3.Connection | None = None
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if self._schema:
+                connection.executescript(self._schema)
+            self._connection = connection
+        return self._connection
+
+    def _run_sync(self, work: Callable[[sqlite3.Connection], T]) -> T:
+        connection = self._connect()
+        with connection:
+            return work(connection)
+
+    async def run(self, work: Callable[[sqlite3.Connection], T]) -> T:
+        """Execute ``work(connection)`` in a transaction on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_sync, work)
+
+    async def close(self) -> None:
+        """Close the connection; safe to call from every repository sharing it."""
+        if self._closed:
+            return
+        self._closed = True
+
+        def _close() -> None:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, _close)
+        self._executor.shutdown(wait=False)
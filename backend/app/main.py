@@ -5,6 +5,7 @@ from __future__ import annotations
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .api.pagination import NEXT_CURSOR_HEADER
 from .api.routes import chat, health, journaling, mood, safety
 from .core.config import settings
 from .core.events import register_events
@@ -28,6 +29,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     # Add logging middleware
@@ -0,0 +1,98 @@
+"""Storage backends for journal entries and mood logs."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+
+from ..core.config import Settings
+from ..core.sqlite import SQLiteDatabase
+from .aggregates import Granularity, JournalStats, MoodBucket
+from .base import (
+    ChangeSet,
+    JournalRepository,
+    MoodRepository,
+    Page,
+    PageQuery,
+    Repository,
+    SortKey,
+    decode_cursor,
+    derive_id,
+    encode_cursor,
+    entry_key,
+    log_key,
+)
+from .memory import InMemoryJournalRepository, InMemoryMoodRepository
+from .search import SearchHit, SearchQuery
+
+__all__ = [
+    "ChangeSet",
+    "Granularity",
+    "JournalRepository",
+    "JournalStats",
+    "MoodBucket",
+    "MoodRepository",
+    "Page",
+    "PageQuery",
+    "Repository",
+    "SearchHit",
+    "SearchQuery",
+    "SortKey",
+    "build_journal_repository",
+    "build_mood_repository",
+    "decode_cursor",
+    "derive_id",
+    "encode_cursor",
+    "entry_key",
+    "log_key",
+]
+
+
+@lru_cache
+def _sqlite_database(path: str) -> SQLiteDatabase:
+    from .sqlite import SCHEMA
+
+    return SQLiteDatabase(path, schema=SCHEMA)
+
+
+@lru_cache
+def _mongo_database(uri: str, database: str, max_pool_size: int) -> Any:
+    from .mongo import connect
+
+    return connect(uri, database, max_pool_size=max_pool_size)
+
+
+def build_journal_repository(config: Settings) -> JournalRepository:
+    """Instantiate the journal backend selected by ``STORAGE_BACKEND``."""
+    backend = config.storage_backend.lower()
+    if backend == "sqlite":
+        from .sqlite import SQLiteJournalRepository
+
+        return SQLiteJournalRepository(_sqlite_database(config.sqlite_path))
+    if backend == "mongo":
+        from .mongo import MongoJournalRepository
+
+        return MongoJournalRepository(
+            _mongo_database(
+                config.mongodb_uri, config.mongodb_database, config.mongodb_max_pool_size
+            )
+        )
+    return InMemoryJournalRepository()
+
+
+def build_mood_repository(config: Settings) -> MoodRepository:
+    """Instantiate the mood backend selected by ``STORAGE_BACKEND``."""
+    backend = config.storage_backend.lower()
+    if backend == "sqlite":
+        from .sqlite import SQLiteMoodRepository
+
+        return SQLiteMoodRepository(_sqlite_database(config.sqlite_path))
+    if backend == "mongo":
+        from .mongo import MongoMoodRepository
+
+        return MongoMoodRepository(
+            _mongo_database(
+                config.mongodb_uri, config.mongodb_database, config.mongodb_max_pool_size
+            )
+        )
+    return InMemoryMoodRepository()
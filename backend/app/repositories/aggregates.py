@@ -0,0 +1,320 @@
+"""Running mood and journal aggregates maintained on write."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Generic, Iterable, Literal, Sequence, TypeVar
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+Granularity = Literal["day", "week", "month"]
+GRANULARITIES: tuple[Granularity, ...] = ("day", "week", "month")
+
+# Mood logs are summed on write into UTC day, week and month buckets, which
+# serve UTC trends directly, and into UTC slots of this many minutes. Every
+# zone offset in use is a whole multiple of 15 minutes, so a slot never
+# straddles a local midnight. Another zone's bucket is the UTC interval
+# between two local midnights: the whole UTC days inside it come from the day
+# buckets and only the partial days at either end are summed from slots.
+DEFAULT_ZONE = "UTC"
+SLOT_MINUTES = 15
+
+
+@lru_cache(maxsize=512)
+def resolve_zone(name: str) -> ZoneInfo:
+    """Return the IANA zone called ``name``; raises ``ValueError`` if unknown."""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"unknown timezone: {name}") from exc
+
+
+def local_day(recorded_at: datetime, zone: str) -> date:
+    """Calendar day of ``recorded_at`` (naive means UTC) as seen in ``zone``."""
+    if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+    return recorded_at.astimezone(resolve_zone(zone)).date()
+
+
+def slot_start(recorded_at: datetime) -> datetime:
+    """Start of the UTC slot containing ``recorded_at`` (naive means UTC)."""
+    if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+    recorded_at = recorded_at.astimezone(timezone.utc)
+    return recorded_at.replace(
+        minute=recorded_at.minute - recorded_at.minute % SLOT_MINUTES, second=0, microsecond=0
+    )
+
+
+def first_utc_day(day: date) -> date:
+    """Earliest UTC day that can overlap local ``day`` in any zone (offsets stay within a day)."""
+    return day - timedelta(days=1)
+
+
+def bucket_start(day: date, granularity: Granularity) -> date:
+    """Return the first day of the bucket containing ``day``.
+
+    Weeks start on Monday (ISO weeks); months on the first of the month.
+    """
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket_start(start: date, granularity: Granularity) -> date:
+    """Return the first day of the bucket after the one starting on ``start``."""
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def zone_midnight(day: date, zone: str) -> datetime:
+    """UTC instant at which ``day`` begins in ``zone``."""
+    return datetime.combine(day, time(), tzinfo=resolve_zone(zone)).astimezone(timezone.utc)
+
+
+@dataclass(slots=True)
+class MoodBucket:
+    """Sum, count and dominant mood for one day, week or month."""
+
+    start: date
+    total: int = 0
+    count: int = 0
+    dominant_mood: str | None = None
+    dominant_intensity: int = 0
+
+    def add(self, mood: str, intensity: int) -> None:
+        self.total += intensity
+        self.count += 1
+        # Strictly greater keeps the earliest log on ties, like max() over
+        # the raw logs in insertion order did.
+        if intensity > self.dominant_intensity:
+            self.dominant_intensity = intensity
+            self.dominant_mood = mood
+
+    def merge(self, other: "MoodBucket") -> None:
+        """Fold in a bucket covering later logs."""
+        self.total += other.total
+        self.count += other.count
+        if other.dominant_intensity > self.dominant_intensity:
+            self.dominant_intensity = other.dominant_intensity
+            self.dominant_mood = other.dominant_mood
+
+    @property
+    def average_intensity(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+@dataclass(slots=True)
+class MoodSlot(MoodBucket):
+    """Sum, count and dominant mood for one UTC slot starting at ``start``."""
+
+    start: datetime
+
+
+BucketT = TypeVar("BucketT", bound=MoodBucket)
+
+
+class BucketSeries(Generic[BucketT]):
+    """Buckets or slots, indexed by start for range queries."""
+
+    __slots__ = ("_buckets", "_kind", "_starts")
+
+    def __init__(self, kind: type[BucketT]) -> None:
+        self._kind = kind
+        self._buckets: dict[date, BucketT] = {}
+        self._starts: list[date] = []
+
+    def add(self, start: date, mood: str, intensity: int) -> None:
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = self._kind(start=start)
+            if not self._starts or start > self._starts[-1]:
+                self._starts.append(start)
+            else:
+                insort(self._starts, start)
+        bucket.add(mood, intensity)
+
+    def range(self, since: date | None = None) -> list[BucketT]:
+        low = bisect_left(self._starts, since) if since is not None else 0
+        return [self._buckets[start] for start in self._starts[low:]]
+
+    def between(self, low: date, high: date) -> list[BucketT]:
+        """Buckets starting in ``[low, high)``."""
+        starts = self._starts
+        return [
+            self._buckets[start]
+            for start in starts[bisect_left(starts, low) : bisect_left(starts, high)]
+        ]
+
+
+def new_series() -> dict[Granularity, BucketSeries[MoodBucket]]:
+    return {granularity: BucketSeries(MoodBucket) for granularity in GRANULARITIES}
+
+
+def utc_bucket_starts(recorded_at: datetime) -> list[tuple[Granularity, date]]:
+    """The UTC day, week and month buckets a log recorded at ``recorded_at`` falls in."""
+    day = local_day(recorded_at, DEFAULT_ZONE)
+    return [(granularity, bucket_start(day, granularity)) for granularity in GRANULARITIES]
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time(), tzinfo=timezone.utc)
+
+
+Span = tuple[datetime, datetime]
+
+
+@dataclass(frozen=True, slots=True)
+class _ZoneWindow:
+    """One local bucket as UTC slots in ``head``, whole UTC days, then slots in ``tail``.
+
+    Days run over ``[first_day, end_day)``; spans are ``[low, high)`` instants
+    and are empty when the bucket edge falls on a UTC midnight.
+    """
+
+    start: date
+    head: Span
+    first_day: date
+    end_day: date
+    tail: Span
+
+
+def _zone_window(start: date, granularity: Granularity, zone: str) -> _ZoneWindow:
+    low = zone_midnight(start, zone)
+    high = zone_midnight(next_bucket_start(start, granularity), zone)
+    first_day = low.date() if low == _utc_midnight(low.date()) else low.date() + timedelta(days=1)
+    end_day = high.date()
+    if first_day > end_day:
+        # Starts and ends inside one UTC day.
+        return _ZoneWindow(start, (low, high), end_day, end_day, (high, high))
+    return _ZoneWindow(
+        start, (low, _utc_midnight(first_day)), first_day, end_day, (_utc_midnight(end_day), high)
+    )
+
+
+class ZoneFold:
+    """Sum UTC day buckets and slots into another zone's buckets.
+
+    Built from the UTC day buckets on or after ``first_utc_day(since)``; the
+    caller fetches the slots in ``slot_spans`` and passes them to ``fold``.
+    The work is a few zone conversions per local bucket with logs, plus the
+    slots of the partial UTC days at each bucket edge; whole UTC days inside
+    a bucket never touch their slots.
+    """
+
+    __slots__ = ("_day_starts", "_days", "_windows")
+
+    def __init__(
+        self,
+        days: Sequence[MoodBucket],
+        granularity: Granularity,
+        zone: str,
+        *,
+        since: date | None = None,
+    ) -> None:
+        tz = resolve_zone(zone)
+        day_starts = [day.start for day in days]
+        windows: list[_ZoneWindow] = []
+        edge = zone_midnight(since, zone) if since is not None else None
+        index = 0
+        while index < len(days):
+            # Open the local bucket holding the first instant not yet covered,
+            # then skip every UTC day it spans.
+            instant = _utc_midnight(day_starts[index])
+            if edge is not None and instant < edge:
+                instant = edge
+            window = _zone_window(
+                bucket_start(instant.astimezone(tz).date(), granularity), granularity, zone
+            )
+            if since is None or window.start >= since:
+                windows.append(window)
+            edge = window.tail[1]
+            index = bisect_left(day_starts, edge.date(), index)
+        self._days = days
+        self._day_starts = day_starts
+        self._windows = windows
+
+    @property
+    def slot_spans(self) -> list[Span]:
+        """UTC ``[low, high)`` spans whose slots ``fold`` needs, oldest first."""
+        spans: list[Span] = []
+        for window in self._windows:
+            for low, high in (window.head, window.tail):
+                if low >= high:
+                    continue
+                if spans and spans[-1][1] >= low:
+                    spans[-1] = (spans[-1][0], max(spans[-1][1], high))
+                else:
+                    spans.append((low, high))
+        return spans
+
+    def fold(self, slots: Sequence[MoodSlot]) -> list[MoodBucket]:
+        """Return the non-empty local buckets, oldest first, given the slots, oldest first."""
+        day_starts = self._day_starts
+        slot_starts = [slot.start for slot in slots]
+
+        def merge_slots(bucket: MoodBucket, low: datetime, high: datetime) -> None:
+            for index in range(bisect_left(slot_starts, low), bisect_left(slot_starts, high)):
+                bucket.merge(slots[index])
+
+        buckets = []
+        for window in self._windows:
+            # Oldest first, so ties keep the earliest dominant mood.
+            bucket = MoodBucket(start=window.start)
+            merge_slots(bucket, *window.head)
+            low = bisect_left(day_starts, window.first_day)
+            for index in range(low, bisect_left(day_starts, window.end_day)):
+                bucket.merge(self._days[index])
+            merge_slots(bucket, *window.tail)
+            if bucket.count:
+                buckets.append(bucket)
+        return buckets
+
+
+@dataclass(slots=True)
+class JournalStats:
+    """Counters behind the journal summary.
+
+    ``weekly_counts`` maps ISO week starts (Monday, UTC) to entry counts;
+    repositories only return the weeks a caller asked for.
+    """
+
+    total_entries: int = 0
+    mood_counts: dict[str, int] = field(default_factory=dict)
+    tag_counts: dict[str, int] = field(default_factory=dict)
+    weekly_counts: dict[date, int] = field(default_factory=dict)
+    first_entry_at: datetime | None = None
+    last_entry_at: datetime | None = None
+
+    def add(self, created_at: datetime, mood: str | None, tags: Iterable[str]) -> None:
+        self.total_entries += 1
+        if mood:
+            self.mood_counts[mood] = self.mood_counts.get(mood, 0) + 1
+        # A tag repeated on one entry still counts that entry once.
+        for tag in dict.fromkeys(tags):
+            self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+        week = bucket_start(local_day(created_at, DEFAULT_ZONE), "week")
+        self.weekly_counts[week] = self.weekly_counts.get(week, 0) + 1
+        if self.first_entry_at is None or created_at < self.first_entry_at:
+            self.first_entry_at = created_at
+        if self.last_entry_at is None or created_at > self.last_entry_at:
+            self.last_entry_at = created_at
+
+    def select_weeks(self, weeks: Iterable[date]) -> "JournalStats":
+        """Copy of the counters holding only the given weeks."""
+        counts = self.weekly_counts
+        return JournalStats(
+            total_entries=self.total_entries,
+            mood_counts=dict(self.mood_counts),
+            tag_counts=dict(self.tag_counts),
+            weekly_counts={week: counts[week] for week in weeks if week in counts},
+            first_entry_at=self.first_entry_at,
+            last_entry_at=self.last_entry_at,
+        )
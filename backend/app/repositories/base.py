@@ -0,0 +1,275 @@
+"""Repository interfaces for journal entries and mood logs."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Callable, Generic, Iterable, Sequence, TypeVar
+
+from ..schemas.journal import JournalEntry, JournalEntryPreview
+from ..schemas.mood import MoodLog
+from .aggregates import DEFAULT_ZONE, Granularity, JournalStats, MoodBucket
+from .search import SearchHit, SearchQuery
+
+T = TypeVar("T")
+
+# Records are ordered by (timestamp, id); the id breaks ties between records
+# written in the same microsecond.
+SortKey = tuple[datetime, str]
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC and normalise aware ones to UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def derive_id(user_id: str, kind: str, key: str) -> str:
+    """Stable record id for a client idempotency key, so a retried upload maps to it again."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"lyra:{kind}:{user_id}:{key}"))
+
+
+def encode_cursor(key: SortKey) -> str:
+    timestamp, record_id = key
+    raw = f"{as_utc(timestamp).isoformat()}|{record_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    """Decode an opaque page cursor; raises ``ValueError`` when malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        timestamp, record_id = raw.split("|", 1)
+        return as_utc(datetime.fromisoformat(timestamp)), record_id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+@dataclass(slots=True, frozen=True)
+class PageQuery:
+    """Time-ranged keyset page request.
+
+    ``since`` is inclusive and ``until`` exclusive. ``after`` is the sort key
+    of the last record on the previous page; with ``descending`` the page
+    continues towards older records instead.
+    """
+
+    limit: int = 100
+    since: datetime | None = None
+    until: datetime | None = None
+    after: SortKey | None = None
+    descending: bool = False
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    """One page of records plus the cursor for the next page, if any."""
+
+    items: list[T]
+    next_cursor: str | None = None
+
+    @classmethod
+    def from_overfetch(cls, items: list[T], limit: int, key: Callable[[T], SortKey]) -> "Page[T]":
+        """Build a page from ``limit + 1`` fetched records.
+
+        The extra record only signals that another page exists.
+        """
+        if len(items) <= limit:
+            return cls(items=items)
+        items = items[:limit]
+        return cls(items=items, next_cursor=encode_cursor(key(items[-1])))
+
+
+@dataclass(slots=True)
+class ChangeSet(Generic[T]):
+    """Records written after a client's last sync version.
+
+    ``version`` is the last change covered, to be sent back as the next
+    ``since_version``. A ``full`` change set starts a snapshot of every record
+    instead, returned when the client has no usable version (first sync, or a
+    version this store never issued) and its local copy should be replaced.
+
+    Snapshots are paged in sort-key order like deltas are paged in version
+    order: while ``has_more`` is set, ``cursor`` goes back with ``version`` as
+    ``since_version`` and the next page continues the snapshot. Records
+    written meanwhile arrive in the deltas after ``version``.
+    """
+
+    version: int
+    records: list[T] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    full: bool = False
+    has_more: bool = False
+    cursor: str | None = None
+
+
+def entry_key(entry: JournalEntry | JournalEntryPreview) -> SortKey:
+    return entry.created_at, entry.id
+
+
+def log_key(log: MoodLog) -> SortKey:
+    return log.recorded_at, log.id
+
+
+def snapshot_page(
+    records: list[T], version: int, limit: int, key: Callable[[T], SortKey], *, first: bool
+) -> ChangeSet[T]:
+    """One snapshot page from ``limit + 1`` records listed after the client's cursor.
+
+    Only the ``first`` page is ``full``; later pages add to it like deltas.
+    """
+    page = Page.from_overfetch(records, limit, key)
+    return ChangeSet(
+        version=version,
+        records=page.items,
+        full=first,
+        has_more=page.next_cursor is not None,
+        cursor=page.next_cursor,
+    )
+
+
+def split_changes(changes: Iterable[tuple[str, bool]]) -> tuple[list[str], list[str]]:
+    """Split ``(record id, deleted)`` changes, in version order, into upserted and deleted ids.
+
+    Only the latest change to each id counts.
+    """
+    latest: dict[str, bool] = {}
+    for record_id, deleted in changes:
+        latest.pop(record_id, None)
+        latest[record_id] = deleted
+    upserted = [record_id for record_id, deleted in latest.items() if not deleted]
+    removed = [record_id for record_id, deleted in latest.items() if deleted]
+    return upserted, removed
+
+
+class Repository(ABC):
+    """Lifecycle hooks shared by every storage backend."""
+
+    async def initialize(self) -> None:
+        """Prepare the backend (create tables, indexes) before serving requests."""
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all stored records (tests and local development)."""
+
+
+class JournalRepository(Repository):
+    """Storage for journal entries, ordered by ``created_at`` per user.
+
+    Backends keep the summary counters and the full-text index up to date in
+    the same write as the entries, so reading them never touches the entries
+    themselves. Every write also takes the next version of the user's change
+    feed, which ``changes`` replays for incremental sync.
+    """
+
+    @abstractmethod
+    async def add(self, user_id: str, entry: JournalEntry) -> None:
+        ...
+
+    @abstractmethod
+    async def add_many(self, user_id: str, entries: Sequence[JournalEntry]) -> None:
+        """Store several entries in one bulk write."""
+
+    @abstractmethod
+    async def add_new(self, user_id: str, entries: Sequence[JournalEntry]) -> list[bool]:
+        """Store, in one write, the entries whose ids are not stored yet.
+
+        Returns whether each entry was stored; an entry whose id is already
+        stored, or repeated earlier in ``entries``, is skipped without touching
+        the counters, so retried imports are idempotent.
+        """
+
+    @abstractmethod
+    async def list(self, user_id: str) -> list[JournalEntry]:
+        ...
+
+    @abstractmethod
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_content: bool = True
+    ) -> list[JournalEntry] | list[JournalEntryPreview]:
+        """Return up to ``query.limit`` entries in ``(created_at, id)`` order."""
+
+    @abstractmethod
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[JournalEntry]:
+        """Return up to ``limit`` changes after ``since_version``, oldest first.
+
+        A ``since_version`` of 0, or one above the user's current version,
+        starts a full change set with the first ``limit`` entries. ``after``,
+        decoded from a snapshot page's ``cursor``, continues that snapshot.
+        """
+
+    @abstractmethod
+    async def stats(self, user_id: str, *, weeks: Sequence[date] = ()) -> JournalStats:
+        """Return the summary counters, with weekly counts for ``weeks`` only."""
+
+    @abstractmethod
+    async def search(self, user_id: str, query: SearchQuery) -> list[SearchHit]:
+        """Rank entries matching any term of ``query.text`` by relevance, best first.
+
+        The memory and SQLite backends score with BM25 over the user's own
+        entries; MongoDB uses its text index score, which ranks differently.
+        """
+
+
+class MoodRepository(Repository):
+    """Storage for mood logs, ordered by ``recorded_at`` per user.
+
+    Backends also sum each log into its UTC day, week and month buckets and
+    a 15-minute UTC slot in the same write as the log itself. UTC trends read
+    the buckets as stored; another zone's bucket adds up the UTC days inside
+    it and only the slots of the partial days at its edges (``ZoneFold``),
+    so trends never rescan raw history, whichever zones a user asks for.
+    Writes are versioned per user like journal entries.
+    """
+
+    @abstractmethod
+    async def add(self, user_id: str, log: MoodLog) -> None:
+        ...
+
+    @abstractmethod
+    async def add_many(self, user_id: str, logs: Sequence[MoodLog]) -> None:
+        """Store several logs in one bulk write."""
+
+    @abstractmethod
+    async def add_new(self, user_id: str, logs: Sequence[MoodLog]) -> list[bool]:
+        """Store, in one write, the logs whose ids are not stored yet.
+
+        Returns whether each log was stored; see ``JournalRepository.add_new``.
+        """
+
+    @abstractmethod
+    async def list(self, user_id: str) -> list[MoodLog]:
+        ...
+
+    @abstractmethod
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_notes: bool = True
+    ) -> list[MoodLog]:
+        """Return up to ``query.limit`` logs in ``(recorded_at, id)`` order."""
+
+    @abstractmethod
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[MoodLog]:
+        """Return up to ``limit`` changes after ``since_version``; see ``JournalRepository.changes``."""
+
+    @abstractmethod
+    async def buckets(
+        self,
+        user_id: str,
+        granularity: Granularity,
+        *,
+        since: date | None = None,
+        zone: str = DEFAULT_ZONE,
+    ) -> list[MoodBucket]:
+        """Return ``zone``'s aggregates starting on or after ``since``, oldest first."""
@@ -0,0 +1,305 @@
+"""In-process repositories for local development, tests and single workers."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Generic, Sequence, TypeVar
+
+from ..schemas.journal import JournalEntry, JournalEntryPreview
+from ..schemas.mood import MoodLog
+from .aggregates import (
+    DEFAULT_ZONE,
+    BucketSeries,
+    Granularity,
+    JournalStats,
+    MoodBucket,
+    MoodSlot,
+    ZoneFold,
+    first_utc_day,
+    new_series,
+    slot_start,
+    utc_bucket_starts,
+)
+from .base import (
+    ChangeSet,
+    JournalRepository,
+    MoodRepository,
+    PageQuery,
+    SortKey,
+    as_utc,
+    entry_key,
+    log_key,
+    snapshot_page,
+    split_changes,
+)
+from .search import InvertedIndex, SearchHit, SearchQuery
+
+R = TypeVar("R")
+
+
+class SortedRecords(Generic[R]):
+    """Records kept in ``(timestamp, id)`` order with a parallel key index.
+
+    Appending in time order is O(1); out-of-order inserts fall back to a
+    binary-search insert. Range and cursor lookups bisect the key list, so a
+    page costs O(log n + page size).
+    """
+
+    __slots__ = ("keys", "records")
+
+    def __init__(self) -> None:
+        self.keys: list[SortKey] = []
+        self.records: list[R] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def insert(self, key: SortKey, record: R) -> None:
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.records.append(record)
+            return
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.records.insert(position, record)
+
+    def page(self, query: PageQuery) -> list[R]:
+        low, high = 0, len(self.keys)
+        # "" sorts before every id, so (t, "") is the first possible key at t.
+        if query.since is not None:
+            low = bisect_left(self.keys, (as_utc(query.since), ""))
+        if query.until is not None:
+            high = bisect_left(self.keys, (as_utc(query.until), ""))
+
+        if query.descending:
+            if query.after is not None:
+                high = min(high, bisect_left(self.keys, query.after))
+            start = max(low, high - query.limit)
+            return self.records[start:high][::-1]
+
+        if query.after is not None:
+            low = max(low, bisect_right(self.keys, query.after))
+        return self.records[low:max(low, min(high, low + query.limit))]
+
+
+# ``(record id, deleted)`` per write; version N is the change at index N - 1.
+ChangeLog = list[tuple[str, bool]]
+
+
+def replay(
+    log: ChangeLog,
+    records: dict[str, R],
+    listing: SortedRecords[R],
+    key: Callable[[R], SortKey],
+    since_version: int,
+    limit: int,
+    after: SortKey | None,
+) -> ChangeSet[R]:
+    """Changes after ``since_version``, or one page of a snapshot of ``listing``.
+
+    The snapshot continues past ``after`` when that is set, and starts over
+    when the version was never issued.
+    """
+    version = len(log)
+    if after is not None and since_version <= version:
+        page = listing.page(PageQuery(limit=limit + 1, after=after))
+        return snapshot_page(page, since_version, limit, key, first=False)
+    if not 0 < since_version <= version:
+        page = listing.page(PageQuery(limit=limit + 1))
+        return snapshot_page(page, version, limit, key, first=True)
+    end = min(version, since_version + limit)
+    upserted, deleted = split_changes(log[since_version:end])
+    return ChangeSet(
+        version=end,
+        records=[records[record_id] for record_id in upserted],
+        deleted=deleted,
+        has_more=end < version,
+    )
+
+
+@dataclass(slots=True)
+class _UserJournal:
+    entries: SortedRecords[JournalEntry] = field(default_factory=SortedRecords)
+    by_id: dict[str, JournalEntry] = field(default_factory=dict)
+    log: ChangeLog = field(default_factory=list)
+    stats: JournalStats = field(default_factory=JournalStats)
+    index: InvertedIndex = field(default_factory=InvertedIndex)
+
+    def add(self, entry: JournalEntry) -> None:
+        created_at = as_utc(entry.created_at)
+        self.entries.insert((created_at, entry.id), entry)
+        self.by_id[entry.id] = entry
+        self.log.append((entry.id, False))
+        self.stats.add(created_at, entry.mood, entry.tags)
+        self.index.add(entry, created_at)
+
+
+@dataclass(slots=True)
+class _UserMood:
+    logs: SortedRecords[MoodLog] = field(default_factory=SortedRecords)
+    by_id: dict[str, MoodLog] = field(default_factory=dict)
+    log: ChangeLog = field(default_factory=list)
+    buckets: dict[Granularity, BucketSeries[MoodBucket]] = field(default_factory=new_series)
+    slots: BucketSeries[MoodSlot] = field(default_factory=lambda: BucketSeries(MoodSlot))
+
+    def add(self, log: MoodLog) -> None:
+        recorded_at = as_utc(log.recorded_at)
+        self.logs.insert((recorded_at, log.id), log)
+        self.by_id[log.id] = log
+        self.log.append((log.id, False))
+        for granularity, start in utc_bucket_starts(recorded_at):
+            self.buckets[granularity].add(start, log.mood, log.intensity)
+        self.slots.add(slot_start(recorded_at), log.mood, log.intensity)
+
+
+class InMemoryJournalRepository(JournalRepository):
+    """Keep journal entries in process-local, per-user state.
+
+    Every write updates the entries, counters, search index and change feed
+    without awaiting, so it lands in one step on the event loop and needs
+    no lock; operations for different users never wait on one another.
+    """
+
+    def __init__(self) -> None:
+        self._users: dict[str, _UserJournal] = {}
+
+    def _state(self, user_id: str) -> _UserJournal:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = _UserJournal()
+        return state
+
+    async def add(self, user_id: str, entry: JournalEntry) -> None:
+        await self.add_many(user_id, [entry])
+
+    async def add_many(self, user_id: str, entries: Sequence[JournalEntry]) -> None:
+        state = self._state(user_id)
+        for entry in entries:
+            state.add(entry)
+
+    async def add_new(self, user_id: str, entries: Sequence[JournalEntry]) -> list[bool]:
+        state = self._state(user_id)
+        stored: list[bool] = []
+        for entry in entries:
+            fresh = entry.id not in state.by_id
+            if fresh:
+                state.add(entry)
+            stored.append(fresh)
+        return stored
+
+    async def list(self, user_id: str) -> list[JournalEntry]:
+        state = self._users.get(user_id)
+        return list(state.entries.records) if state else []
+
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_content: bool = True
+    ) -> list[JournalEntry] | list[JournalEntryPreview]:
+        state = self._users.get(user_id)
+        entries = state.entries.page(query) if state else []
+        if include_content:
+            return entries
+        return [
+            JournalEntryPreview.model_construct(**entry.model_dump(exclude={"content"}))
+            for entry in entries
+        ]
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[JournalEntry]:
+        state = self._users.get(user_id)
+        if state is None:
+            return ChangeSet(version=0, full=True)
+        return replay(
+            state.log, state.by_id, state.entries, entry_key, since_version, limit, after
+        )
+
+    async def stats(self, user_id: str, *, weeks: Sequence[date] = ()) -> JournalStats:
+        state = self._users.get(user_id)
+        return state.stats.select_weeks(weeks) if state else JournalStats()
+
+    async def search(self, user_id: str, query: SearchQuery) -> list[SearchHit]:
+        state = self._users.get(user_id)
+        return state.index.search(query) if state else []
+
+    async def clear(self) -> None:
+        self._users.clear()
+
+
+class InMemoryMoodRepository(MoodRepository):
+    """Keep mood logs in process-local, per-user state.
+
+    Writes update the logs, UTC buckets and slots and the change feed in one
+    synchronous step, like ``InMemoryJournalRepository``.
+    """
+
+    def __init__(self) -> None:
+        self._users: dict[str, _UserMood] = {}
+
+    def _state(self, user_id: str) -> _UserMood:
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = _UserMood()
+        return state
+
+    async def add(self, user_id: str, log: MoodLog) -> None:
+        await self.add_many(user_id, [log])
+
+    async def add_many(self, user_id: str, logs: Sequence[MoodLog]) -> None:
+        state = self._state(user_id)
+        for log in logs:
+            state.add(log)
+
+    async def add_new(self, user_id: str, logs: Sequence[MoodLog]) -> list[bool]:
+        state = self._state(user_id)
+        stored: list[bool] = []
+        for log in logs:
+            fresh = log.id not in state.by_id
+            if fresh:
+                state.add(log)
+            stored.append(fresh)
+        return stored
+
+    async def list(self, user_id: str) -> list[MoodLog]:
+        state = self._users.get(user_id)
+        return list(state.logs.records) if state else []
+
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_notes: bool = True
+    ) -> list[MoodLog]:
+        state = self._users.get(user_id)
+        logs = state.logs.page(query) if state else []
+        if include_notes:
+            return logs
+        return [log.model_copy(update={"notes": None}) for log in logs]
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[MoodLog]:
+        state = self._users.get(user_id)
+        if state is None:
+            return ChangeSet(version=0, full=True)
+        return replay(state.log, state.by_id, state.logs, log_key, since_version, limit, after)
+
+    async def buckets(
+        self,
+        user_id: str,
+        granularity: Granularity,
+        *,
+        since: date | None = None,
+        zone: str = DEFAULT_ZONE,
+    ) -> list[MoodBucket]:
+        state = self._users.get(user_id)
+        if state is None:
+            return []
+        if zone == DEFAULT_ZONE:
+            return state.buckets[granularity].range(since)
+        days = state.buckets["day"].range(first_utc_day(since) if since is not None else None)
+        fold = ZoneFold(days, granularity, zone, since=since)
+        return fold.fold(
+            [slot for low, high in fold.slot_spans for slot in state.slots.between(low, high)]
+        )
+
+    async def clear(self) -> None:
+        self._users.clear()
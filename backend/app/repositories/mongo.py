@@ -0,0 +1,638 @@
+"""MongoDB repositories backed by the async Motor driver."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Awaitable, Callable, Sequence, TypeVar
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, TEXT, ReturnDocument, UpdateOne
+from pymongo.read_concern import ReadConcern
+
+from ..schemas.journal import JournalEntry, JournalEntryPreview
+from ..schemas.mood import MoodLog
+from .aggregates import (
+    DEFAULT_ZONE,
+    Granularity,
+    JournalStats,
+    MoodBucket,
+    MoodSlot,
+    ZoneFold,
+    first_utc_day,
+    slot_start,
+    utc_bucket_starts,
+)
+from .base import (
+    ChangeSet,
+    JournalRepository,
+    MoodRepository,
+    PageQuery,
+    SortKey,
+    entry_key,
+    log_key,
+    snapshot_page,
+    split_changes,
+)
+from .search import SearchHit, SearchQuery, tokenize
+
+R = TypeVar("R")
+T = TypeVar("T")
+
+
+def connect(uri: str, database: str, *, max_pool_size: int) -> AsyncIOMotorDatabase:
+    """Open a pooled client; Motor connects lazily on the first operation.
+
+    Writes run in multi-document transactions, so the server must be a
+    replica set (a single-node one is enough) or a sharded cluster.
+    """
+    client: AsyncIOMotorClient = AsyncIOMotorClient(
+        uri, maxPoolSize=max_pool_size, tz_aware=True
+    )
+    return client[database]
+
+
+def _document(user_id: str, record: JournalEntry | MoodLog) -> dict[str, Any]:
+    document = record.model_dump(exclude={"id"})
+    document["_id"] = record.id
+    document["user_id"] = user_id
+    return document
+
+
+def _fields(document: dict[str, Any]) -> dict[str, Any]:
+    document = dict(document)
+    document["id"] = document.pop("_id")
+    document.pop("user_id", None)
+    return document
+
+
+def _page_filter(user_id: str, field: str, query: PageQuery) -> dict[str, Any]:
+    """Build a keyset page filter over ``(field, _id)`` served by the compound index."""
+    conditions: list[dict[str, Any]] = [{"user_id": user_id}]
+    bounds: dict[str, Any] = {}
+    if query.since is not None:
+        bounds["$gte"] = query.since
+    if query.until is not None:
+        bounds["$lt"] = query.until
+    if bounds:
+        conditions.append({field: bounds})
+    if query.after is not None:
+        after_at, after_id = query.after
+        operator = "$lt" if query.descending else "$gt"
+        conditions.append(
+            {"$or": [{field: {operator: after_at}}, {field: after_at, "_id": {operator: after_id}}]}
+        )
+    return {"$and": conditions} if len(conditions) > 1 else conditions[0]
+
+
+def _page_sort(field: str, query: PageQuery) -> list[tuple[str, int]]:
+    direction = DESCENDING if query.descending else ASCENDING
+    return [(field, direction), ("_id", direction)]
+
+
+async def _in_transaction(
+    database: AsyncIOMotorDatabase,
+    work: Callable[[AsyncIOMotorClientSession], Awaitable[T]],
+    *,
+    read_concern: ReadConcern | None = None,
+) -> T:
+    """Run ``work(session)`` in one transaction, retrying it on transient conflicts.
+
+    A batch lands together with its counters, aggregates and change-feed
+    entries or not at all.
+    """
+    async with await database.client.start_session() as session:
+        return await session.with_transaction(work, read_concern=read_concern)
+
+
+async def _fresh(
+    collection: Any, ids: Sequence[str], session: AsyncIOMotorClientSession
+) -> list[bool]:
+    """Whether each id is absent from ``collection`` and not repeated earlier in ``ids``.
+
+    Read inside the writing transaction: a concurrent retry of the same batch
+    conflicts on the inserted ids and is replayed, and then sees them stored.
+    """
+    cursor = collection.find({"_id": {"$in": list(ids)}}, {"_id": 1}, session=session)
+    seen = {document["_id"] async for document in cursor}
+    fresh = []
+    for record_id in ids:
+        fresh.append(record_id not in seen)
+        seen.add(record_id)
+    return fresh
+
+
+class _ChangeFeed:
+    """Per-user versions of one feed (``journal`` or ``mood``).
+
+    ``change_versions`` holds a counter document per user and feed, and
+    ``record_changes`` one document per written record. ``log`` bumps the
+    counter inside the transaction that writes the records, so concurrent
+    writes for one user conflict on it and commit one after another, and the
+    committed versions have no gaps. ``read`` takes the counter and the
+    changes from one snapshot.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase, feed: str) -> None:
+        self._versions = database["change_versions"]
+        self._changes = database["record_changes"]
+        self._feed = feed
+
+    async def initialize(self) -> None:
+        await self._changes.create_index(
+            [("user_id", ASCENDING), ("feed", ASCENDING), ("version", ASCENDING)], unique=True
+        )
+
+    async def log(
+        self, user_id: str, ids: Sequence[str], session: AsyncIOMotorClientSession
+    ) -> None:
+        if not ids:
+            return
+        counter = await self._versions.find_one_and_update(
+            {"_id": f"{user_id}|{self._feed}"},
+            {"$set": {"user_id": user_id, "feed": self._feed}, "$inc": {"version": len(ids)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        first = counter["version"] - len(ids) + 1
+        await self._changes.insert_many(
+            [
+                {
+                    "user_id": user_id,
+                    "feed": self._feed,
+                    "version": first + offset,
+                    "record_id": record_id,
+                    "deleted": False,
+                }
+                for offset, record_id in enumerate(ids)
+            ],
+            ordered=False,
+            session=session,
+        )
+
+    async def read(
+        self,
+        user_id: str,
+        since_version: int,
+        limit: int,
+        after: SortKey | None,
+        collection: Any,
+        order: str,
+        record: Callable[..., R],
+        key: Callable[[R], SortKey],
+    ) -> ChangeSet[R]:
+        """Replay changes after ``since_version``, or page through records ordered by ``order``.
+
+        The snapshot continues past ``after`` when that is set, and starts
+        over when the version was never issued.
+        """
+
+        async def _read(session: AsyncIOMotorClientSession) -> ChangeSet[R]:
+            counter = await self._versions.find_one(
+                {"_id": f"{user_id}|{self._feed}"}, session=session
+            )
+            version = counter["version"] if counter else 0
+            resume = after is not None and since_version <= version
+            if resume or not 0 < since_version <= version:
+                query = PageQuery(limit=limit + 1, after=after if resume else None)
+                cursor = (
+                    collection.find(_page_filter(user_id, order, query), session=session)
+                    .sort(_page_sort(order, query))
+                    .limit(query.limit)
+                )
+                records = [record(**_fields(document)) async for document in cursor]
+                return snapshot_page(
+                    records,
+                    since_version if resume else version,
+                    limit,
+                    key,
+                    first=not resume,
+                )
+
+            cursor = (
+                self._changes.find(
+                    {"user_id": user_id, "feed": self._feed, "version": {"$gt": since_version}},
+                    session=session,
+                )
+                .sort("version", ASCENDING)
+                .limit(limit + 1)
+            )
+            documents = [document async for document in cursor]
+            # Stop at a gap rather than skip past it; the next sync resumes there.
+            changes = []
+            for expected, document in enumerate(documents[:limit], since_version + 1):
+                if document["version"] != expected:
+                    break
+                changes.append(document)
+            has_more = len(changes) < len(documents)
+            upserted, deleted = split_changes(
+                (document["record_id"], document["deleted"]) for document in changes
+            )
+            found = {
+                document["_id"]: record(**_fields(document))
+                async for document in collection.find(
+                    {"_id": {"$in": upserted}}, session=session
+                )
+            }
+            return ChangeSet(
+                version=changes[-1]["version"] if changes else since_version,
+                records=[found[record_id] for record_id in upserted if record_id in found],
+                deleted=deleted,
+                has_more=has_more,
+            )
+
+        return await _in_transaction(
+            collection.database, _read, read_concern=ReadConcern("snapshot")
+        )
+
+    async def clear(self) -> None:
+        await self._versions.delete_many({"feed": self._feed})
+        await self._changes.delete_many({"feed": self._feed})
+
+
+def _tally_stage(user_id: str, log: MoodLog) -> dict[str, Any]:
+    """``$set`` stage folding one log into a bucket or slot document.
+
+    Within a single ``$set`` stage field paths read the pre-update document,
+    so the dominant mood is compared against the old intensity.
+    """
+    previous = {"$ifNull": ["$dominant_intensity", 0]}
+    return {
+        "user_id": user_id,
+        "total": {"$add": [{"$ifNull": ["$total", 0]}, log.intensity]},
+        "count": {"$add": [{"$ifNull": ["$count", 0]}, 1]},
+        "dominant_mood": {
+            "$cond": [{"$gt": [log.intensity, previous]}, {"$literal": log.mood}, "$dominant_mood"]
+        },
+        "dominant_intensity": {"$max": [log.intensity, previous]},
+    }
+
+
+def _bucket_updates(user_id: str, log: MoodLog) -> list[UpdateOne]:
+    """Upsert the UTC day, week and month buckets for one log, each atomically."""
+    updates = []
+    for granularity, start in utc_bucket_starts(log.recorded_at):
+        stage = {
+            **_tally_stage(user_id, log),
+            "granularity": granularity,
+            "start": start.isoformat(),
+        }
+        updates.append(
+            UpdateOne(
+                {"_id": f"{user_id}|{granularity}|{start.isoformat()}"},
+                [{"$set": stage}],
+                upsert=True,
+            )
+        )
+    return updates
+
+
+def _slot_update(user_id: str, log: MoodLog) -> UpdateOne:
+    """Upsert the UTC slot aggregate for one log in a single atomic update."""
+    start = slot_start(log.recorded_at)
+    stage = {**_tally_stage(user_id, log), "start": start}
+    return UpdateOne({"_id": f"{user_id}|{start.isoformat()}"}, [{"$set": stage}], upsert=True)
+
+
+def _journal_counter_updates(user_id: str, entries: Sequence[JournalEntry]) -> list[UpdateOne]:
+    delta = JournalStats()
+    for entry in entries:
+        delta.add(entry.created_at, entry.mood, entry.tags)
+    counters = [
+        *(("mood", mood, count) for mood, count in delta.mood_counts.items()),
+        *(("tag", tag, count) for tag, count in delta.tag_counts.items()),
+        *(("week", week.isoformat(), count) for week, count in delta.weekly_counts.items()),
+    ]
+    return [
+        UpdateOne(
+            {"_id": f"{user_id}|{kind}|{key}"},
+            {"$set": {"user_id": user_id, "kind": kind, "key": key}, "$inc": {"count": count}},
+            upsert=True,
+        )
+        for kind, key, count in counters
+    ]
+
+
+class MongoJournalRepository(JournalRepository):
+    """Journal entries stored in the ``journal_entries`` collection.
+
+    Summary totals live in ``journal_stats`` (one document per user) and
+    per-mood, per-tag and per-week counts in ``journal_counters``.
+    """
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        self._collection = database["journal_entries"]
+        self._stats = database["journal_stats"]
+        self._counters = database["journal_counters"]
+        self._feed = _ChangeFeed(database, "journal")
+
+    async def initialize(self) -> None:
+        await self._collection.create_index(
+            [("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        await self._counters.create_index([("user_id", ASCENDING), ("kind", ASCENDING)])
+        # The user_id prefix keeps each search inside one user's entries; the
+        # "none" language disables stemming and stop words like the other backends.
+        await self._collection.create_index(
+            [("user_id", ASCENDING), ("title", TEXT), ("content", TEXT), ("tags", TEXT)],
+            default_language="none",
+        )
+        await self._feed.initialize()
+
+    async def add(self, user_id: str, entry: JournalEntry) -> None:
+        await self.add_many(user_id, [entry])
+
+    async def add_many(self, user_id: str, entries: Sequence[JournalEntry]) -> None:
+        if entries:
+            await _in_transaction(
+                self._collection.database,
+                lambda session: self._insert(user_id, entries, session),
+            )
+
+    async def add_new(self, user_id: str, entries: Sequence[JournalEntry]) -> list[bool]:
+        if not entries:
+            return []
+
+        async def _write(session: AsyncIOMotorClientSession) -> list[bool]:
+            stored = await _fresh(self._collection, [entry.id for entry in entries], session)
+            fresh = [entry for entry, new in zip(entries, stored) if new]
+            await self._insert(user_id, fresh, session)
+            return stored
+
+        return await _in_transaction(self._collection.database, _write)
+
+    async def _insert(
+        self,
+        user_id: str,
+        entries: Sequence[JournalEntry],
+        session: AsyncIOMotorClientSession,
+    ) -> None:
+        """Insert entries with their counters and change-feed entries; the caller owns the transaction."""
+        if not entries:
+            return
+        await self._collection.insert_many(
+            [_document(user_id, entry) for entry in entries], ordered=False, session=session
+        )
+        created = [entry.created_at for entry in entries]
+        await self._stats.update_one(
+            {"_id": user_id},
+            {
+                "$inc": {"total_entries": len(entries)},
+                "$min": {"first_entry_at": min(created)},
+                "$max": {"last_entry_at": max(created)},
+            },
+            upsert=True,
+            session=session,
+        )
+        await self._counters.bulk_write(
+            _journal_counter_updates(user_id, entries), ordered=False, session=session
+        )
+        await self._feed.log(user_id, [entry.id for entry in entries], session)
+
+    async def list(self, user_id: str) -> list[JournalEntry]:
+        cursor = self._collection.find({"user_id": user_id}).sort(
+            [("created_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        return [JournalEntry(**_fields(document)) async for document in cursor]
+
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_content: bool = True
+    ) -> list[JournalEntry] | list[JournalEntryPreview]:
+        cursor = (
+            self._collection.find(
+                _page_filter(user_id, "created_at", query),
+                projection=None if include_content else {"content": 0},
+            )
+            .sort(_page_sort("created_at", query))
+            .limit(query.limit)
+        )
+        model = JournalEntry if include_content else JournalEntryPreview
+        return [model(**_fields(document)) async for document in cursor]
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[JournalEntry]:
+        return await self._feed.read(
+            user_id,
+            since_version,
+            limit,
+            after,
+            self._collection,
+            "created_at",
+            JournalEntry,
+            entry_key,
+        )
+
+    async def stats(self, user_id: str, *, weeks: Sequence[date] = ()) -> JournalStats:
+        totals = await self._stats.find_one({"_id": user_id})
+        if totals is None:
+            return JournalStats()
+        stats = JournalStats(
+            total_entries=totals["total_entries"],
+            first_entry_at=totals["first_entry_at"],
+            last_entry_at=totals["last_entry_at"],
+        )
+        cursor = self._counters.find(
+            {
+                "user_id": user_id,
+                "$or": [
+                    {"kind": {"$in": ["mood", "tag"]}},
+                    {"kind": "week", "key": {"$in": [week.isoformat() for week in weeks]}},
+                ],
+            }
+        )
+        async for document in cursor:
+            if document["kind"] == "mood":
+                stats.mood_counts[document["key"]] = document["count"]
+            elif document["kind"] == "tag":
+                stats.tag_counts[document["key"]] = document["count"]
+            else:
+                stats.weekly_counts[date.fromisoformat(document["key"])] = document["count"]
+        return stats
+
+    async def search(self, user_id: str, query: SearchQuery) -> list[SearchHit]:
+        terms = dict.fromkeys(tokenize(query.text))
+        if not terms:
+            return []
+        # Space-separated terms match any of them. textScore weighs term
+        # frequency against field length but has no document frequency, so a
+        # rare term does not outrank a common one as under the BM25 of the
+        # memory and SQLite backends; scores are not comparable across them.
+        conditions: dict[str, Any] = {"user_id": user_id, "$text": {"$search": " ".join(terms)}}
+        if query.tags:
+            conditions["tags"] = {"$all": list(query.tags)}
+        cursor = (
+            self._collection.find(conditions, {"score": {"$meta": "textScore"}})
+            .sort([("score", {"$meta": "textScore"}), ("created_at", DESCENDING)])
+            .skip(query.offset)
+            .limit(query.limit)
+        )
+        hits = []
+        async for document in cursor:
+            score = document.pop("score")
+            hits.append(SearchHit(entry=JournalEntry(**_fields(document)), score=score))
+        return hits
+
+    async def clear(self) -> None:
+        await self._collection.delete_many({})
+        await self._stats.delete_many({})
+        await self._counters.delete_many({})
+        await self._feed.clear()
+
+    async def close(self) -> None:
+        self._collection.database.client.close()
+
+
+class MongoMoodRepository(MoodRepository):
+    """Mood logs stored in the ``mood_logs`` collection."""
+
+    def __init__(self, database: AsyncIOMotorDatabase) -> None:
+        self._collection = database["mood_logs"]
+        self._buckets = database["mood_buckets"]
+        self._slots = database["mood_slots"]
+        self._feed = _ChangeFeed(database, "mood")
+
+    async def initialize(self) -> None:
+        await self._collection.create_index(
+            [("user_id", ASCENDING), ("recorded_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        await self._buckets.create_index(
+            [("user_id", ASCENDING), ("granularity", ASCENDING), ("start", ASCENDING)]
+        )
+        await self._slots.create_index([("user_id", ASCENDING), ("start", ASCENDING)])
+        await self._feed.initialize()
+
+    async def add(self, user_id: str, log: MoodLog) -> None:
+        await self.add_many(user_id, [log])
+
+    async def add_many(self, user_id: str, logs: Sequence[MoodLog]) -> None:
+        if logs:
+            await _in_transaction(
+                self._collection.database,
+                lambda session: self._insert(user_id, logs, session),
+            )
+
+    async def add_new(self, user_id: str, logs: Sequence[MoodLog]) -> list[bool]:
+        if not logs:
+            return []
+
+        async def _write(session: AsyncIOMotorClientSession) -> list[bool]:
+            stored = await _fresh(self._collection, [log.id for log in logs], session)
+            await self._insert(user_id, [log for log, new in zip(logs, stored) if new], session)
+            return stored
+
+        return await _in_transaction(self._collection.database, _write)
+
+    async def _insert(
+        self, user_id: str, logs: Sequence[MoodLog], session: AsyncIOMotorClientSession
+    ) -> None:
+        """Insert logs with their aggregates and change-feed entries; the caller owns the transaction."""
+        if not logs:
+            return
+        await self._collection.insert_many(
+            [_document(user_id, log) for log in logs], ordered=False, session=session
+        )
+        # Ordered so repeated upserts of one bucket or slot apply one after another.
+        await self._buckets.bulk_write(
+            [update for log in logs for update in _bucket_updates(user_id, log)], session=session
+        )
+        await self._slots.bulk_write(
+            [_slot_update(user_id, log) for log in logs], session=session
+        )
+        await self._feed.log(user_id, [log.id for log in logs], session)
+
+    async def list(self, user_id: str) -> list[MoodLog]:
+        cursor = self._collection.find({"user_id": user_id}).sort(
+            [("recorded_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        return [MoodLog(**_fields(document)) async for document in cursor]
+
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_notes: bool = True
+    ) -> list[MoodLog]:
+        cursor = (
+            self._collection.find(
+                _page_filter(user_id, "recorded_at", query),
+                projection=None if include_notes else {"notes": 0},
+            )
+            .sort(_page_sort("recorded_at", query))
+            .limit(query.limit)
+        )
+        return [MoodLog(**_fields(document)) async for document in cursor]
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[MoodLog]:
+        return await self._feed.read(
+            user_id,
+            since_version,
+            limit,
+            after,
+            self._collection,
+            "recorded_at",
+            MoodLog,
+            log_key,
+        )
+
+    async def buckets(
+        self,
+        user_id: str,
+        granularity: Granularity,
+        *,
+        since: date | None = None,
+        zone: str = DEFAULT_ZONE,
+    ) -> list[MoodBucket]:
+        if zone == DEFAULT_ZONE:
+            return await self._utc_buckets(user_id, granularity, since)
+        days = await self._utc_buckets(
+            user_id, "day", first_utc_day(since) if since is not None else None
+        )
+        fold = ZoneFold(days, granularity, zone, since=since)
+        spans = fold.slot_spans
+        if not spans:
+            return fold.fold([])
+        cursor = self._slots.find(
+            {
+                "user_id": user_id,
+                "$or": [{"start": {"$gte": low, "$lt": high}} for low, high in spans],
+            }
+        ).sort("start", ASCENDING)
+        return fold.fold(
+            [
+                MoodSlot(
+                    start=document["start"],
+                    total=document["total"],
+                    count=document["count"],
+                    dominant_mood=document.get("dominant_mood"),
+                    dominant_intensity=document["dominant_intensity"],
+                )
+                async for document in cursor
+            ]
+        )
+
+    async def _utc_buckets(
+        self, user_id: str, granularity: Granularity, since: date | None
+    ) -> list[MoodBucket]:
+        conditions: dict[str, Any] = {"user_id": user_id, "granularity": granularity}
+        if since is not None:
+            conditions["start"] = {"$gte": since.isoformat()}
+        cursor = self._buckets.find(conditions).sort("start", ASCENDING)
+        return [
+            MoodBucket(
+                start=date.fromisoformat(document["start"]),
+                total=document["total"],
+                count=document["count"],
+                dominant_mood=document.get("dominant_mood"),
+                dominant_intensity=document["dominant_intensity"],
+            )
+            async for document in cursor
+        ]
+
+    async def clear(self) -> None:
+        await self._collection.delete_many({})
+        await self._buckets.delete_many({})
+        await self._slots.delete_many({})
+        await self._feed.clear()
+
+    async def close(self) -> None:
+        self._collection.database.client.close()
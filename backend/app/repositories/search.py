@@ -0,0 +1,129 @@
+"""Full-text search over journal entries."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from ..schemas.journal import JournalEntry
+
+# BM25 term-frequency saturation and length normalisation.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens, matching what the SQL backends index."""
+    return _TOKEN.findall(text.casefold())
+
+
+def entry_terms(entry: JournalEntry) -> list[str]:
+    """Tokens from the searchable fields: title, content and tags."""
+    return tokenize(" ".join([entry.title or "", entry.content, *entry.tags]))
+
+
+def idf(matching: int, documents: int) -> float:
+    """BM25 inverse document frequency of a term in ``matching`` of ``documents`` entries."""
+    return math.log(1 + (documents - matching + 0.5) / (matching + 0.5))
+
+
+def bm25(frequency: int, length: int, matching: int, documents: int, average_length: float) -> float:
+    """BM25 weight of a term seen ``frequency`` times in a ``length``-token entry.
+
+    ``matching`` of the user's ``documents`` entries contain the term.
+    """
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+    return idf(matching, documents) * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+
+@dataclass(slots=True, frozen=True)
+class SearchQuery:
+    """Ranked search request; entries must carry every tag in ``tags``."""
+
+    text: str
+    tags: tuple[str, ...] = ()
+    limit: int = 20
+    offset: int = 0
+
+
+@dataclass(slots=True)
+class SearchHit:
+    entry: JournalEntry
+    score: float
+
+
+@dataclass(slots=True)
+class _Document:
+    entry: JournalEntry
+    created_at: datetime
+    length: int
+
+
+@dataclass(slots=True)
+class InvertedIndex:
+    """Per-user postings with BM25 ranking, updated one entry at a time.
+
+    A query only touches the postings of its own terms, so its cost follows
+    how often those terms occur rather than the size of the journal.
+    """
+
+    postings: dict[str, dict[str, int]] = field(default_factory=dict)
+    by_tag: dict[str, set[str]] = field(default_factory=dict)
+    documents: dict[str, _Document] = field(default_factory=dict)
+    total_length: int = 0
+
+    def add(self, entry: JournalEntry, created_at: datetime) -> None:
+        terms = Counter(entry_terms(entry))
+        length = sum(terms.values())
+        self.documents[entry.id] = _Document(entry, created_at, length)
+        self.total_length += length
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[entry.id] = frequency
+        for tag in entry.tags:
+            self.by_tag.setdefault(tag, set()).add(entry.id)
+
+    def _tagged(self, tags: tuple[str, ...]) -> set[str] | None:
+        if not tags:
+            return None
+        sets = sorted((self.by_tag.get(tag, set()) for tag in tags), key=len)
+        return set.intersection(*sets)
+
+    def search(self, query: SearchQuery) -> list[SearchHit]:
+        """Best ``query.limit`` hits after ``query.offset``, highest score first."""
+        allowed = self._tagged(query.tags)
+        if allowed is not None and not allowed:
+            return []
+        count = len(self.documents)
+        if not count:
+            return []
+        average_length = self.total_length / count
+
+        scores: dict[str, float] = {}
+        for term in dict.fromkeys(tokenize(query.text)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            for entry_id, frequency in postings.items():
+                if allowed is not None and entry_id not in allowed:
+                    continue
+                length = self.documents[entry_id].length
+                scores[entry_id] = scores.get(entry_id, 0.0) + bm25(
+                    frequency, length, len(postings), count, average_length
+                )
+
+        # Equal scores rank newer entries first.
+        best = heapq.nlargest(
+            query.offset + query.limit,
+            scores.items(),
+            key=lambda item: (item[1], self.documents[item[0]].created_at),
+        )
+        return [
+            SearchHit(entry=self.documents[entry_id].entry, score=score)
+            for entry_id, score in best[query.offset:]
+        ]
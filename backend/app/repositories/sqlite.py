@@ -0,0 +1,766 @@
+"""Embedded SQLite repositories for single-node deployments and tests."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Sequence, TypeVar
+
+from ..core.sqlite import SQLiteDatabase
+from ..schemas.journal import JournalEntry, JournalEntryPreview
+from ..schemas.mood import MoodLog
+from .aggregates import (
+    DEFAULT_ZONE,
+    Granularity,
+    JournalStats,
+    MoodBucket,
+    MoodSlot,
+    ZoneFold,
+    first_utc_day,
+    slot_start,
+    utc_bucket_starts,
+)
+from .base import (
+    ChangeSet,
+    JournalRepository,
+    MoodRepository,
+    PageQuery,
+    SortKey,
+    entry_key,
+    log_key,
+    snapshot_page,
+    split_changes,
+)
+from .search import BM25_B, BM25_K1, SearchHit, SearchQuery, entry_terms, idf, tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal_entries (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    title TEXT,
+    content TEXT NOT NULL,
+    mood TEXT,
+    tags TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_journal_entries_user_created
+    ON journal_entries (user_id, created_at, id);
+
+CREATE TABLE IF NOT EXISTS journal_stats (
+    user_id TEXT PRIMARY KEY,
+    total_entries INTEGER NOT NULL,
+    first_entry_at INTEGER NOT NULL,
+    last_entry_at INTEGER NOT NULL
+) WITHOUT ROWID;
+
+-- Per-user postings (search.tokenize tokens) with each entry's token count
+-- and creation time, so BM25 ranking and paging run in SQL over the query
+-- terms' postings without reading or re-tokenising entries.
+CREATE TABLE IF NOT EXISTS journal_terms (
+    user_id TEXT NOT NULL,
+    term TEXT NOT NULL,
+    entry_id TEXT NOT NULL,
+    frequency INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    PRIMARY KEY (user_id, term, entry_id)
+) WITHOUT ROWID;
+
+-- kind is 'mood', 'tag' or 'week' (ISO week start).
+CREATE TABLE IF NOT EXISTS journal_counters (
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, kind, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS mood_logs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    mood TEXT NOT NULL,
+    intensity INTEGER NOT NULL,
+    notes TEXT,
+    recorded_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_mood_logs_user_recorded
+    ON mood_logs (user_id, recorded_at, id);
+
+-- UTC day, week and month buckets; UTC trends read them directly.
+CREATE TABLE IF NOT EXISTS mood_buckets (
+    user_id TEXT NOT NULL,
+    granularity TEXT NOT NULL,
+    bucket_start TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    dominant_mood TEXT,
+    dominant_intensity INTEGER NOT NULL,
+    PRIMARY KEY (user_id, granularity, bucket_start)
+) WITHOUT ROWID;
+
+-- 15-minute UTC slots (see aggregates.SLOT_MINUTES); trends in other zones sum them.
+CREATE TABLE IF NOT EXISTS mood_slots (
+    user_id TEXT NOT NULL,
+    slot_start INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    dominant_mood TEXT,
+    dominant_intensity INTEGER NOT NULL,
+    PRIMARY KEY (user_id, slot_start)
+) WITHOUT ROWID;
+
+-- Per-user change feeds; feed is 'journal' or 'mood'. Each written record
+-- takes the feed's next version; a removal is logged with deleted = 1.
+CREATE TABLE IF NOT EXISTS change_versions (
+    user_id TEXT NOT NULL,
+    feed TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (user_id, feed)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS record_changes (
+    user_id TEXT NOT NULL,
+    feed TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    record_id TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, feed, version)
+) WITHOUT ROWID;
+"""
+
+R = TypeVar("R")
+
+_UPSERT_JOURNAL_STATS = """
+INSERT INTO journal_stats (user_id, total_entries, first_entry_at, last_entry_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    total_entries = total_entries + excluded.total_entries,
+    first_entry_at = MIN(first_entry_at, excluded.first_entry_at),
+    last_entry_at = MAX(last_entry_at, excluded.last_entry_at)
+"""
+
+_UPSERT_JOURNAL_COUNTER = """
+INSERT INTO journal_counters (user_id, kind, key, count) VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id, kind, key) DO UPDATE SET count = count + excluded.count
+"""
+
+# SET expressions read the row's values from before the update, so the
+# dominant mood is compared against the old intensity.
+_UPSERT_MOOD_BUCKET = """
+INSERT INTO mood_buckets
+    (user_id, granularity, bucket_start, total, count, dominant_mood, dominant_intensity)
+VALUES (?, ?, ?, ?, 1, ?, ?)
+ON CONFLICT (user_id, granularity, bucket_start) DO UPDATE SET
+    total = total + excluded.total,
+    count = count + 1,
+    dominant_mood = CASE
+        WHEN excluded.dominant_intensity > dominant_intensity THEN excluded.dominant_mood
+        ELSE dominant_mood
+    END,
+    dominant_intensity = MAX(dominant_intensity, excluded.dominant_intensity)
+"""
+
+_UPSERT_MOOD_SLOT = """
+INSERT INTO mood_slots
+    (user_id, slot_start, total, count, dominant_mood, dominant_intensity)
+VALUES (?, ?, ?, 1, ?, ?)
+ON CONFLICT (user_id, slot_start) DO UPDATE SET
+    total = total + excluded.total,
+    count = count + 1,
+    dominant_mood = CASE
+        WHEN excluded.dominant_intensity > dominant_intensity THEN excluded.dominant_mood
+        ELSE dominant_mood
+    END,
+    dominant_intensity = MAX(dominant_intensity, excluded.dominant_intensity)
+"""
+
+
+_BUMP_VERSION = """
+INSERT INTO change_versions (user_id, feed, version) VALUES (?, ?, ?)
+ON CONFLICT (user_id, feed) DO UPDATE SET version = version + excluded.version
+RETURNING version
+"""
+
+
+def to_micros(value: datetime) -> int:
+    """Encode a datetime as integer UTC microseconds so SQL ordering is chronological."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(value: int) -> datetime:
+    seconds, micros = divmod(value, 1_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=micros)
+
+
+def _page_clause(column: str, query: PageQuery) -> tuple[str, list[Any]]:
+    """Build the WHERE/ORDER/LIMIT tail for a keyset page over ``(column, id)``."""
+    conditions: list[str] = []
+    params: list[Any] = []
+    if query.since is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(to_micros(query.since))
+    if query.until is not None:
+        conditions.append(f"{column} < ?")
+        params.append(to_micros(query.until))
+    if query.after is not None:
+        after_at, after_id = query.after
+        operator = "<" if query.descending else ">"
+        conditions.append(f"({column}, id) {operator} (?, ?)")
+        params.extend([to_micros(after_at), after_id])
+
+    direction = "DESC" if query.descending else "ASC"
+    clause = "".join(f" AND {condition}" for condition in conditions)
+    clause += f" ORDER BY {column} {direction}, id {direction} LIMIT ?"
+    params.append(query.limit)
+    return clause, params
+
+
+def _journal_row(user_id: str, entry: JournalEntry) -> tuple[Any, ...]:
+    return (
+        entry.id,
+        user_id,
+        entry.title,
+        entry.content,
+        entry.mood,
+        json.dumps(entry.tags),
+        to_micros(entry.created_at),
+        to_micros(entry.updated_at),
+    )
+
+
+def _journal_entry(row: sqlite3.Row) -> JournalEntry:
+    return JournalEntry(
+        id=row["id"],
+        title=row["title"],
+        content=row["content"],
+        mood=row["mood"],
+        tags=json.loads(row["tags"]),
+        created_at=from_micros(row["created_at"]),
+        updated_at=from_micros(row["updated_at"]),
+    )
+
+
+def _journal_preview(row: sqlite3.Row) -> JournalEntryPreview:
+    return JournalEntryPreview(
+        id=row["id"],
+        title=row["title"],
+        mood=row["mood"],
+        tags=json.loads(row["tags"]),
+        created_at=from_micros(row["created_at"]),
+        updated_at=from_micros(row["updated_at"]),
+    )
+
+
+def _journal_delta(entries: Sequence[JournalEntry]) -> JournalStats:
+    delta = JournalStats()
+    for entry in entries:
+        delta.add(entry.created_at, entry.mood, entry.tags)
+    return delta
+
+
+def _counter_rows(user_id: str, delta: JournalStats) -> list[tuple[Any, ...]]:
+    return [
+        *((user_id, "mood", mood, count) for mood, count in delta.mood_counts.items()),
+        *((user_id, "tag", tag, count) for tag, count in delta.tag_counts.items()),
+        *(
+            (user_id, "week", week.isoformat(), count)
+            for week, count in delta.weekly_counts.items()
+        ),
+    ]
+
+
+def _fresh(connection: sqlite3.Connection, table: str, ids: Sequence[str]) -> list[bool]:
+    """Whether each id is absent from ``table`` and not repeated earlier in ``ids``."""
+    seen = {
+        row["id"]
+        for row in connection.execute(
+            f"SELECT id FROM {table} WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(ids)),),
+        )
+    }
+    fresh = []
+    for record_id in ids:
+        fresh.append(record_id not in seen)
+        seen.add(record_id)
+    return fresh
+
+
+def _log_changes(
+    connection: sqlite3.Connection, user_id: str, feed: str, ids: Sequence[str]
+) -> None:
+    """Give each written record the next version of the user's ``feed``."""
+    last = connection.execute(_BUMP_VERSION, (user_id, feed, len(ids))).fetchone()["version"]
+    first = last - len(ids) + 1
+    connection.executemany(
+        "INSERT INTO record_changes (user_id, feed, version, record_id) VALUES (?, ?, ?, ?)",
+        [(user_id, feed, first + offset, record_id) for offset, record_id in enumerate(ids)],
+    )
+
+
+def _select_changes(
+    connection: sqlite3.Connection,
+    user_id: str,
+    feed: str,
+    table: str,
+    order: str,
+    since_version: int,
+    limit: int,
+    after: SortKey | None,
+    record: Callable[[sqlite3.Row], R],
+    key: Callable[[R], SortKey],
+) -> ChangeSet[R]:
+    """Replay ``feed`` after ``since_version``, or page through ``table`` ordered by ``order``.
+
+    The snapshot continues past ``after`` when that is set, and starts over
+    when the version was never issued.
+    """
+    current = connection.execute(
+        "SELECT version FROM change_versions WHERE user_id = ? AND feed = ?", (user_id, feed)
+    ).fetchone()
+    version = current["version"] if current else 0
+    resume = after is not None and since_version <= version
+    if resume or not 0 < since_version <= version:
+        clause, params = _page_clause(
+            order, PageQuery(limit=limit + 1, after=after if resume else None)
+        )
+        rows = connection.execute(
+            f"SELECT * FROM {table} WHERE user_id = ?{clause}", [user_id, *params]
+        ).fetchall()
+        return snapshot_page(
+            [record(row) for row in rows],
+            since_version if resume else version,
+            limit,
+            key,
+            first=not resume,
+        )
+
+    # Deleted records have no row to join, hence the LEFT JOIN.
+    rows = connection.execute(
+        "SELECT c.version AS change_version, c.record_id, c.deleted, t.*"
+        f" FROM record_changes c LEFT JOIN {table} t ON t.id = c.record_id"
+        " WHERE c.user_id = ? AND c.feed = ? AND c.version > ? ORDER BY c.version LIMIT ?",
+        (user_id, feed, since_version, limit + 1),
+    ).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    upserted, deleted = split_changes((row["record_id"], bool(row["deleted"])) for row in rows)
+    by_id = {row["record_id"]: row for row in rows}
+    return ChangeSet(
+        version=rows[-1]["change_version"] if rows else since_version,
+        records=[record(by_id[record_id]) for record_id in upserted],
+        deleted=deleted,
+        has_more=has_more,
+    )
+
+
+def _term_rows(user_id: str, entry: JournalEntry) -> list[tuple[Any, ...]]:
+    terms = Counter(entry_terms(entry))
+    length = sum(terms.values())
+    created_at = to_micros(entry.created_at)
+    return [
+        (user_id, term, entry.id, frequency, length, created_at)
+        for term, frequency in terms.items()
+    ]
+
+
+def _insert_entries(
+    connection: sqlite3.Connection, user_id: str, entries: Sequence[JournalEntry]
+) -> None:
+    """Insert entries with their counters and search rows; the caller owns the transaction."""
+    if not entries:
+        return
+    created = [to_micros(entry.created_at) for entry in entries]
+    connection.executemany(
+        "INSERT INTO journal_entries"
+        " (id, user_id, title, content, mood, tags, created_at, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [_journal_row(user_id, entry) for entry in entries],
+    )
+    connection.execute(_UPSERT_JOURNAL_STATS, (user_id, len(entries), min(created), max(created)))
+    connection.executemany(_UPSERT_JOURNAL_COUNTER, _counter_rows(user_id, _journal_delta(entries)))
+    term_rows = [row for entry in entries for row in _term_rows(user_id, entry)]
+    connection.executemany(
+        "INSERT INTO journal_terms (user_id, term, entry_id, frequency, length, created_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        term_rows,
+    )
+    connection.execute(
+        _UPSERT_JOURNAL_COUNTER,
+        (user_id, "search", "tokens", sum(row[3] for row in term_rows)),
+    )
+    _log_changes(connection, user_id, "journal", [entry.id for entry in entries])
+
+
+def _mood_row(user_id: str, log: MoodLog) -> tuple[Any, ...]:
+    return (log.id, user_id, log.mood, log.intensity, log.notes, to_micros(log.recorded_at))
+
+
+def _bucket_rows(user_id: str, log: MoodLog) -> list[tuple[Any, ...]]:
+    return [
+        (user_id, granularity, start.isoformat(), log.intensity, log.mood, log.intensity)
+        for granularity, start in utc_bucket_starts(log.recorded_at)
+    ]
+
+
+def _slot_row(user_id: str, log: MoodLog) -> tuple[Any, ...]:
+    return (
+        user_id,
+        to_micros(slot_start(log.recorded_at)),
+        log.intensity,
+        log.mood,
+        log.intensity,
+    )
+
+
+def _insert_logs(connection: sqlite3.Connection, user_id: str, logs: Sequence[MoodLog]) -> None:
+    """Insert logs and fold them into the user's UTC buckets and slots."""
+    if not logs:
+        return
+    connection.executemany(
+        "INSERT INTO mood_logs (id, user_id, mood, intensity, notes, recorded_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        [_mood_row(user_id, log) for log in logs],
+    )
+    _log_changes(connection, user_id, "mood", [log.id for log in logs])
+    connection.executemany(
+        _UPSERT_MOOD_BUCKET, [row for log in logs for row in _bucket_rows(user_id, log)]
+    )
+    connection.executemany(_UPSERT_MOOD_SLOT, [_slot_row(user_id, log) for log in logs])
+
+
+def _mood_log(row: sqlite3.Row) -> MoodLog:
+    return MoodLog(
+        id=row["id"],
+        mood=row["mood"],
+        intensity=row["intensity"],
+        notes=row["notes"],
+        recorded_at=from_micros(row["recorded_at"]),
+    )
+
+
+class SQLiteJournalRepository(JournalRepository):
+    """Journal entries stored in SQLite."""
+
+    def __init__(self, database: SQLiteDatabase) -> None:
+        self._db = database
+
+    async def initialize(self) -> None:
+        await self._db.run(lambda connection: None)
+
+    async def add(self, user_id: str, entry: JournalEntry) -> None:
+        await self.add_many(user_id, [entry])
+
+    async def add_many(self, user_id: str, entries: Sequence[JournalEntry]) -> None:
+        if entries:
+            await self._db.run(lambda connection: _insert_entries(connection, user_id, entries))
+
+    async def add_new(self, user_id: str, entries: Sequence[JournalEntry]) -> list[bool]:
+        def _insert(connection: sqlite3.Connection) -> list[bool]:
+            stored = _fresh(connection, "journal_entries", [entry.id for entry in entries])
+            _insert_entries(
+                connection, user_id, [entry for entry, new in zip(entries, stored) if new]
+            )
+            return stored
+
+        return await self._db.run(_insert) if entries else []
+
+    async def list(self, user_id: str) -> list[JournalEntry]:
+        rows = await self._db.run(
+            lambda connection: connection.execute(
+                "SELECT * FROM journal_entries WHERE user_id = ? ORDER BY created_at, id",
+                (user_id,),
+            ).fetchall()
+        )
+        return [_journal_entry(row) for row in rows]
+
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_content: bool = True
+    ) -> list[JournalEntry] | list[JournalEntryPreview]:
+        columns = "*" if include_content else "id, title, mood, tags, created_at, updated_at"
+        clause, params = _page_clause("created_at", query)
+        rows = await self._db.run(
+            lambda connection: connection.execute(
+                f"SELECT {columns} FROM journal_entries WHERE user_id = ?{clause}",
+                [user_id, *params],
+            ).fetchall()
+        )
+        if include_content:
+            return [_journal_entry(row) for row in rows]
+        return [_journal_preview(row) for row in rows]
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[JournalEntry]:
+        return await self._db.run(
+            lambda connection: _select_changes(
+                connection,
+                user_id,
+                "journal",
+                "journal_entries",
+                "created_at",
+                since_version,
+                limit,
+                after,
+                _journal_entry,
+                entry_key,
+            )
+        )
+
+    async def stats(self, user_id: str, *, weeks: Sequence[date] = ()) -> JournalStats:
+        week_keys = [week.isoformat() for week in weeks]
+
+        def _select(connection: sqlite3.Connection) -> tuple[Any, list[sqlite3.Row]]:
+            totals = connection.execute(
+                "SELECT * FROM journal_stats WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            counters = connection.execute(
+                "SELECT kind, key, count FROM journal_counters"
+                " WHERE user_id = ? AND (kind IN ('mood', 'tag')"
+                f" OR (kind = 'week' AND key IN ({', '.join('?' * len(week_keys))})))",
+                (user_id, *week_keys),
+            ).fetchall()
+            return totals, counters
+
+        totals, counters = await self._db.run(_select)
+        if totals is None:
+            return JournalStats()
+        stats = JournalStats(
+            total_entries=totals["total_entries"],
+            first_entry_at=from_micros(totals["first_entry_at"]),
+            last_entry_at=from_micros(totals["last_entry_at"]),
+        )
+        for row in counters:
+            if row["kind"] == "mood":
+                stats.mood_counts[row["key"]] = row["count"]
+            elif row["kind"] == "tag":
+                stats.tag_counts[row["key"]] = row["count"]
+            else:
+                stats.weekly_counts[date.fromisoformat(row["key"])] = row["count"]
+        return stats
+
+    async def search(self, user_id: str, query: SearchQuery) -> list[SearchHit]:
+        terms = list(dict.fromkeys(tokenize(query.text)))
+        if not terms:
+            return []
+        tags = list(dict.fromkeys(query.tags))
+        term_list = ", ".join("?" * len(terms))
+
+        def _select(connection: sqlite3.Connection) -> list[tuple[sqlite3.Row, float]]:
+            totals = connection.execute(
+                "SELECT s.total_entries, c.count AS tokens FROM journal_stats s"
+                " JOIN journal_counters c ON c.user_id = s.user_id"
+                " AND c.kind = 'search' AND c.key = 'tokens'"
+                " WHERE s.user_id = ?",
+                (user_id,),
+            ).fetchone()
+            if totals is None or not totals["tokens"]:
+                return []
+            documents = totals["total_entries"]
+            # Term statistics are the user's own, over all their entries
+            # whatever the tag filter.
+            matching = connection.execute(
+                "SELECT term, COUNT(*) AS entries FROM journal_terms"
+                f" WHERE user_id = ? AND term IN ({term_list}) GROUP BY term",
+                (user_id, *terms),
+            ).fetchall()
+            if not matching:
+                return []
+            params: list[Any] = [
+                value for row in matching for value in (row["term"], idf(row["entries"], documents))
+            ]
+            params += [BM25_K1, BM25_K1, BM25_B, BM25_B, totals["tokens"] / documents, user_id]
+            tag_filter = ""
+            if tags:
+                tag_filter = (
+                    " WHERE (SELECT COUNT(DISTINCT tag.value) FROM journal_entries e,"
+                    " json_each(e.tags) AS tag WHERE e.id = p.entry_id"
+                    f" AND tag.value IN ({', '.join('?' * len(tags))})) = ?"
+                )
+                params += [*tags, len(tags)]
+            # Equal scores rank newer entries first, like InvertedIndex.search.
+            ranked = connection.execute(
+                "WITH weights (term, idf) AS (VALUES "
+                + ", ".join(["(?, ?)"] * len(matching))
+                + ") SELECT p.entry_id, MAX(p.created_at) AS created_at,"
+                " SUM(w.idf * p.frequency * (? + 1)"
+                " / (p.frequency + ? * (1 - ? + ? * p.length / ?))) AS score"
+                " FROM weights w JOIN journal_terms p ON p.user_id = ? AND p.term = w.term"
+                f"{tag_filter}"
+                " GROUP BY p.entry_id ORDER BY score DESC, created_at DESC LIMIT ? OFFSET ?",
+                [*params, query.limit, query.offset],
+            ).fetchall()
+            if not ranked:
+                return []
+            ids = [row["entry_id"] for row in ranked]
+            entries = {
+                row["id"]: row
+                for row in connection.execute(
+                    f"SELECT * FROM journal_entries WHERE id IN ({', '.join('?' * len(ids))})",
+                    ids,
+                )
+            }
+            return [(entries[row["entry_id"]], row["score"]) for row in ranked]
+
+        rows = await self._db.run(_select)
+        return [SearchHit(entry=_journal_entry(row), score=score) for row, score in rows]
+
+    async def clear(self) -> None:
+        def _clear(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM journal_entries")
+            connection.execute("DELETE FROM journal_stats")
+            connection.execute("DELETE FROM journal_counters")
+            connection.execute("DELETE FROM journal_terms")
+            connection.execute("DELETE FROM change_versions WHERE feed = 'journal'")
+            connection.execute("DELETE FROM record_changes WHERE feed = 'journal'")
+
+        await self._db.run(_clear)
+
+    async def close(self) -> None:
+        await self._db.close()
+
+
+class SQLiteMoodRepository(MoodRepository):
+    """Mood logs stored in SQLite."""
+
+    def __init__(self, database: SQLiteDatabase) -> None:
+        self._db = database
+
+    async def initialize(self) -> None:
+        await self._db.run(lambda connection: None)
+
+    async def add(self, user_id: str, log: MoodLog) -> None:
+        await self.add_many(user_id, [log])
+
+    async def add_many(self, user_id: str, logs: Sequence[MoodLog]) -> None:
+        if logs:
+            await self._db.run(lambda connection: _insert_logs(connection, user_id, logs))
+
+    async def add_new(self, user_id: str, logs: Sequence[MoodLog]) -> list[bool]:
+        def _insert(connection: sqlite3.Connection) -> list[bool]:
+            stored = _fresh(connection, "mood_logs", [log.id for log in logs])
+            _insert_logs(connection, user_id, [log for log, new in zip(logs, stored) if new])
+            return stored
+
+        return await self._db.run(_insert) if logs else []
+
+    async def list(self, user_id: str) -> list[MoodLog]:
+        rows = await self._db.run(
+            lambda connection: connection.execute(
+                "SELECT * FROM mood_logs WHERE user_id = ? ORDER BY recorded_at, id",
+                (user_id,),
+            ).fetchall()
+        )
+        return [_mood_log(row) for row in rows]
+
+    async def page(
+        self, user_id: str, query: PageQuery, *, include_notes: bool = True
+    ) -> list[MoodLog]:
+        columns = "id, mood, intensity, recorded_at" + (", notes" if include_notes else ", NULL AS notes")
+        clause, params = _page_clause("recorded_at", query)
+        rows = await self._db.run(
+            lambda connection: connection.execute(
+                f"SELECT {columns} FROM mood_logs WHERE user_id = ?{clause}",
+                [user_id, *params],
+            ).fetchall()
+        )
+        return [_mood_log(row) for row in rows]
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> ChangeSet[MoodLog]:
+        return await self._db.run(
+            lambda connection: _select_changes(
+                connection,
+                user_id,
+                "mood",
+                "mood_logs",
+                "recorded_at",
+                since_version,
+                limit,
+                after,
+                _mood_log,
+                log_key,
+            )
+        )
+
+    async def buckets(
+        self,
+        user_id: str,
+        granularity: Granularity,
+        *,
+        since: date | None = None,
+        zone: str = DEFAULT_ZONE,
+    ) -> list[MoodBucket]:
+        if zone == DEFAULT_ZONE:
+            return await self._utc_buckets(user_id, granularity, since)
+        days = await self._utc_buckets(
+            user_id, "day", first_utc_day(since) if since is not None else None
+        )
+        fold = ZoneFold(days, granularity, zone, since=since)
+        spans = [(to_micros(low), to_micros(high)) for low, high in fold.slot_spans]
+
+        def _slots(connection: sqlite3.Connection) -> list[sqlite3.Row]:
+            rows: list[sqlite3.Row] = []
+            for low, high in spans:
+                rows += connection.execute(
+                    "SELECT slot_start, total, count, dominant_mood, dominant_intensity"
+                    " FROM mood_slots WHERE user_id = ? AND slot_start >= ? AND slot_start < ?"
+                    " ORDER BY slot_start",
+                    (user_id, low, high),
+                ).fetchall()
+            return rows
+
+        rows = await self._db.run(_slots) if spans else []
+        return fold.fold(
+            [
+                MoodSlot(
+                    start=from_micros(row["slot_start"]),
+                    total=row["total"],
+                    count=row["count"],
+                    dominant_mood=row["dominant_mood"],
+                    dominant_intensity=row["dominant_intensity"],
+                )
+                for row in rows
+            ]
+        )
+
+    async def _utc_buckets(
+        self, user_id: str, granularity: Granularity, since: date | None
+    ) -> list[MoodBucket]:
+        rows = await self._db.run(
+            lambda connection: connection.execute(
+                "SELECT bucket_start, total, count, dominant_mood, dominant_intensity"
+                " FROM mood_buckets WHERE user_id = ? AND granularity = ? AND bucket_start >= ?"
+                " ORDER BY bucket_start",
+                (user_id, granularity, since.isoformat() if since is not None else ""),
+            ).fetchall()
+        )
+        return [
+            MoodBucket(
+                start=date.fromisoformat(row["bucket_start"]),
+                total=row["total"],
+                count=row["count"],
+                dominant_mood=row["dominant_mood"],
+                dominant_intensity=row["dominant_intensity"],
+            )
+            for row in rows
+        ]
+
+    async def clear(self) -> None:
+        def _clear(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM mood_logs")
+            connection.execute("DELETE FROM mood_buckets")
+            connection.execute("DELETE FROM mood_slots")
+            connection.execute("DELETE FROM change_versions WHERE feed = 'mood'")
+            connection.execute("DELETE FROM record_changes WHERE feed = 'mood'")
+
+        await self._db.run(_clear)
+
+    async def close(self) -> None:
+        await self._db.close()
@@ -0,0 +1,47 @@
+"""Schemas shared by bulk ingestion endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# Client clocks drift; timestamps further ahead than this are rejected.
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+IdempotencyKey = Field(
+    default=None,
+    min_length=1,
+    max_length=128,
+    description="Retrying an item with the same key stores it only once",
+)
+
+
+def check_not_future(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive timestamps as UTC and reject ones from the future."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if value > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+        raise ValueError("timestamp is in the future")
+    return value
+
+
+class BulkItemResult(BaseModel):
+    """Outcome for one item of a bulk upload, by position in the request."""
+
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    id: Optional[str] = None
+    errors: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class BulkResult(BaseModel):
+    """Per-item outcomes of a bulk upload plus totals."""
+
+    created: int
+    duplicates: int
+    invalid: int
+    items: list[BulkItemResult]
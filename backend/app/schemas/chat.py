@@ -34,12 +34,18 @@ class CopingSuggestion(BaseModel):
 
 
 class ChatRequest(BaseModel):
-    """Incoming chat request payload."""
+    """Incoming chat request payload.
+
+    Without ``session_id`` the client sends the full transcript each turn.
+    With it, ``messages`` holds only the new messages and the server appends
+    them to the stored transcript for that session.
+    """
 
     messages: list[ChatMessage]
     locale: str = "en-US"
     timezone: Optional[str] = None
     user_id: Optional[str] = None
+    session_id: Optional[str] = Field(default=None, min_length=1, max_length=128)
 
 
 class ChatResponse(BaseModel):
@@ -49,3 +55,24 @@ class ChatResponse(BaseModel):
     emotions: list[EmotionEstimate] = Field(default_factory=list)
     suggestions: list[CopingSuggestion] = Field(default_factory=list)
     safety: Optional[SafetyCheckResult] = None
+    session_id: Optional[str] = None
+
+
+class ChatTranscript(BaseModel):
+    """Stored transcript of a server-side chat session."""
+
+    session_id: str
+    messages: list[ChatMessage]
+
+
+class ChatStreamDelta(BaseModel):
+    """Partial reply text emitted while the model is still generating."""
+
+    type: Literal["delta"] = "delta"
+    content: str
+
+
+class ChatStreamTrailer(ChatResponse):
+    """Final frame of a streamed reply carrying the full turn analysis."""
+
+    type: Literal["final"] = "final"
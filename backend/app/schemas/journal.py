@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from .bulk import IdempotencyKey, check_not_future
 
 
 class JournalEntryCreate(BaseModel):
@@ -17,6 +19,17 @@ class JournalEntryCreate(BaseModel):
     tags: list[str] = Field(default_factory=list, max_length=8)
 
 
+class JournalEntryImport(JournalEntryCreate):
+    """A journal entry uploaded in bulk, e.g. by offline sync or a migration."""
+
+    created_at: Optional[datetime] = Field(
+        default=None, description="When the entry was written; defaults to now"
+    )
+    idempotency_key: Optional[str] = IdempotencyKey
+
+    _check_created_at = field_validator("created_at")(check_not_future)
+
+
 class JournalEntry(JournalEntryCreate):
     """A stored journal entry."""
 
@@ -25,8 +38,52 @@ class JournalEntry(JournalEntryCreate):
     updated_at: datetime
 
 
+class JournalEntryPreview(BaseModel):
+    """A stored journal entry without its content, for lightweight listings."""
+
+    id: str
+    title: Optional[str] = None
+    mood: Optional[str] = None
+    tags: list[str] = Field(default_factory=list)
+    created_at: datetime
+    updated_at: datetime
+
+
+class JournalSearchHit(JournalEntry):
+    """A journal entry matched by a search, with its relevance score."""
+
+    score: float
+
+
+class WeeklyEntryCount(BaseModel):
+    """Number of entries written in one ISO week (starting Monday, UTC)."""
+
+    week_start: date
+    count: int
+
+
 class JournalSummary(BaseModel):
     """Aggregate view of journal activity."""
 
     total_entries: int
     mood_counts: dict[str, int]
+    tag_counts: dict[str, int] = Field(default_factory=dict)
+    entries_per_week: list[WeeklyEntryCount] = Field(default_factory=list)
+    first_entry_at: Optional[datetime] = None
+    last_entry_at: Optional[datetime] = None
+
+
+class JournalChanges(BaseModel):
+    """Entries written since a client's last sync, for incremental refreshes."""
+
+    version: int = Field(description="Pass back as since_version on the next sync")
+    full: bool = Field(
+        default=False,
+        description="First page of the whole journal; replace the local copy with it",
+    )
+    has_more: bool = Field(default=False, description="More changes follow; sync again")
+    cursor: Optional[str] = Field(
+        default=None, description="Pass back with since_version to continue a full sync"
+    )
+    entries: list[JournalEntry] = Field(default_factory=list)
+    deleted: list[str] = Field(default_factory=list, description="Ids of removed entries")
@@ -5,7 +5,9 @@ from __future__ import annotations
 from datetime import date, datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from .bulk import IdempotencyKey, check_not_future
 
 
 class MoodLogCreate(BaseModel):
@@ -16,6 +18,17 @@ class MoodLogCreate(BaseModel):
     notes: Optional[str] = Field(default=None, max_length=500)
 
 
+class MoodLogImport(MoodLogCreate):
+    """A mood log uploaded in bulk, e.g. by offline sync or a migration."""
+
+    recorded_at: Optional[datetime] = Field(
+        default=None, description="When the mood was felt; defaults to now"
+    )
+    idempotency_key: Optional[str] = IdempotencyKey
+
+    _check_recorded_at = field_validator("recorded_at")(check_not_future)
+
+
 class MoodLog(MoodLogCreate):
     """A persisted mood log entry."""
 
@@ -23,9 +36,24 @@ class MoodLog(MoodLogCreate):
     recorded_at: datetime
 
 
+class MoodChanges(BaseModel):
+    """Mood logs written since a client's last sync; see ``JournalChanges``."""
+
+    version: int
+    full: bool = False
+    has_more: bool = False
+    cursor: Optional[str] = None
+    logs: list[MoodLog] = Field(default_factory=list)
+    deleted: list[str] = Field(default_factory=list)
+
+
 class MoodTrendPoint(BaseModel):
-    """Aggregated mood data point for charting."""
+    """Aggregated mood data point for charting.
+
+    ``date`` is the first day of the day, week or month the point covers.
+    """
 
     date: date
     average_intensity: float
     dominant_mood: Optional[str] = None
+    count: int = 0
@@ -24,3 +24,25 @@ class SafetyCheckResult(BaseModel):
     recommended_actions: list[str] = Field(default_factory=list)
     hotline: Optional[str] = None
     evaluated_at: datetime
+
+
+class SafetyBatchItem(BaseModel):
+    """One text in a batch screening request."""
+
+    id: Optional[str] = Field(None, max_length=256, description="Echoed back on the result")
+    text: str = Field(..., min_length=1)
+    locale: Optional[str] = Field(None, description="Overrides the batch locale")
+
+
+class SafetyBatchRequest(BaseModel):
+    """Batch screening request sent as a single JSON document."""
+
+    items: list[SafetyBatchItem] = Field(..., min_length=1)
+    locale: str = "en-US"
+
+
+class SafetyBatchResult(SafetyCheckResult):
+    """Safety result for one batch item, streamed in input order."""
+
+    index: int
+    id: Optional[str] = None
@@ -0,0 +1,114 @@
+"""In-process reply cache for repeated conversation prompts."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from ..core.config import Settings
+
+# Rough per-entry bookkeeping cost (key tuple, digest, entry object) counted
+# against ``max_bytes`` on top of the encoded reply itself.
+ENTRY_OVERHEAD_BYTES = 160
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    reply: str
+    size: int
+    expires_at: float
+
+
+class ReplyCache:
+    """TTL + LRU cache of model replies keyed by locale and prompt digest.
+
+    Prompts are normalised (case-folded, whitespace collapsed) and hashed so
+    keys stay small regardless of transcript length. Entries are partitioned
+    by locale so a reply is only ever served back to the same locale.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(locale: str, prompt: str) -> tuple[str, str]:
+        normalized = " ".join(prompt.casefold().split())
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+        return locale.lower(), digest
+
+    def get(self, locale: str, prompt: str) -> str | None:
+        key = self.make_key(locale, prompt)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.reply
+
+    def set(self, locale: str, prompt: str, reply: str) -> None:
+        key = self.make_key(locale, prompt)
+        size = len(reply.encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        if size > self._max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _CacheEntry(reply=reply, size=size, expires_at=self._clock() + self._ttl)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+def build_reply_cache(config: Settings) -> ReplyCache | None:
+    """Return a reply cache when ``REPLY_CACHE_ENABLED`` is set."""
+    if not config.reply_cache_enabled:
+        return None
+    return ReplyCache(
+        ttl_seconds=config.reply_cache_ttl_seconds,
+        max_entries=config.reply_cache_max_entries,
+        max_bytes=config.reply_cache_max_bytes,
+    )
@@ -0,0 +1,172 @@
+"""Token-budget-aware prompt windowing for long conversations."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from ..core.config import settings
+from ..schemas.chat import ChatMessage
+from .session_state import DigestChain
+
+# English prose averages roughly four characters per token across the Gemini
+# and OpenAI tokenizers; the estimate only has to be conservative, not exact.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+SNIPPET_MAX_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheaply estimate how many model tokens ``text`` will use."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _message_tokens(message: ChatMessage) -> int:
+    return estimate_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _snippet(message: ChatMessage) -> str | None:
+    """Extract the first sentence of a user message for the running summary."""
+    if message.role != "user":
+        return None
+    first_sentence = _SENTENCE_END.split(message.content.strip(), maxsplit=1)[0]
+    if len(first_sentence) > SNIPPET_MAX_CHARS:
+        first_sentence = first_sentence[: SNIPPET_MAX_CHARS - 3].rstrip() + "..."
+    return first_sentence
+
+
+@dataclass(slots=True)
+class ContextWindow:
+    """Messages that fit the prompt budget plus a summary of older turns."""
+
+    messages: list[ChatMessage]
+    summary: str | None = None
+
+
+@dataclass(slots=True)
+class _SummaryMemo:
+    dropped: DigestChain
+    snippets: list[str] = field(default_factory=list)
+
+
+class ContextWindowManager:
+    """Fit transcripts into a token budget before the model is called.
+
+    The newest turns are kept verbatim. Older turns are folded into a short
+    extractive summary of what the user said, bounded by its own budget.
+    Summaries are memoised per session and extended incrementally, so a
+    transcript prefix is never summarised twice, nor re-read to check that
+    the memo still applies.
+    """
+
+    def __init__(
+        self,
+        *,
+        token_budget: int,
+        summary_token_budget: int,
+        max_sessions: int,
+    ) -> None:
+        self._token_budget = token_budget
+        self._summary_budget = summary_token_budget
+        self._max_sessions = max_sessions
+        self._memos: OrderedDict[str, _SummaryMemo] = OrderedDict()
+        self.windows_trimmed = 0
+        self.summaries_reused = 0
+
+    def fit(
+        self,
+        session_key: str | None,
+        messages: Sequence[ChatMessage],
+        *,
+        reserved_tokens: int = 0,
+    ) -> ContextWindow:
+        """Return the recent messages that fit, summarising anything older.
+
+        ``reserved_tokens`` covers fixed prompt parts such as the system prompt.
+        """
+        available = self._token_budget - reserved_tokens
+        kept = 0
+        used = 0
+        for message in reversed(messages):
+            cost = _message_tokens(message)
+            # Always keep the latest message, even when it alone is over budget.
+            if kept and used + cost > available - self._summary_budget:
+                break
+            used += cost
+            kept += 1
+
+        if kept == len(messages):
+            return ContextWindow(messages=list(messages))
+
+        self.windows_trimmed += 1
+        dropped = len(messages) - kept
+        snippets = self._summarise(session_key, messages, dropped)
+        return ContextWindow(
+            messages=list(messages[dropped:]),
+            summary=self._render(snippets),
+        )
+
+    def clear(self) -> None:
+        self._memos.clear()
+        self.windows_trimmed = 0
+        self.summaries_reused = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "sessions": len(self._memos),
+            "windows_trimmed": self.windows_trimmed,
+            "summaries_reused": self.summaries_reused,
+        }
+
+    def _summarise(
+        self, session_key: str | None, messages: Sequence[ChatMessage], dropped: int
+    ) -> list[str]:
+        memo = self._memos.get(session_key) if session_key else None
+
+        chain = DigestChain()
+        snippets: list[str] = []
+        # Only the last message the memo covers is re-hashed, whatever the history length.
+        if (
+            memo is not None
+            and 0 < memo.dropped.count <= dropped
+            and memo.dropped.ends_with(messages[memo.dropped.count - 1].content)
+        ):
+            chain = memo.dropped
+            snippets = memo.snippets
+            self.summaries_reused += 1
+
+        newly_dropped = messages[chain.count:dropped]
+        for message in newly_dropped:
+            snippet = _snippet(message)
+            if snippet:
+                snippets.append(snippet)
+        chain.extend(message.content for message in newly_dropped)
+
+        # Keep the most recent snippets when the summary outgrows its budget.
+        while snippets and estimate_tokens(self._render(snippets)) > self._summary_budget:
+            snippets.pop(0)
+
+        if session_key:
+            self._memos[session_key] = _SummaryMemo(dropped=chain, snippets=snippets)
+            self._memos.move_to_end(session_key)
+            while len(self._memos) > self._max_sessions:
+                self._memos.popitem(last=False)
+        return list(snippets)
+
+    @staticmethod
+    def _render(snippets: list[str]) -> str | None:
+        if not snippets:
+            return None
+        return "Earlier in this conversation the user said: " + " | ".join(snippets)
+
+
+context_window_manager = ContextWindowManager(
+    token_budget=settings.llm_context_token_budget,
+    summary_token_budget=settings.llm_summary_token_budget,
+    max_sessions=settings.session_state_max_sessions,
+)
@@ -4,14 +4,28 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Iterable, Sequence
-
-import google.generativeai as genai  # type: ignore[import]
+from typing import Any, AsyncIterator, Iterable, Sequence
 
 from ..core.config import settings
-from ..schemas.chat import ChatMessage, ChatRequest, ChatResponse
+from ..schemas.chat import (
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    ChatStreamDelta,
+    ChatStreamTrailer,
+    EmotionEstimate,
+)
+from ..schemas.safety import SafetyCheckResult
+from .cache import ReplyCache, build_reply_cache
+from .context import ContextWindowManager, context_window_manager, estimate_tokens
 from .emotion import emotion_service
+from .llm import LLMClient
+from .retrieval import Memory, MemoryStore, memory_store
+from .resilience import CircuitOpenError, build_guarded_provider
 from .safety import safety_service
+from .session_state import SessionAnalysisStore, session_analysis_store
+from .sessions import SessionStore, session_store
+from .singleflight import SingleFlight, payload_key
 from .suggestions import suggestion_service
 
 LOGGER = logging.getLogger(__name__)
@@ -27,133 +41,325 @@ Your role is to:
 
 Remember: You're not a therapist, but a supportive companion. Be genuine, kind, and present."""
 
+SYSTEM_PROMPT_TOKENS = estimate_tokens(SYSTEM_PROMPT)
+
+MEMORY_HEADER = "Things the user shared before that may be relevant:"
+
+
+async def _next_chunk(chunks: AsyncIterator[str]) -> str | None:
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
 
 class ConversationService:
     """Handle chat orchestration across safety and emotion services."""
 
-    def __init__(self) -> None:
-        self._model = None
-        self._model_name = "models/gemini-2.5-pro"
-        if settings.gemini_api_key:
-            try:
-                genai.configure(api_key=settings.gemini_api_key)
-                self._model = genai.GenerativeModel(
-                    self._model_name,
-                    generation_config={
-                        "temperature": 0.7,
-                        "top_p": 0.95,
-                        "top_k": 40,
-                        "max_output_tokens": 1024,
-                    },
-                )
-            except Exception as exc:  # noqa: BLE001
-                LOGGER.error("Failed to initialise Gemini model %s: %s", self._model_name, exc)
-                self._model = None
-
-    async def _call_gemini(self, messages: Iterable[ChatMessage]) -> str | None:
-        """Call Google Gemini API for conversational responses."""
-        if not self._model:
-            LOGGER.info("No Gemini API key configured, using fallback")
-            return None
+    def __init__(
+        self,
+        provider: LLMClient | None = None,
+        reply_cache: ReplyCache | None = None,
+        analysis_store: SessionAnalysisStore | None = None,
+        sessions: SessionStore | None = None,
+        context: ContextWindowManager | None = None,
+        memory: MemoryStore | None = None,
+        single_flight: SingleFlight | None = None,
+    ) -> None:
+        self._provider = provider or build_guarded_provider(settings)
+        self._reply_cache = reply_cache or build_reply_cache(settings)
+        self._analysis = analysis_store or session_analysis_store
+        self._sessions = sessions or session_store
+        self._context = context or context_window_manager
+        self._memory = memory or memory_store
+        self._single_flight = single_flight or SingleFlight(enabled=settings.single_flight_enabled)
+        self.cancelled_llm_calls = 0
+
+    @property
+    def sessions(self) -> SessionStore:
+        return self._sessions
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        return self._single_flight
+
+    def metrics(self) -> dict[str, object]:
+        return {
+            "llm": self._provider.stats() if self._provider else None,
+            "reply_cache": self._reply_cache.stats() if self._reply_cache else None,
+            "session_analysis": self._analysis.stats(),
+            "safety": safety_service.stats(),
+            "context_window": self._context.stats(),
+            "memory": self._memory.stats() if self._memory else None,
+            "cancelled_llm_calls": self.cancelled_llm_calls,
+        }
+
+    async def aclose(self) -> None:
+        if self._provider:
+            await self._provider.aclose()
+        await self._sessions.aclose()
+        if self._memory:
+            await self._memory.aclose()
+
+    def _prepare_prompt(
+        self,
+        messages: Iterable[ChatMessage],
+        session_key: str | None,
+        memories: Sequence[Memory] = (),
+    ) -> str:
+        """Build the prompt, trimming and summarising history to fit the budget."""
+        recalled = self._render_memories(memories)
+        reserved = SYSTEM_PROMPT_TOKENS + (estimate_tokens(recalled) if recalled else 0)
+        window = self._context.fit(session_key, list(messages), reserved_tokens=reserved)
+        return self._build_conversation_text(
+            window.messages, summary=window.summary, memories=recalled
+        )
 
+    async def _recall(self, request: ChatRequest, user_messages: list[ChatMessage]) -> list[Memory]:
+        """Fetch the user's most relevant earlier journal entries and chat turns.
+
+        Memories already present in the transcript are left out, and a failing
+        memory backend never blocks the reply.
+        """
+        if not self._memory or not request.user_id or not user_messages:
+            return []
         try:
-            message_list = list(messages)
-            attempts: list[Sequence[ChatMessage]] = [message_list]
-            if len(message_list) > 4:
-                attempts.append(message_list[-4:])
-
-            finish_reasons: list[str | None] = []
-            for attempt_index, attempt_messages in enumerate(attempts):
-                conversation_text = self._build_conversation_text(attempt_messages)
-
-                LOGGER.info(
-                    "Calling Gemini API with %s messages (attempt %s)",
-                    len(attempt_messages),
-                    attempt_index + 1,
-                )
-
-                response = await asyncio.to_thread(self._model.generate_content, conversation_text)
-
-                reply_text, finish_reason = self._extract_response_text(response)
-                finish_reasons.append(finish_reason)
-
-                if reply_text:
-                    LOGGER.info(
-                        "Gemini response received (finish_reason=%s): %s...",
-                        finish_reason or "unknown",
-                        reply_text[:100],
-                    )
-                    return reply_text
-
-                if (
-                    attempt_index == 0
-                    and finish_reason
-                    and (
-                        "MAX_TOKENS" in finish_reason.upper()
-                        or finish_reason.upper() == "2"
-                    )
-                    and len(attempts) > 1
-                ):
-                    LOGGER.warning(
-                        "Gemini returned finish_reason=%s; retrying with a shorter context",
-                        finish_reason,
-                    )
-                    continue
-
-                if getattr(response, "prompt_feedback", None):
-                    LOGGER.warning(
-                        "Gemini prompt feedback: %s",
-                        getattr(response.prompt_feedback, "block_reason", response.prompt_feedback),
-                    )
-
-                LOGGER.warning(
-                    "Gemini response was empty or blocked (finish_reason=%s)", finish_reason
-                )
-                return None
-
-            LOGGER.warning(
-                "Gemini response returned no usable text after %s attempts (finish_reasons=%s)",
-                len(attempts),
-                finish_reasons,
+            memories = await self._memory.recall(
+                request.user_id,
+                user_messages[-1].content,
+                top_k=settings.memory_top_k,
+                min_score=settings.memory_min_score,
             )
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.error("Memory recall failed: %s", exc)
+            return []
+        in_transcript = {message.content.strip() for message in request.messages}
+        return [memory for memory in memories if memory.text not in in_transcript]
+
+    async def _remember_turn(self, request: ChatRequest, safety: SafetyCheckResult | None) -> None:
+        """Remember what the user said this turn; crisis turns are never stored.
+
+        Only the latest user message is new: earlier ones in a client-sent
+        transcript were remembered on their own turns.
+        """
+        if not self._memory or not request.user_id or (safety and safety.crisis_detected):
+            return
+        latest = next(
+            (message for message in reversed(request.messages) if message.role == "user"), None
+        )
+        if latest is None:
+            return
+        try:
+            await self._memory.remember(request.user_id, [latest.content], kind="chat")
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.error("Storing chat memory failed: %s", exc)
+
+    async def _draft_llm(
+        self,
+        messages: Iterable[ChatMessage],
+        *,
+        locale: str,
+        session_key: str | None = None,
+        memories: Sequence[Memory] = (),
+    ) -> tuple[str, str | None, bool]:
+        """Return the prompt, the model's reply and whether it came from the cache.
+
+        Nothing is cached here: a draft can still be discarded by the safety
+        check, and crisis replies must never reach the reply cache.
+        """
+        prompt = self._prepare_prompt(messages, session_key, memories)
+        if self._reply_cache:
+            cached = self._reply_cache.get(locale, prompt)
+            if cached is not None:
+                return prompt, cached, True
+        return prompt, await self._generate_llm(prompt), False
+
+    def _cache_reply(self, locale: str, prompt: str, reply: str) -> None:
+        if self._reply_cache:
+            self._reply_cache.set(locale, prompt, reply)
+
+    async def _generate_llm(self, prompt: str) -> str | None:
+        provider = self._provider.name
+        try:
+            LOGGER.info("Calling %s (~%s prompt tokens)", provider, estimate_tokens(prompt))
+            result = await self._provider.generate(prompt)
+        except CircuitOpenError:
             return None
-
         except Exception as exc:  # noqa: BLE001
-            LOGGER.error("Gemini call failed: %s", exc)
+            LOGGER.error("%s call failed: %s", provider, exc)
             return None
 
+        if result.text:
+            LOGGER.info(
+                "%s response received (finish_reason=%s): %s...",
+                provider,
+                result.finish_reason or "unknown",
+                result.text[:100],
+            )
+            return result.text
+
+        if result.block_reason:
+            LOGGER.warning("%s prompt feedback: %s", provider, result.block_reason)
+
+        LOGGER.warning(
+            "%s response was empty or blocked (finish_reason=%s)", provider, result.finish_reason
+        )
+        return None
+
+    async def _stream_llm(
+        self,
+        messages: Iterable[ChatMessage],
+        *,
+        locale: str,
+        session_key: str | None = None,
+        memories: Sequence[Memory] = (),
+    ) -> AsyncIterator[str]:
+        """Yield reply text from the LLM provider chunk by chunk as it is generated."""
+        if not self._provider:
+            return
+
+        prompt = self._prepare_prompt(messages, session_key, memories)
+        if self._reply_cache:
+            cached = self._reply_cache.get(locale, prompt)
+            if cached is not None:
+                yield cached
+                return
+
+        LOGGER.info(
+            "Streaming %s (~%s prompt tokens)", self._provider.name, estimate_tokens(prompt)
+        )
+
+        parts: list[str] = []
+        try:
+            async for text in self._provider.stream(prompt):
+                parts.append(text)
+                yield text
+        except CircuitOpenError:
+            return
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.error("%s streaming call failed: %s", self._provider.name, exc)
+            return
+
+        reply = "".join(parts).strip()
+        if reply and self._reply_cache:
+            self._reply_cache.set(locale, prompt, reply)
+
+    def _analyse_turn(
+        self, request: ChatRequest, user_messages: list[ChatMessage]
+    ) -> tuple[SafetyCheckResult, list[EmotionEstimate]]:
+        """Run safety and emotion analysis, reusing the session's running state."""
+        analysis = self._analysis.analyse(
+            request.session_id or request.user_id,
+            [message.content for message in user_messages],
+        )
+        safety = safety_service.build_result(analysis.categories, locale=request.locale)
+        emotions = emotion_service.estimate_from_scores(analysis.emotion_scores)
+        return safety, emotions
+
     async def generate_reply(self, request: ChatRequest) -> ChatResponse:
+        """Answer a turn; identical requests already in flight share one answer.
+
+        Clients retrying on flaky networks resend the same payload, and the
+        duplicate waits for the first turn rather than calling the model and
+        appending to the session again.
+        """
+        return await self._single_flight.do(
+            payload_key(request), lambda: self._generate_reply(request)
+        )
+
+    async def _generate_reply(self, request: ChatRequest) -> ChatResponse:
+        turn = await self._with_transcript(request)
+        response = await self._respond(turn)
+        await self._record_turn(request, response.reply)
+        await self._remember_turn(request, response.safety)
+        response.session_id = request.session_id
+        return response
+
+    async def _draft_turn(
+        self, request: ChatRequest, user_messages: list[ChatMessage]
+    ) -> tuple[str, str | None, bool]:
+        return await self._draft_llm(
+            request.messages,
+            locale=request.locale,
+            session_key=request.session_id or request.user_id,
+            memories=await self._recall(request, user_messages),
+        )
+
+    async def _stream_turn(
+        self, request: ChatRequest, user_messages: list[ChatMessage]
+    ) -> AsyncIterator[str]:
+        memories = await self._recall(request, user_messages)
+        async for text in self._stream_llm(
+            request.messages,
+            locale=request.locale,
+            session_key=request.session_id or request.user_id,
+            memories=memories,
+        ):
+            yield text
+
+    async def _analyse_concurrently(
+        self, request: ChatRequest, user_messages: list[ChatMessage], llm_call: asyncio.Future[Any]
+    ) -> tuple[SafetyCheckResult, list[EmotionEstimate]]:
+        """Analyse the turn inline once ``llm_call`` has been started.
+
+        Yielding to the loop first lets the model call run up to its first
+        wait, so its request is in flight while the analysis runs. The
+        analysis stays out of the shared thread pool, where it would queue
+        behind other work under load. The model call is cancelled when the
+        turn is a crisis, or when the analysis itself fails or is cancelled.
+        """
+        try:
+            await asyncio.sleep(0)
+            safety, emotions = self._analyse_turn(request, user_messages)
+        except BaseException:
+            llm_call.cancel()
+            raise
+        if safety.crisis_detected:
+            await self._cancel(llm_call)
+        return safety, emotions
+
+    async def _cancel(self, llm_call: asyncio.Future[Any]) -> None:
+        """Cancel an in-flight model call and wait until it has unwound."""
+        if llm_call.cancel():
+            self.cancelled_llm_calls += 1
+        await asyncio.wait({llm_call})
+        if not llm_call.cancelled():
+            llm_call.exception()
+
+    async def _respond(self, request: ChatRequest) -> ChatResponse:
+        """Send the model request first and analyse the turn while it is in flight.
+
+        Safety and emotion analysis run while the model call is in flight.
+        A crisis verdict cancels the model call, and a reply is only
+        cached once the turn is known not to be a crisis.
+        """
         user_messages = [message for message in request.messages if message.role == "user"]
         assistant_messages = [
             message for message in request.messages if message.role == "assistant"
         ]
 
-        safety = safety_service.evaluate_messages(
-            [message.content for message in user_messages], locale=request.locale
-        )
+        draft: asyncio.Task[tuple[str, str | None, bool]] | None = None
+        if self._provider:
+            draft = asyncio.create_task(self._draft_turn(request, user_messages))
+        if draft:
+            safety, emotions = await self._analyse_concurrently(request, user_messages, draft)
+        else:
+            safety, emotions = self._analyse_turn(request, user_messages)
+        suggestions = suggestion_service.suggest(emotions)
 
         if safety.crisis_detected:
-            crisis_message = (
-                "I'm deeply concerned for your safety. "
-                "I recommend contacting {hotline} or local emergency services immediately. "
-                "Please reach out to someone you trust right away."
-            ).format(hotline=safety.hotline or "a crisis hotline")
-            reply = ChatMessage(role="assistant", content=crisis_message)
-            emotions = emotion_service.estimate(
-                [message.content for message in user_messages]
-            )
-            suggestions = suggestion_service.suggest(emotions)
+            reply = ChatMessage(role="assistant", content=self._crisis_reply(safety.hotline))
             return ChatResponse(reply=reply, emotions=emotions, suggestions=suggestions, safety=safety)
 
-        ai_reply = await self._call_gemini(request.messages)
+        ai_reply = None
+        if draft:
+            prompt, ai_reply, cached = await draft
+            if ai_reply and not cached:
+                self._cache_reply(request.locale, prompt, ai_reply)
         if not ai_reply:
             ai_reply = self._fallback_reply(user_messages, assistant_messages)
 
         assistant_message = ChatMessage(role="assistant", content=ai_reply)
-        emotions = emotion_service.estimate(
-            [message.content for message in user_messages]
-        )
-        suggestions = suggestion_service.suggest(emotions)
         return ChatResponse(
             reply=assistant_message,
             emotions=emotions,
@@ -161,9 +367,103 @@ class ConversationService:
             safety=safety,
         )
 
+    async def stream_reply(
+        self, request: ChatRequest
+    ) -> AsyncIterator[ChatStreamDelta | ChatStreamTrailer]:
+        """Stream a conversational turn as reply deltas followed by a trailer frame.
+
+        The model request starts while the turn is analysed, but no model
+        output is forwarded before the safety check passes, so a crisis turn
+        never streams generated text; its model call is cancelled instead.
+        """
+        turn = await self._with_transcript(request)
+        user_messages = [message for message in turn.messages if message.role == "user"]
+        assistant_messages = [
+            message for message in turn.messages if message.role == "assistant"
+        ]
+
+        chunks = self._stream_turn(turn, user_messages)
+        first = asyncio.ensure_future(_next_chunk(chunks))
+        safety, emotions = await self._analyse_concurrently(turn, user_messages, first)
+
+        if safety.crisis_detected:
+            await chunks.aclose()
+            reply_text = self._crisis_reply(safety.hotline)
+            yield ChatStreamDelta(content=reply_text)
+        else:
+            parts: list[str] = []
+            text = await first
+            if text is not None:
+                parts.append(text)
+                yield ChatStreamDelta(content=text)
+                async for text in chunks:
+                    parts.append(text)
+                    yield ChatStreamDelta(content=text)
+
+            reply_text = "".join(parts).strip()
+            if not reply_text:
+                reply_text = self._fallback_reply(user_messages, assistant_messages)
+                yield ChatStreamDelta(content=reply_text)
+
+        reply = ChatMessage(role="assistant", content=reply_text)
+        await self._record_turn(request, reply)
+        await self._remember_turn(request, safety)
+        yield ChatStreamTrailer(
+            reply=reply,
+            emotions=emotions,
+            suggestions=suggestion_service.suggest(emotions),
+            safety=safety,
+            session_id=request.session_id,
+        )
+
+    async def _with_transcript(self, request: ChatRequest) -> ChatRequest:
+        """Prepend the stored transcript when the request names a session."""
+        if not request.session_id:
+            return request
+        history = await self._sessions.load(request.session_id)
+        if not history:
+            return request
+        return request.model_copy(update={"messages": [*history, *request.messages]})
+
+    async def _record_turn(self, request: ChatRequest, reply: ChatMessage) -> None:
+        if request.session_id:
+            await self._sessions.append(request.session_id, [*request.messages, reply])
+
+    @staticmethod
+    def _crisis_reply(hotline: str | None) -> str:
+        return (
+            "I'm deeply concerned for your safety. "
+            "I recommend contacting {hotline} or local emergency services immediately. "
+            "Please reach out to someone you trust right away."
+        ).format(hotline=hotline or "a crisis hotline")
+
     @staticmethod
-    def _build_conversation_text(messages: Sequence[ChatMessage]) -> str:
+    def _render_memories(memories: Sequence[Memory]) -> str | None:
+        """List recalled memories, best first, within ``MEMORY_TOKEN_BUDGET``."""
+        lines: list[str] = []
+        used = estimate_tokens(MEMORY_HEADER)
+        for memory in memories:
+            line = f"- ({memory.kind}) {memory.text}"
+            cost = estimate_tokens(line)
+            if used + cost > settings.memory_token_budget:
+                break
+            lines.append(line)
+            used += cost
+        if not lines:
+            return None
+        return MEMORY_HEADER + "\n" + "\n".join(lines)
+
+    @staticmethod
+    def _build_conversation_text(
+        messages: Sequence[ChatMessage],
+        summary: str | None = None,
+        memories: str | None = None,
+    ) -> str:
         conversation_text = SYSTEM_PROMPT + "\n\n"
+        if memories:
+            conversation_text += f"{memories}\n\n"
+        if summary:
+            conversation_text += f"{summary}\n\n"
 
         for msg in messages:
             if msg.role == "user":
@@ -174,41 +474,6 @@ class ConversationService:
         conversation_text += "Lyra:"
         return conversation_text
 
-    @staticmethod
-    def _extract_response_text(response: Any) -> tuple[str | None, str | None]:
-        if not response:
-            return None, None
-
-        candidates = getattr(response, "candidates", None) or []
-        finish_reason: str | None = None
-
-        for candidate in candidates:
-            raw_finish_reason = getattr(candidate, "finish_reason", None)
-            finish_reason = ConversationService._describe_finish_reason(raw_finish_reason)
-            content = getattr(candidate, "content", None)
-            parts = getattr(content, "parts", None) or []
-
-            texts = [getattr(part, "text", "") for part in parts if getattr(part, "text", None)]
-            if texts:
-                combined = "".join(texts).strip()
-                if combined:
-                    return combined, finish_reason
-
-        if finish_reason is None and getattr(response, "prompt_feedback", None):
-            finish_reason = ConversationService._describe_finish_reason(
-                getattr(response.prompt_feedback, "block_reason", None)
-            )
-
-        return None, finish_reason
-
-    @staticmethod
-    def _describe_finish_reason(reason: Any) -> str | None:
-        if reason is None:
-            return None
-        if hasattr(reason, "name"):
-            return str(reason.name)
-        return str(reason)
-
     @staticmethod
     def _fallback_reply(
         user_messages: list[ChatMessage], assistant_messages: list[ChatMessage]
@@ -0,0 +1,128 @@
+"""Text embedding backends for semantic memory retrieval."""
+
+from __future__ import annotations
+
+import logging
+import re
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Sequence
+
+import httpx
+import numpy as np
+
+from ..core.config import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+# Function words carry little meaning but would dominate short texts.
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from had has have he her his i im in is it its "
+    "me my of on or our she so that the their them they this to was we were what when "
+    "with you your".split()
+)
+BIGRAM_WEIGHT = 0.5
+
+
+def normalise(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class Embedder(ABC):
+    """Turn texts into unit-length float32 vectors of ``dimensions`` floats."""
+
+    name: str = "embedder"
+    dimensions: int
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+    async def aclose(self) -> None:
+        """Release network resources held by the embedder."""
+
+
+class HashingEmbedder(Embedder):
+    """Offline embedder hashing content words and word pairs into a fixed-size vector.
+
+    It captures lexical overlap rather than meaning, but needs no model,
+    network or state and is deterministic across processes, so vectors saved
+    to disk stay valid after a restart.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> dict[str, float]:
+        words = [word for word in _WORD.findall(text.casefold()) if word not in STOP_WORDS]
+        features = {word: 1.0 + np.log(count) for word, count in Counter(words).items()}
+        for first, second in zip(words, words[1:]):
+            features[f"{first} {second}"] = BIGRAM_WEIGHT
+        return features
+
+    def embed_sync(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                # The top bit picks a sign so colliding features tend to cancel.
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dimensions] += sign * weight
+        return normalise(vectors)
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.embed_sync(texts)
+
+
+class OpenAICompatibleEmbedder(Embedder):
+    """Embeddings from any server speaking the OpenAI ``/embeddings`` protocol."""
+
+    name = "openai"
+
+    def __init__(self, *, api_key: str, base_url: str, model: str, dimensions: int) -> None:
+        self.model = model
+        self.dimensions = dimensions
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = await self._client.post(
+            "/embeddings",
+            json={"model": self.model, "input": list(texts), "dimensions": self.dimensions},
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return normalise(np.array([item["embedding"] for item in data], dtype=np.float32))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def build_embedder(config: Settings) -> Embedder:
+    """Instantiate the embedder selected by ``EMBEDDING_PROVIDER``.
+
+    Falls back to the offline hashing embedder when the selected backend
+    lacks credentials.
+    """
+    provider = config.embedding_provider.lower()
+    if provider == "openai":
+        if config.openai_api_key:
+            return OpenAICompatibleEmbedder(
+                api_key=config.openai_api_key,
+                base_url=config.openai_base_url,
+                model=config.embedding_model,
+                dimensions=config.embedding_dimensions,
+            )
+        LOGGER.info("No OpenAI API key configured, using hashing embeddings")
+    elif provider != "hashing":
+        LOGGER.error("Unknown embedding provider '%s', using hashing", config.embedding_provider)
+    return HashingEmbedder(config.embedding_dimensions)
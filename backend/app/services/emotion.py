@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
-from collections import Counter
-from dataclasses import dataclass
-from typing import Iterable
+import logging
+from dataclasses import asdict, dataclass
+from typing import Iterable, Sequence
 
+import numpy as np
+
+from ..core.config import Settings, settings
 from ..schemas.chat import EmotionEstimate
+from .lexicon import CompiledLexicon
+
+LOGGER = logging.getLogger(__name__)
 
 
 @dataclass(slots=True)
@@ -30,33 +36,50 @@ DEFAULT_LEXICON = EmotionLexicon(
 
 
 class EmotionService:
-    """Naive lexicon-based emotion detection service."""
+    """Lexicon-based emotion detection over a compiled lexicon."""
 
-    def __init__(self, lexicon: EmotionLexicon | None = None) -> None:
-        self.lexicon = lexicon or DEFAULT_LEXICON
+    def __init__(self, lexicon: EmotionLexicon | CompiledLexicon | None = None) -> None:
+        lexicon = lexicon or DEFAULT_LEXICON
+        if isinstance(lexicon, EmotionLexicon):
+            lexicon = CompiledLexicon.from_sets(asdict(lexicon))
+        self.lexicon = lexicon
 
     def estimate(self, texts: Iterable[str]) -> list[EmotionEstimate]:
-        tokens: Counter[str] = Counter()
-        for text in texts:
-            tokens.update(word.strip(".,!?").lower() for word in text.split())
-
-        scores: dict[str, int] = {
-            "positive": sum(tokens[token] for token in self.lexicon.positive),
-            "negative": sum(tokens[token] for token in self.lexicon.negative),
-            "anxious": sum(tokens[token] for token in self.lexicon.anxious),
-            "sad": sum(tokens[token] for token in self.lexicon.sad),
-            "angry": sum(tokens[token] for token in self.lexicon.angry),
-        }
-
-        total = sum(scores.values())
-        if total == 0:
+        return self.estimate_from_scores(self.score_batch(list(texts)).sum(axis=0))
+
+    def estimate_batch(self, texts: Sequence[str]) -> list[list[EmotionEstimate]]:
+        """Score each text on its own, vectorised across the whole batch."""
+        return [self.estimate_from_scores(scores) for scores in self.score_batch(texts)]
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Raw ``(texts, categories)`` scores; columns follow ``lexicon.categories``."""
+        return self.lexicon.score_batch(texts)
+
+    def empty_scores(self) -> np.ndarray:
+        """A zero score vector for accumulating ``score_batch`` rows."""
+        return np.zeros(len(self.lexicon.categories), dtype=np.float32)
+
+    def estimate_from_scores(self, scores: np.ndarray) -> list[EmotionEstimate]:
+        """Turn a category score vector into estimates with relative confidences."""
+        total = float(scores.sum())
+        if total <= 0:
             return [EmotionEstimate(label="neutral", confidence=0.4)]
 
         return [
-            EmotionEstimate(label=label, confidence=score / total)
-            for label, score in scores.items()
+            EmotionEstimate(label=label, confidence=float(score) / total)
+            for label, score in zip(self.lexicon.categories, scores)
             if score > 0
         ]
 
 
-emotion_service = EmotionService()
+def build_emotion_service(config: Settings) -> EmotionService:
+    """Use the compiled lexicon at ``EMOTION_LEXICON_PATH``, else the built-in one."""
+    if config.emotion_lexicon_path:
+        try:
+            return EmotionService(CompiledLexicon.load(config.emotion_lexicon_path))
+        except (OSError, KeyError, ValueError) as exc:
+            LOGGER.error("Could not load emotion lexicon, using the built-in one: %s", exc)
+    return EmotionService()
+
+
+emotion_service = build_emotion_service(settings)
@@ -0,0 +1,66 @@
+"""Crisis hotline directory with locale fallback."""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping
+
+DEFAULT_LOCALE = "en-US"
+
+REGIONAL_HOTLINES: dict[str, str] = {
+    "en-US": "988 Suicide & Crisis Lifeline",
+    "en-IN": "Kiran Helpline: 1800-599-0019",
+    "en-GB": "Samaritans: 116 123",
+}
+
+# Distinct locale strings whose resolution is memoised per directory.
+RESOLVED_CACHE_SIZE = 1024
+
+
+def normalize_locale(locale: str) -> str:
+    """Case-fold a BCP 47 tag and accept POSIX-style underscores (``es_MX``)."""
+    return locale.strip().replace("_", "-").lower()
+
+
+def fallback_chain(locale: str) -> list[str]:
+    """``zh-Hant-TW`` -> ``["zh-hant-tw", "zh-hant", "zh"]``."""
+    parts = normalize_locale(locale).split("-")
+    return ["-".join(parts[:end]) for end in range(len(parts), 0, -1) if parts[0]]
+
+
+class HotlineDirectory:
+    """Hotlines indexed by normalised locale, resolved ``es-MX`` -> ``es`` -> default.
+
+    Tags are normalised once when the directory is built and each distinct
+    requested locale is resolved once, so lookups cost a single dict probe.
+    """
+
+    def __init__(
+        self, hotlines: Mapping[str, str], *, default_locale: str = DEFAULT_LOCALE
+    ) -> None:
+        self._index = {normalize_locale(tag): hotline for tag, hotline in hotlines.items()}
+        default = self._index.get(normalize_locale(default_locale))
+        if default is None:
+            raise ValueError(f"No hotline for the default locale '{default_locale}'")
+        self.default = default
+        self.resolve = lru_cache(maxsize=RESOLVED_CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def from_file(cls, path: Path | str) -> "HotlineDirectory":
+        """Load ``{"default_locale": "en-US", "hotlines": {"es-MX": "...", "es": "..."}}``."""
+        data = json.loads(Path(path).read_text("utf-8"))
+        if not isinstance(data, dict) or not isinstance(data.get("hotlines"), dict):
+            raise ValueError("Hotline directory needs a 'hotlines' object")
+        return cls(data["hotlines"], default_locale=data.get("default_locale", DEFAULT_LOCALE))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _resolve(self, locale: str) -> str:
+        for tag in fallback_chain(locale):
+            hotline = self._index.get(tag)
+            if hotline is not None:
+                return hotline
+        return self.default
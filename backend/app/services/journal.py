@@ -1,25 +1,69 @@
-"""In-memory journaling service."""
+"""Journaling service."""
 
 from __future__ import annotations
 
-import asyncio
-from datetime import datetime, timezone
-from typing import Dict, List
+import logging
+from datetime import datetime, timedelta, timezone
+from dataclasses import replace
+from typing import Sequence
 from uuid import uuid4
 
-from ..schemas.journal import JournalEntry, JournalEntryCreate, JournalSummary
+from ..core.config import settings
+from ..repositories import (
+    JournalRepository,
+    Page,
+    PageQuery,
+    SearchQuery,
+    SortKey,
+    build_journal_repository,
+    derive_id,
+    entry_key,
+)
+from ..repositories.aggregates import DEFAULT_ZONE, bucket_start, local_day
+from ..schemas.journal import (
+    JournalChanges,
+    JournalEntry,
+    JournalEntryCreate,
+    JournalEntryImport,
+    JournalEntryPreview,
+    JournalSearchHit,
+    JournalSummary,
+    WeeklyEntryCount,
+)
+from .retrieval import MemoryStore, memory_store
+from .singleflight import SingleFlight
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_WEEKS = 12
 
 
 class JournalService:
-    """Manage journal entries in memory.
+    """Manage journal entries on top of a pluggable repository.
 
-    The service is intentionally simple and can later be
-    replaced with a persistent data layer (e.g., MongoDB).
+    The storage backend is selected by ``STORAGE_BACKEND`` (in-memory by
+    default, SQLite or MongoDB for persistence).
     """
 
-    def __init__(self) -> None:
-        self._entries: Dict[str, list[JournalEntry]] = {}
-        self._lock = asyncio.Lock()
+    def __init__(
+        self,
+        repository: JournalRepository | None = None,
+        memory: MemoryStore | None = None,
+        single_flight: SingleFlight | None = None,
+    ) -> None:
+        self._repository = repository or build_journal_repository(settings)
+        self._memory = memory or memory_store
+        self._single_flight = single_flight or SingleFlight(enabled=settings.single_flight_enabled)
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        return self._single_flight
+
+    async def initialize(self) -> None:
+        await self._repository.initialize()
+
+    async def close(self) -> None:
+        await self._repository.close()
 
     async def create_entry(self, user_id: str, payload: JournalEntryCreate) -> JournalEntry:
         now = datetime.now(timezone.utc)
@@ -32,30 +76,126 @@ class JournalService:
             created_at=now,
             updated_at=now,
         )
-        async with self._lock:
-            self._entries.setdefault(user_id, []).append(entry)
+        await self._repository.add(user_id, entry)
+        await self._remember(user_id, [entry])
         return entry
 
-    async def list_entries(self, user_id: str) -> List[JournalEntry]:
-        async with self._lock:
-            return list(self._entries.get(user_id, []))
+    async def import_entries(
+        self, user_id: str, items: Sequence[JournalEntryImport]
+    ) -> list[tuple[JournalEntry, bool]]:
+        """Store uploaded entries in one write; each is paired with whether it was new.
+
+        Items with an idempotency key get an id derived from it, so uploading
+        them again reports the stored entry as a duplicate instead of adding it twice.
+        """
+        now = datetime.now(timezone.utc)
+        entries = [
+            JournalEntry(
+                id=(
+                    derive_id(user_id, "journal", item.idempotency_key)
+                    if item.idempotency_key
+                    else str(uuid4())
+                ),
+                title=item.title,
+                content=item.content,
+                mood=item.mood,
+                tags=item.tags,
+                created_at=item.created_at or now,
+                updated_at=now,
+            )
+            for item in items
+        ]
+        stored = await self._repository.add_new(user_id, entries)
+        await self._remember(user_id, [entry for entry, new in zip(entries, stored) if new])
+        return list(zip(entries, stored))
+
+    async def _remember(self, user_id: str, entries: list[JournalEntry]) -> None:
+        """Make entries recallable in chat; a memory failure never fails the write."""
+        if not self._memory or not entries:
+            return
+        texts = [
+            f"{entry.title}: {entry.content}" if entry.title else entry.content
+            for entry in entries
+        ]
+        try:
+            await self._memory.remember(user_id, texts, kind="journal")
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.error("Storing journal memory failed: %s", exc)
+
+    async def list_entries(
+        self,
+        user_id: str,
+        query: PageQuery | None = None,
+        *,
+        include_content: bool = True,
+    ) -> Page[JournalEntry] | Page[JournalEntryPreview]:
+        query = query or PageQuery()
+        entries = await self._repository.page(
+            user_id, replace(query, limit=query.limit + 1), include_content=include_content
+        )
+        return Page.from_overfetch(entries, query.limit, entry_key)
 
-    async def summary(self, user_id: str) -> JournalSummary:
-        async with self._lock:
-            entries = self._entries.get(user_id, [])
-        mood_counts: Dict[str, int] = {}
-        for entry in entries:
-            if entry.mood:
-                mood_counts[entry.mood] = mood_counts.get(entry.mood, 0) + 1
-        return JournalSummary(total_entries=len(entries), mood_counts=mood_counts)
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> JournalChanges:
+        """Entries written after ``since_version``, the version a previous sync returned.
+
+        Version 0 (first sync), or a version this store never issued, starts a
+        paged snapshot of every entry with ``full`` set so the client replaces
+        its copy; ``after`` continues that snapshot.
+        """
+        changes = await self._repository.changes(user_id, since_version, limit, after=after)
+        return JournalChanges(
+            version=changes.version,
+            full=changes.full,
+            has_more=changes.has_more,
+            cursor=changes.cursor,
+            entries=changes.records,
+            deleted=changes.deleted,
+        )
+
+    async def search(
+        self, user_id: str, query: SearchQuery
+    ) -> tuple[list[JournalSearchHit], int | None]:
+        """Return ranked hits and the offset of the next page, if there is one."""
+        hits = await self._repository.search(user_id, replace(query, limit=query.limit + 1))
+        next_offset = query.offset + query.limit if len(hits) > query.limit else None
+        return [
+            JournalSearchHit(**hit.entry.model_dump(), score=hit.score)
+            for hit in hits[: query.limit]
+        ], next_offset
+
+    async def summary(self, user_id: str, weeks: int = DEFAULT_SUMMARY_WEEKS) -> JournalSummary:
+        """Summarise from the maintained counters, with the last ``weeks`` weeks of activity.
+
+        Concurrent requests for the same summary share one read.
+        """
+        return await self._single_flight.do(
+            ("summary", user_id, weeks), lambda: self._summary(user_id, weeks)
+        )
+
+    async def _summary(self, user_id: str, weeks: int) -> JournalSummary:
+        this_week = bucket_start(local_day(datetime.now(timezone.utc), DEFAULT_ZONE), "week")
+        week_starts = [this_week - timedelta(weeks=offset) for offset in range(weeks - 1, -1, -1)]
+        stats = await self._repository.stats(user_id, weeks=week_starts)
+        return JournalSummary(
+            total_entries=stats.total_entries,
+            mood_counts=stats.mood_counts,
+            tag_counts=stats.tag_counts,
+            entries_per_week=[
+                WeeklyEntryCount(week_start=week, count=stats.weekly_counts.get(week, 0))
+                for week in week_starts
+            ],
+            first_entry_at=stats.first_entry_at,
+            last_entry_at=stats.last_entry_at,
+        )
 
     async def clear(self) -> None:
         """Reset all stored journal data.
 
         Intended for tests and local development convenience.
         """
-        async with self._lock:
-            self._entries.clear()
+        await self._repository.clear()
 
 
 journal_service = JournalService()
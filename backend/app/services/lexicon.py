@@ -0,0 +1,261 @@
+"""Compiled emotion lexicons and vectorised batch scoring.
+
+Large weighted lexicons are compiled once into a compact ``.npz`` file::
+
+    python -m app.services.lexicon NRC-Emotion-Intensity-Lexicon.txt lexicon.npz
+
+and loaded at startup with ``CompiledLexicon.load`` (``EMOTION_LEXICON_PATH``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+CATEGORIES: tuple[str, ...] = ("positive", "negative", "anxious", "sad", "angry")
+
+# NRC lexicon emotions folded into Lyra's categories; the rest are ignored.
+NRC_CATEGORIES: dict[str, str] = {
+    "positive": "positive",
+    "joy": "positive",
+    "trust": "positive",
+    "negative": "negative",
+    "disgust": "negative",
+    "fear": "anxious",
+    "sadness": "sad",
+    "anger": "angry",
+}
+
+NEGATORS = frozenset(
+    "not no never nothing nobody none neither nor without hardly barely cannot cant dont "
+    "isnt wasnt arent werent doesnt didnt wont wouldnt couldnt shouldnt aint".split()
+)
+INTENSIFIERS: dict[str, float] = {
+    "very": 1.5,
+    "really": 1.5,
+    "so": 1.3,
+    "too": 1.3,
+    "super": 1.5,
+    "totally": 1.5,
+    "completely": 1.5,
+    "deeply": 1.5,
+    "extremely": 2.0,
+    "incredibly": 2.0,
+    "slightly": 0.5,
+    "somewhat": 0.7,
+    "kinda": 0.7,
+}
+# A negator flips the sentiment terms among the next few tokens of its clause.
+NEGATION_WINDOW = 3
+# "not calm" is weaker evidence of a negative mood than "upset".
+NEGATION_WEIGHT = 0.5
+# Negated terms move into these categories; anything else is dropped.
+NEGATED_CATEGORIES: dict[str, str] = {
+    "positive": "negative",
+    "negative": "positive",
+    "anxious": "positive",
+    "sad": "positive",
+    "angry": "positive",
+}
+CLAUSE_BREAKS = frozenset(".,;:!?") | {"but", "although", "though", "however", "yet"}
+
+FORMAT_VERSION = 1
+
+_TOKEN = re.compile(r"[\w']+")
+_SCAN = re.compile(r"[\w']+|[.,;:!?]")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case word tokens; apostrophes stay inside words like "don't"."""
+    return _TOKEN.findall(text.lower())
+
+
+def _is_negator(token: str, negators: frozenset[str]) -> bool:
+    return token in negators or token.endswith("n't") or token.replace("'", "") in negators
+
+
+def _pack(strings: Iterable[str]) -> np.ndarray:
+    """Newline-joined UTF-8 bytes: far smaller than a fixed-width string array."""
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(blob: np.ndarray) -> list[str]:
+    text = blob.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+
+class CompiledLexicon:
+    """A lexicon compiled into one term -> row map and a weight matrix.
+
+    Row ``i`` of ``weights`` holds term ``i``'s weight in every category, so a
+    term may count towards several emotions. Looking a token up is a single
+    dict probe however many terms the lexicon holds, and a batch of texts is
+    scored with one weight gather and a ``bincount`` per category.
+
+    Scoring walks each text once: intensifiers scale the next sentiment term
+    and a negator moves the terms within ``NEGATION_WINDOW`` tokens into their
+    ``NEGATED_CATEGORIES`` at ``NEGATION_WEIGHT``; clause breaks reset both.
+    """
+
+    __slots__ = ("categories", "index", "weights", "negators", "intensifiers", "negation")
+
+    def __init__(
+        self,
+        terms: Mapping[str, Mapping[str, float]],
+        categories: Sequence[str] = CATEGORIES,
+        *,
+        negators: Iterable[str] = NEGATORS,
+        intensifiers: Mapping[str, float] = INTENSIFIERS,
+    ) -> None:
+        self.categories = tuple(categories)
+        column = {category: position for position, category in enumerate(self.categories)}
+        self.index: dict[str, int] = {}
+        self.weights = np.zeros((len(terms), len(self.categories)), dtype=np.float32)
+        for row, (term, scores) in enumerate(terms.items()):
+            self.index[term.lower()] = row
+            for category, weight in scores.items():
+                self.weights[row, column[category]] = weight
+        self.negators = frozenset(negators)
+        self.intensifiers = dict(intensifiers)
+        self.negation = np.zeros((len(self.categories),) * 2, dtype=np.float32)
+        for category, target in NEGATED_CATEGORIES.items():
+            if category in column and target in column:
+                self.negation[column[category], column[target]] = NEGATION_WEIGHT
+
+    @classmethod
+    def from_sets(cls, sets: Mapping[str, Iterable[str]]) -> "CompiledLexicon":
+        """Compile ``{category: terms}`` with every term weighing 1."""
+        terms: dict[str, dict[str, float]] = {}
+        for category, words in sets.items():
+            for word in words:
+                terms.setdefault(word, {})[category] = 1.0
+        return cls(terms, categories=tuple(sets))
+
+    @classmethod
+    def from_tsv(
+        cls, path: Path | str, *, category_map: Mapping[str, str] = NRC_CATEGORIES
+    ) -> "CompiledLexicon":
+        """Read ``word<TAB>emotion<TAB>weight`` lines, the NRC lexicon layout.
+
+        Emotions are renamed through ``category_map``; when several map to one
+        category the strongest weight wins. Zero weights are skipped, so the
+        0/1 word-level EmoLex file reads the same way as the intensity one.
+        """
+        terms: dict[str, dict[str, float]] = {}
+        with open(path, encoding="utf-8") as source:
+            for line in source:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) != 3 or fields[1] not in category_map:
+                    continue
+                try:
+                    weight = float(fields[2])
+                except ValueError:
+                    continue  # header row
+                if weight <= 0:
+                    continue
+                scores = terms.setdefault(fields[0].lower(), {})
+                category = category_map[fields[1]]
+                scores[category] = max(weight, scores.get(category, 0.0))
+        return cls(terms)
+
+    def save(self, path: Path | str) -> None:
+        """Write the compact binary form read back by ``load``."""
+        terms = sorted(self.index, key=self.index.__getitem__)
+        np.savez(
+            path,
+            version=np.array(FORMAT_VERSION),
+            categories=_pack(self.categories),
+            terms=_pack(terms),
+            weights=self.weights.astype(np.float16),
+            negators=_pack(sorted(self.negators)),
+            intensifier_terms=_pack(self.intensifiers),
+            intensifier_weights=np.array(list(self.intensifiers.values()), dtype=np.float32),
+        )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "CompiledLexicon":
+        """Open a lexicon written by ``save``; raises ``ValueError`` if malformed."""
+        with np.load(path) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported lexicon format version {int(data['version'])}")
+            terms = _unpack(data["terms"])
+            weights = data["weights"].astype(np.float32)
+            if weights.shape[0] != len(terms):
+                raise ValueError("Lexicon terms and weights differ in length")
+            lexicon = cls(
+                {},
+                categories=_unpack(data["categories"]),
+                negators=_unpack(data["negators"]),
+                intensifiers=dict(
+                    zip(_unpack(data["intensifier_terms"]), data["intensifier_weights"].tolist())
+                ),
+            )
+        # Rows are stored in index order, so no per-term work is needed here.
+        lexicon.index = dict(zip(terms, range(len(terms))))
+        lexicon.weights = weights
+        return lexicon
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Score many texts at once into a ``(texts, categories)`` matrix."""
+        lookup = self.index.get
+        negators = self.negators
+        intensifiers = self.intensifiers
+        rows: list[int] = []
+        owners: list[int] = []
+        factors: list[float] = []
+        for position, text in enumerate(texts):
+            negated_for = 0
+            boost = 1.0
+            for token in _SCAN.findall(text.lower().replace("’", "'")):
+                row = lookup(token)
+                if row is not None:
+                    rows.append(row)
+                    owners.append(position)
+                    # A negative factor marks a negated hit.
+                    factors.append(-boost if negated_for else boost)
+                    boost = 1.0
+                elif token in CLAUSE_BREAKS:
+                    negated_for = 0
+                    boost = 1.0
+                    continue
+                elif _is_negator(token, negators):
+                    negated_for = NEGATION_WINDOW
+                    continue
+                elif token in intensifiers:
+                    boost *= intensifiers[token]
+                if negated_for:
+                    negated_for -= 1
+
+        scores = np.zeros((len(texts), len(self.categories)), dtype=np.float32)
+        if rows:
+            signed = np.asarray(factors, dtype=np.float32)
+            hits = self.weights[rows] * np.abs(signed)[:, None]
+            negated = signed < 0
+            if negated.any():
+                hits[negated] = hits[negated] @ self.negation
+            for column in range(len(self.categories)):
+                scores[:, column] = np.bincount(
+                    owners, weights=hits[:, column], minlength=len(texts)
+                )
+        return scores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile an NRC-style TSV lexicon to .npz")
+    parser.add_argument("source", help="word<TAB>emotion<TAB>weight file")
+    parser.add_argument("target", help="output .npz path")
+    args = parser.parse_args()
+    lexicon = CompiledLexicon.from_tsv(args.source)
+    lexicon.save(args.target)
+    print(f"compiled {len(lexicon)} terms into {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""LLM provider backends used by the conversation service."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+import httpx
+
+from ..core.config import Settings
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class LLMResult:
+    """Normalised outcome of a single generation call."""
+
+    text: str | None
+    finish_reason: str | None = None
+    block_reason: str | None = None
+
+
+class LLMClient(ABC):
+    """What the conversation service calls: a provider, or a wrapper around one."""
+
+    name: str = "llm"
+    model: str
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> LLMResult:
+        ...
+
+    @abstractmethod
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        ...
+
+    async def aclose(self) -> None:
+        """Release network resources held by the client."""
+
+    def stats(self) -> dict[str, object]:
+        return {"provider": self.name, "model": self.model}
+
+
+class LLMProvider(LLMClient):
+    """Common base for text generation backends.
+
+    Subclasses implement ``_generate`` and ``_stream``; the public wrappers
+    bound the number of in-flight calls so one worker can hold many turns on
+    a single event loop without exhausting sockets or provider quotas.
+    """
+
+    def __init__(self, *, model: str, max_concurrency: int) -> None:
+        self.model = model
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def generate(self, prompt: str) -> LLMResult:
+        async with self._slots:
+            return await self._generate(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async with self._slots:
+            async for text in self._stream(prompt):
+                yield text
+
+    @abstractmethod
+    async def _generate(self, prompt: str) -> LLMResult:
+        ...
+
+    @abstractmethod
+    def _stream(self, prompt: str) -> AsyncIterator[str]:
+        ...
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini backend using the SDK's native async client."""
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model: str,
+        max_output_tokens: int,
+        temperature: float,
+        max_concurrency: int,
+    ) -> None:
+        import google.generativeai as genai  # type: ignore[import]
+
+        super().__init__(model=model, max_concurrency=max_concurrency)
+        genai.configure(api_key=api_key)
+        self._model = genai.GenerativeModel(
+            model,
+            generation_config={
+                "temperature": temperature,
+                "top_p": 0.95,
+                "top_k": 40,
+                "max_output_tokens": max_output_tokens,
+            },
+        )
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        response = await self._model.generate_content_async(prompt)
+        text, finish_reason = self._extract_response_text(response)
+        block_reason = None
+        if getattr(response, "prompt_feedback", None):
+            block_reason = self._describe_finish_reason(
+                getattr(response.prompt_feedback, "block_reason", None)
+            )
+        return LLMResult(text=text, finish_reason=finish_reason, block_reason=block_reason)
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self._model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            text = self._extract_chunk_text(chunk)
+            if text:
+                yield text
+
+    @staticmethod
+    def _extract_response_text(response: Any) -> tuple[str | None, str | None]:
+        if not response:
+            return None, None
+
+        candidates = getattr(response, "candidates", None) or []
+        finish_reason: str | None = None
+
+        for candidate in candidates:
+            raw_finish_reason = getattr(candidate, "finish_reason", None)
+            finish_reason = GeminiProvider._describe_finish_reason(raw_finish_reason)
+            content = getattr(candidate, "content", None)
+            parts = getattr(content, "parts", None) or []
+
+            texts = [getattr(part, "text", "") for part in parts if getattr(part, "text", None)]
+            if texts:
+                combined = "".join(texts).strip()
+                if combined:
+                    return combined, finish_reason
+
+        if finish_reason is None and getattr(response, "prompt_feedback", None):
+            finish_reason = GeminiProvider._describe_finish_reason(
+                getattr(response.prompt_feedback, "block_reason", None)
+            )
+
+        return None, finish_reason
+
+    @staticmethod
+    def _extract_chunk_text(chunk: Any) -> str:
+        """Return the raw text of a streamed chunk without trimming whitespace.
+
+        Streamed chunks split the reply at arbitrary points, so leading and
+        trailing spaces are significant and must be forwarded untouched.
+        """
+        for candidate in getattr(chunk, "candidates", None) or []:
+            content = getattr(candidate, "content", None)
+            parts = getattr(content, "parts", None) or []
+            texts = [getattr(part, "text", "") for part in parts if getattr(part, "text", None)]
+            if texts:
+                return "".join(texts)
+        return ""
+
+    @staticmethod
+    def _describe_finish_reason(reason: Any) -> str | None:
+        if reason is None:
+            return None
+        if hasattr(reason, "name"):
+            return str(reason.name)
+        return str(reason)
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Backend for any server speaking the OpenAI chat completions protocol."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        base_url: str,
+        model: str,
+        max_output_tokens: int,
+        temperature: float,
+        max_concurrency: int,
+    ) -> None:
+        super().__init__(model=model, max_concurrency=max_concurrency)
+        self._max_output_tokens = max_output_tokens
+        self._temperature = temperature
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+
+    def _payload(self, prompt: str, *, stream: bool) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": self._max_output_tokens,
+            "temperature": self._temperature,
+            "stream": stream,
+        }
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        response = await self._client.post(
+            "/chat/completions", json=self._payload(prompt, stream=False)
+        )
+        response.raise_for_status()
+        choices = response.json().get("choices") or []
+        if not choices:
+            return LLMResult(text=None)
+
+        choice = choices[0]
+        text = ((choice.get("message") or {}).get("content") or "").strip()
+        return LLMResult(
+            text=text or None,
+            finish_reason=self._normalise_finish_reason(choice.get("finish_reason")),
+        )
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        async with self._client.stream(
+            "POST", "/chat/completions", json=self._payload(prompt, stream=True)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                for choice in json.loads(data).get("choices") or []:
+                    text = (choice.get("delta") or {}).get("content")
+                    if text:
+                        yield text
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    @staticmethod
+    def _normalise_finish_reason(reason: str | None) -> str | None:
+        # Map onto Gemini's vocabulary so callers handle truncation uniformly.
+        if reason == "length":
+            return "MAX_TOKENS"
+        return reason.upper() if reason else None
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic offline backend for load tests and local development.
+
+    Replies echo the latest user line of the prompt. ``latency_ms`` delays the
+    first token and ``tokens_per_second`` paces the rest, so the full chat
+    pipeline can be benchmarked without network access or API spend.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        *,
+        model: str = "fake-echo",
+        latency_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        max_concurrency: int = 256,
+    ) -> None:
+        super().__init__(model=model, max_concurrency=max_concurrency)
+        self._latency = latency_ms / 1000
+        self._token_interval = 1 / tokens_per_second if tokens_per_second > 0 else 0.0
+
+    def reply_for(self, prompt: str) -> str:
+        latest = ""
+        for line in prompt.splitlines():
+            if line.startswith("User: "):
+                latest = line[len("User: "):].strip()
+        if not latest:
+            return "I'm here with you. How are you feeling right now?"
+        return f"I hear you saying: {latest}. Tell me more about that."
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        reply = self.reply_for(prompt)
+        delay = self._latency + self._token_interval * len(self._tokens(reply))
+        if delay:
+            await asyncio.sleep(delay)
+        return LLMResult(text=reply, finish_reason="STOP")
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        started = time.perf_counter()
+        for index, token in enumerate(self._tokens(self.reply_for(prompt))):
+            if self._token_interval:
+                # Sleep against an absolute schedule so per-token timer slack
+                # does not accumulate into a slower effective token rate.
+                target = started + index * self._token_interval
+                await asyncio.sleep(max(0.0, target - time.perf_counter()))
+            yield token
+
+    @staticmethod
+    def _tokens(reply: str) -> list[str]:
+        words = reply.split(" ")
+        return [words[0]] + [" " + word for word in words[1:]]
+
+
+def build_provider(config: Settings) -> LLMProvider | None:
+    """Instantiate the provider selected by ``LLM_PROVIDER``.
+
+    Returns ``None`` when the selected backend lacks credentials so the
+    conversation service falls back to its scripted replies.
+    """
+    provider = config.llm_provider.lower()
+
+    try:
+        if provider == "fake":
+            return FakeProvider(
+                model=config.llm_model or "fake-echo",
+                latency_ms=config.fake_llm_latency_ms,
+                tokens_per_second=config.fake_llm_tokens_per_second,
+                max_concurrency=config.llm_max_concurrency,
+            )
+
+        if provider == "openai":
+            if not config.openai_api_key:
+                LOGGER.info("No OpenAI API key configured, using fallback")
+                return None
+            return OpenAICompatibleProvider(
+                api_key=config.openai_api_key,
+                base_url=config.openai_base_url,
+                model=config.llm_model or "gpt-4o-mini",
+                max_output_tokens=config.llm_max_output_tokens,
+                temperature=config.llm_temperature,
+                max_concurrency=config.llm_max_concurrency,
+            )
+
+        if provider == "gemini":
+            if not config.gemini_api_key:
+                LOGGER.info("No Gemini API key configured, using fallback")
+                return None
+            return GeminiProvider(
+                api_key=config.gemini_api_key,
+                model=config.llm_model or "models/gemini-2.5-pro",
+                max_output_tokens=config.llm_max_output_tokens,
+                temperature=config.llm_temperature,
+                max_concurrency=config.llm_max_concurrency,
+            )
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.error("Failed to initialise %s provider: %s", provider, exc)
+        return None
+
+    LOGGER.error("Unknown LLM provider '%s', using fallback", config.llm_provider)
+    return None
@@ -0,0 +1,143 @@
+"""Multi-phrase matching used by the safety service."""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Iterator, Mapping
+
+# Typographic apostrophes are common on mobile keyboards; fold them so that
+# "can’t go on" matches the lexicon entry "can't go on".
+_FOLD = str.maketrans({"’": "'", "‘": "'"})
+
+# Words (keeping inner apostrophes, e.g. "can't") and standalone punctuation.
+# Punctuation stays in the token stream so "end it, all" is not read as
+# "end it all".
+_TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*|[^\w\s]")
+
+
+# Inflections a phrase's last word may carry. Past and progressive forms
+# also drop a final "e" ("overdose" -> "overdosing") or double a final
+# consonant ("stab" -> "stabbed").
+_SUFFIXES = ("s", "es", "ed", "ing")
+_MIN_STEM = 2
+
+
+def word_forms(token: str) -> tuple[str, ...]:
+    """The token itself plus the base words it may inflect."""
+    forms = [token]
+    for suffix in _SUFFIXES:
+        stem = token[: -len(suffix)]
+        if not token.endswith(suffix) or len(stem) < _MIN_STEM:
+            continue
+        forms.append(stem)
+        if suffix in ("ed", "ing"):
+            forms.append(stem + "e")
+            if stem[-1] == stem[-2]:
+                forms.append(stem[:-1])
+    return tuple(forms)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and fold punctuation variants used by the lexicon."""
+    return text.lower().translate(_FOLD)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split normalised text into word and punctuation tokens."""
+    return _TOKEN_PATTERN.findall(normalize_text(text))
+
+
+class PhraseMatcher:
+    """Aho–Corasick automaton mapping lexicon phrases to categories.
+
+    The automaton runs over word tokens rather than characters, so every
+    phrase is matched in a single pass whose cost depends on the number of
+    words in the text and not on the lexicon size. Every word must match a
+    whole token; a phrase's last word may also carry a regular inflection
+    (``"overdose"`` on ``"overdosed"``, ``"suicide"`` on ``"suicides"``), but
+    never an arbitrary continuation (``"die"`` does not fire on ``"diet"``).
+    """
+
+    def __init__(self, phrases: Mapping[str, str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Per state: last word -> (phrase length in tokens, category) for every
+        # phrase whose other words lead to that state.
+        self._finals: list[dict[str, list[tuple[int, str]]]] = [{}]
+        # Per state: the nearest state on its failure chain, itself included,
+        # with final words, or -1.
+        self._final_link: list[int] = []
+        self._size = 0
+
+        for phrase, category in phrases.items():
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens[:-1]:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._finals.append({})
+                state = next_state
+            self._finals[state].setdefault(tokens[-1], []).append((len(tokens), category))
+            self._size += 1
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build_failure_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        order: list[int] = [0]
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for token, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                queue.append(child)
+
+        # Breadth-first order guarantees a state's failure target is finalised
+        # before the state itself, so the links can be resolved in one sweep.
+        self._final_link = [-1] * len(self._goto)
+        for state in order:
+            if self._finals[state]:
+                self._final_link[state] = state
+            elif state:
+                self._final_link[state] = self._final_link[self._fail[state]]
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int, str]]:
+        """Yield ``(start, end, category)`` token spans for each phrase hit."""
+        goto = self._goto
+        fail = self._fail
+        finals = self._finals
+        final_link = self._final_link
+        state = 0
+
+        for index, token in enumerate(tokenize(text)):
+            # Phrases ending at this token: look its forms up in the final
+            # words of every state on the failure chain.
+            forms = word_forms(token)
+            candidate = final_link[state]
+            while candidate >= 0:
+                words = finals[candidate]
+                for form in forms:
+                    for phrase_length, category in words.get(form, ()):
+                        yield index + 1 - phrase_length, index + 1, category
+                candidate = final_link[fail[candidate]] if candidate else -1
+
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+
+    def find_categories(self, text: str) -> set[str]:
+        """Return the set of categories whose phrases occur in ``text``."""
+        return {category for _, _, category in self.iter_matches(text)}
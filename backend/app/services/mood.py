@@ -2,22 +2,58 @@
 
 from __future__ import annotations
 
-import asyncio
-from collections import defaultdict
-from datetime import date, datetime, timezone
-from statistics import mean
-from typing import Dict, List
+from dataclasses import replace
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Literal, Sequence
 from uuid import uuid4
 
-from ..schemas.mood import MoodLog, MoodLogCreate, MoodTrendPoint
+from ..core.config import settings
+from ..repositories import (
+    Granularity,
+    MoodRepository,
+    Page,
+    PageQuery,
+    SortKey,
+    build_mood_repository,
+    derive_id,
+    log_key,
+)
+from ..repositories.aggregates import DEFAULT_ZONE, bucket_start, local_day
+from ..schemas.mood import MoodChanges, MoodLog, MoodLogCreate, MoodLogImport, MoodTrendPoint
+from .singleflight import SingleFlight
+
+TrendRange = Literal["week", "month", "quarter", "year", "all"]
+
+# How far back each trend range reaches from today; ``all`` is unbounded.
+TREND_WINDOWS: dict[TrendRange, timedelta | None] = {
+    "week": timedelta(days=7),
+    "month": timedelta(days=30),
+    "quarter": timedelta(days=91),
+    "year": timedelta(days=365),
+    "all": None,
+}
 
 
 class MoodService:
-    """In-memory mood tracking service."""
+    """Mood tracking service on top of a pluggable repository."""
+
+    def __init__(
+        self,
+        repository: MoodRepository | None = None,
+        single_flight: SingleFlight | None = None,
+    ) -> None:
+        self._repository = repository or build_mood_repository(settings)
+        self._single_flight = single_flight or SingleFlight(enabled=settings.single_flight_enabled)
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        return self._single_flight
 
-    def __init__(self) -> None:
-        self._store: Dict[str, list[MoodLog]] = {}
-        self._lock = asyncio.Lock()
+    async def initialize(self) -> None:
+        await self._repository.initialize()
+
+    async def close(self) -> None:
+        await self._repository.close()
 
     async def log_mood(self, user_id: str, payload: MoodLogCreate) -> MoodLog:
         entry = MoodLog(
@@ -27,37 +63,98 @@ class MoodService:
             notes=payload.notes,
             recorded_at=datetime.now(timezone.utc),
         )
-        async with self._lock:
-            self._store.setdefault(user_id, []).append(entry)
+        await self._repository.add(user_id, entry)
         return entry
 
-    async def get_logs(self, user_id: str) -> List[MoodLog]:
-        async with self._lock:
-            return list(self._store.get(user_id, []))
-
-    async def trend(self, user_id: str) -> List[MoodTrendPoint]:
-        async with self._lock:
-            logs = list(self._store.get(user_id, []))
-
-        grouped: Dict[date, list[MoodLog]] = defaultdict(list)
-        for log in logs:
-            grouped[log.recorded_at.date()].append(log)
-
-        trend: list[MoodTrendPoint] = []
-        for day, day_logs in sorted(grouped.items()):
-            trend.append(
-                MoodTrendPoint(
-                    date=day,
-                    average_intensity=mean(log.intensity for log in day_logs),
-                    dominant_mood=max(day_logs, key=lambda log: log.intensity).mood,
-                )
+    async def import_logs(
+        self, user_id: str, items: Sequence[MoodLogImport]
+    ) -> list[tuple[MoodLog, bool]]:
+        """Store uploaded logs in one write; each is paired with whether it was new."""
+        now = datetime.now(timezone.utc)
+        logs = [
+            MoodLog(
+                id=(
+                    derive_id(user_id, "mood", item.idempotency_key)
+                    if item.idempotency_key
+                    else str(uuid4())
+                ),
+                mood=item.mood,
+                intensity=item.intensity,
+                notes=item.notes,
+                recorded_at=item.recorded_at or now,
+            )
+            for item in items
+        ]
+        stored = await self._repository.add_new(user_id, logs)
+        return list(zip(logs, stored))
+
+    async def get_logs(
+        self,
+        user_id: str,
+        query: PageQuery | None = None,
+        *,
+        include_notes: bool = True,
+    ) -> Page[MoodLog]:
+        query = query or PageQuery()
+        logs = await self._repository.page(
+            user_id, replace(query, limit=query.limit + 1), include_notes=include_notes
+        )
+        return Page.from_overfetch(logs, query.limit, log_key)
+
+    async def changes(
+        self, user_id: str, since_version: int, limit: int, *, after: SortKey | None = None
+    ) -> MoodChanges:
+        """Logs written after ``since_version``; see ``JournalService.changes``."""
+        changes = await self._repository.changes(user_id, since_version, limit, after=after)
+        return MoodChanges(
+            version=changes.version,
+            full=changes.full,
+            has_more=changes.has_more,
+            cursor=changes.cursor,
+            logs=changes.records,
+            deleted=changes.deleted,
+        )
+
+    async def trend(
+        self,
+        user_id: str,
+        granularity: Granularity = "day",
+        trend_range: TrendRange = "all",
+        zone: str = DEFAULT_ZONE,
+    ) -> List[MoodTrendPoint]:
+        """Chart points read from the aggregates kept up to date by ``log_mood``.
+
+        Days, weeks and months follow the calendar in ``zone``, an IANA name.
+        Concurrent requests for the same chart (dashboard widgets) share one read.
+        """
+        return await self._single_flight.do(
+            ("trend", user_id, granularity, trend_range, zone),
+            lambda: self._trend(user_id, granularity, trend_range, zone),
+        )
+
+    async def _trend(
+        self, user_id: str, granularity: Granularity, trend_range: TrendRange, zone: str
+    ) -> List[MoodTrendPoint]:
+        window = TREND_WINDOWS[trend_range]
+        since: date | None = None
+        if window is not None:
+            since = local_day(datetime.now(timezone.utc), zone) - window
+            # Include the whole bucket that the window starts in.
+            since = bucket_start(since, granularity)
+        buckets = await self._repository.buckets(user_id, granularity, since=since, zone=zone)
+        return [
+            MoodTrendPoint(
+                date=bucket.start,
+                average_intensity=bucket.average_intensity,
+                dominant_mood=bucket.dominant_mood,
+                count=bucket.count,
             )
-        return trend
+            for bucket in buckets
+        ]
 
     async def clear(self) -> None:
         """Reset stored mood logs (testing helper)."""
-        async with self._lock:
-            self._store.clear()
+        await self._repository.clear()
 
 
 mood_service = MoodService()
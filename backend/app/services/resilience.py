@@ -0,0 +1,276 @@
+"""Deadlines, circuit breaking and hedging around LLM provider calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable
+
+from ..core.config import Settings
+from .llm import LLMClient, LLMProvider, LLMResult, build_provider
+
+LOGGER = logging.getLogger(__name__)
+
+LATENCY_WINDOW_SIZE = 256
+# Percentiles over fewer calls than this are noise; the static deadline applies.
+MIN_LATENCY_SAMPLES = 20
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider the breaker considers unhealthy."""
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls."""
+
+    def __init__(self, size: int = LATENCY_WINDOW_SIZE) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """Nearest-rank ``q`` quantile, or None until enough calls were seen."""
+        if len(self._samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe.
+
+    After ``failure_threshold`` failures in a row the breaker opens and calls
+    are refused for ``reset_seconds``. The first call after that is let
+    through as a probe: its success closes the breaker, its failure opens it
+    for another period. Other calls are refused while the probe is running.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or self._clock() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if not self._probing and self._clock() - self._opened_at >= self.reset_seconds:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or (self._opened_at is None and self._failures >= self._threshold):
+            self._opened_at = self._clock()
+            self.opened += 1
+        self._probing = False
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before it finished, freeing the probe slot."""
+        self._probing = False
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class GuardedProvider(LLMClient):
+    """Wrap a provider with per-call deadlines, a circuit breaker and hedging.
+
+    Each call gets a deadline of ``latency_factor`` times the recent p95
+    latency, clamped to ``[min_timeout, max_timeout]`` (``max_timeout`` until
+    enough calls were seen). Timeouts and errors count against the breaker;
+    while it is open calls fail fast with ``CircuitOpenError`` so the
+    conversation service answers from its local fallback at once. With
+    ``hedge_quantile`` set, a ``generate`` call still running after that
+    latency quantile is duplicated and the first reply wins, so one slow
+    upstream request no longer sets the turn's latency. Streams are never
+    hedged; their deadline applies to each wait for the next chunk.
+    """
+
+    def __init__(
+        self,
+        inner: LLMProvider,
+        *,
+        breaker: CircuitBreaker,
+        max_timeout: float,
+        min_timeout: float,
+        latency_factor: float,
+        hedge_quantile: float | None = None,
+    ) -> None:
+        # A wrapper, not a provider: the wrapped one bounds concurrency, hedges included.
+        self._inner = inner
+        self.name = inner.name
+        self.model = inner.model
+        self.breaker = breaker
+        self.latency = LatencyWindow()
+        self._max_timeout = max_timeout
+        self._min_timeout = min_timeout
+        self._latency_factor = latency_factor
+        self._hedge_quantile = hedge_quantile
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def deadline(self) -> float:
+        p95 = self.latency.quantile(0.95)
+        if p95 is None:
+            return self._max_timeout
+        return min(self._max_timeout, max(self._min_timeout, p95 * self._latency_factor))
+
+    def hedge_delay(self) -> float | None:
+        if self._hedge_quantile is None or self.breaker.state != "closed":
+            return None
+        return self.latency.quantile(self._hedge_quantile)
+
+    async def generate(self, prompt: str) -> LLMResult:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.deadline()):
+                result = await self._hedged(prompt)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception as exc:
+            self._record_failure(exc)
+            raise
+        self.breaker.record_success()
+        self.latency.add(time.perf_counter() - started)
+        return result
+
+    def _record_failure(self, exc: Exception) -> None:
+        if isinstance(exc, TimeoutError):
+            self.timeouts += 1
+        opened = self.breaker.opened
+        self.breaker.record_failure()
+        if self.breaker.opened != opened:
+            LOGGER.warning(
+                "%s circuit opened; using fallback replies for the next %ss",
+                self.name,
+                self.breaker.reset_seconds,
+            )
+
+    async def _hedged(self, prompt: str) -> LLMResult:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._inner.generate(prompt)
+
+        first = asyncio.ensure_future(self._inner.generate(prompt))
+        pending: set[asyncio.Future[LLMResult]] = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            self.hedges += 1
+            second = asyncio.ensure_future(self._inner.generate(prompt))
+            pending.add(second)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            if error is None:
+                raise RuntimeError(f"{self.name} hedged calls finished without a result")
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        chunks = self._inner.stream(prompt).__aiter__()
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout(self.deadline()):
+                        text = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                yield text
+        except Exception as exc:
+            self._record_failure(exc)
+            raise
+        except BaseException:
+            # Cancelled, or the consumer stopped reading early.
+            self.breaker.abandon()
+            raise
+        finally:
+            await chunks.aclose()
+        self.breaker.record_success()
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def stats(self) -> dict[str, object]:
+        p95 = self.latency.quantile(0.95)
+        return {
+            **self._inner.stats(),
+            "breaker": self.breaker.stats(),
+            "deadline_seconds": round(self.deadline(), 3),
+            "latency_p95_seconds": round(p95, 3) if p95 is not None else None,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+def build_guarded_provider(config: Settings) -> GuardedProvider | None:
+    """Build the configured provider wrapped in deadlines, a breaker and optional hedging."""
+    provider = build_provider(config)
+    if provider is None:
+        return None
+    return GuardedProvider(
+        provider,
+        breaker=CircuitBreaker(
+            failure_threshold=config.llm_breaker_failure_threshold,
+            reset_seconds=config.llm_breaker_reset_seconds,
+        ),
+        max_timeout=config.llm_timeout_seconds,
+        min_timeout=config.llm_timeout_min_seconds,
+        latency_factor=config.llm_timeout_latency_factor,
+        hedge_quantile=config.llm_hedge_quantile if config.llm_hedge_enabled else None,
+    )
@@ -0,0 +1,406 @@
+"""Semantic memory of journal entries and past chat turns per user."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Sequence, TypeVar
+
+import httpx
+import numpy as np
+
+from ..core.config import Settings, settings
+from .embeddings import Embedder, build_embedder
+from .vector_index import VectorIndex, fit_partition
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_USERS = 1024
+DEFAULT_FLUSH_SECONDS = 30.0
+
+
+@dataclass(slots=True)
+class Memory:
+    """A remembered text and how similar it is to the query that recalled it."""
+
+    text: str
+    kind: str
+    score: float = 0.0
+
+
+def memory_id(user_id: str, text: str) -> str:
+    """Stable id for a user's memory, so storing the same text twice is a no-op."""
+    return hashlib.blake2b(f"{user_id}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class MemoryStore(ABC):
+    """Where memories are embedded, stored and searched."""
+
+    def __init__(self, embedder: Embedder) -> None:
+        self.embedder = embedder
+
+    @abstractmethod
+    async def remember(self, user_id: str, texts: Sequence[str], *, kind: str) -> None:
+        """Embed and store ``texts``; texts already remembered are skipped."""
+
+    @abstractmethod
+    async def recall(
+        self, user_id: str, query: str, *, top_k: int, min_score: float = 0.0
+    ) -> list[Memory]:
+        """Return up to ``top_k`` memories at least ``min_score`` similar, best first."""
+
+    async def clear(self) -> None:
+        """Forget every memory (tests and local development)."""
+
+    def stats(self) -> dict[str, int]:
+        return {}
+
+    async def aclose(self) -> None:
+        await self.embedder.aclose()
+
+
+@dataclass(slots=True)
+class _UserMemories:
+    index: VectorIndex
+    records: list[tuple[str, str]] = field(default_factory=list)
+    ids: set[str] = field(default_factory=set)
+    dirty: bool = False
+    # Calls currently using this state; in-use users are never evicted.
+    active: int = 0
+    training: asyncio.Task[None] | None = None
+
+
+def _user_paths(directory: Path, user_id: str) -> tuple[Path, Path]:
+    stem = hashlib.blake2b(user_id.encode("utf-8"), digest_size=16).hexdigest()
+    return directory / f"{stem}.npy", directory / f"{stem}.json"
+
+
+class LocalMemoryStore(MemoryStore):
+    """Per-user in-process vector indexes, keeping the most recently used users.
+
+    At most ``max_users`` users stay loaded; the least recently used one is
+    evicted beyond that. With a ``directory`` each user's vectors are written
+    to ``<id>.npy`` with their texts in ``<id>.json`` every ``flush_seconds``
+    when changed, on eviction and on ``aclose``, and memory-mapped back on
+    next use. Without one, an evicted user's memories are forgotten.
+
+    File I/O and IVF fitting run on one worker thread owned by the store, so
+    neither blocks the event loop nor queues behind the loop's default pool.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        directory: str | None = None,
+        max_users: int = DEFAULT_MAX_USERS,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+    ) -> None:
+        super().__init__(embedder)
+        self._directory = Path(directory) if directory else None
+        self._max_users = max_users
+        self._flush_seconds = flush_seconds
+        self._users: OrderedDict[str, _UserMemories] = OrderedDict()
+        # Evicted users whose files are still being written.
+        self._saving: dict[str, asyncio.Future[None]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-store")
+        self._flusher: asyncio.Task[None] | None = None
+        self.evictions = 0
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    @asynccontextmanager
+    async def _pinned(self, user_id: str) -> AsyncIterator[_UserMemories]:
+        """Load ``user_id`` if needed and keep it from being evicted while in use."""
+        state = self._users.get(user_id)
+        while state is None:
+            pending = self._saving.get(user_id)
+            if pending is not None:
+                # Evicted moments ago; read it back once its files are complete.
+                await asyncio.wait([pending])
+            loaded = await self._run(self._load, user_id) if self._directory else None
+            state = self._users.get(user_id)
+            if state is None and user_id not in self._saving:
+                state = self._users[user_id] = loaded or _UserMemories(
+                    index=VectorIndex(self.embedder.dimensions)
+                )
+        self._users.move_to_end(user_id)
+        state.active += 1
+        try:
+            await self._evict()
+            self._train_if_due(state)
+            yield state
+        finally:
+            state.active -= 1
+
+    def _load(self, user_id: str) -> _UserMemories | None:
+        if self._directory is None:
+            return None
+        vectors_path, records_path = _user_paths(self._directory, user_id)
+        if not vectors_path.exists() or not records_path.exists():
+            return None
+        records = [(kind, text) for kind, text in json.loads(records_path.read_text("utf-8"))]
+        index = VectorIndex.load(vectors_path, size=len(records))
+        if index.dimensions != self.embedder.dimensions:
+            LOGGER.warning("Discarding memories for a user embedded with a different model")
+            return None
+        # A crash between writing the two files leaves one of them longer.
+        del records[len(index):]
+        return _UserMemories(
+            index=index,
+            records=records,
+            ids={memory_id(user_id, text) for _, text in records},
+        )
+
+    @staticmethod
+    def _write(
+        directory: Path, user_id: str, vectors: np.ndarray, records: list[tuple[str, str]]
+    ) -> None:
+        """Replace a user's files; each is swapped in whole, never left half-written."""
+        directory.mkdir(parents=True, exist_ok=True)
+        vectors_path, records_path = _user_paths(directory, user_id)
+        temporary = vectors_path.with_suffix(".tmp.npy")
+        np.save(temporary, vectors)
+        os.replace(temporary, vectors_path)
+        temporary = records_path.with_suffix(".tmp.json")
+        temporary.write_text(json.dumps(records), "utf-8")
+        os.replace(temporary, records_path)
+
+    async def _save(self, user_id: str, state: _UserMemories) -> None:
+        directory = self._directory
+        if directory is None:
+            state.dirty = False
+            return
+        # Snapshot on the loop; writes after this land past the saved rows.
+        vectors, records = state.index.rows(), list(state.records)
+        state.dirty = False
+        write = asyncio.ensure_future(self._run(self._write, directory, user_id, vectors, records))
+        try:
+            await asyncio.shield(write)
+        except Exception:
+            state.dirty = True
+            raise
+
+    async def _evict(self) -> None:
+        while len(self._users) > self._max_users:
+            user_id = next(
+                (
+                    user_id
+                    for user_id, state in self._users.items()
+                    if not state.active and state.training is None
+                ),
+                None,
+            )
+            if user_id is None:
+                return
+            state = self._users.pop(user_id)
+            self.evictions += 1
+            if not state.dirty or self._directory is None:
+                continue
+            saving = self._saving[user_id] = asyncio.ensure_future(self._save(user_id, state))
+            try:
+                await asyncio.shield(saving)
+            except Exception:
+                LOGGER.exception("Could not save evicted memories; keeping them loaded")
+                self._users[user_id] = state
+                self._users.move_to_end(user_id, last=False)
+                return
+            finally:
+                del self._saving[user_id]
+
+    def _train_if_due(self, state: _UserMemories) -> None:
+        if state.training is None and state.index.training_due:
+            state.training = asyncio.create_task(self._train(state))
+
+    async def _train(self, state: _UserMemories) -> None:
+        """Fit the IVF partition on the worker thread; searches keep the old one meanwhile."""
+        try:
+            state.index.install(await self._run(fit_partition, state.index.rows()))
+        except Exception:
+            LOGGER.exception("Fitting a memory index partition failed")
+        finally:
+            state.training = None
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None and self._directory is not None and self._flush_seconds > 0:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_seconds)
+            try:
+                await self.flush()
+            except Exception:
+                LOGGER.exception("Saving memories failed; retrying at the next flush")
+
+    async def remember(self, user_id: str, texts: Sequence[str], *, kind: str) -> None:
+        async with self._pinned(user_id) as state:
+            fresh: dict[str, str] = {}
+            for text in texts:
+                text = text.strip()
+                key = memory_id(user_id, text)
+                if text and key not in state.ids and key not in fresh:
+                    fresh[key] = text
+            if not fresh:
+                return
+            # Claim the ids before awaiting so a concurrent call skips them.
+            state.ids.update(fresh)
+            try:
+                vectors = await self.embedder.embed(list(fresh.values()))
+            except Exception:
+                state.ids.difference_update(fresh)
+                raise
+            state.index.add(vectors)
+            state.records.extend((kind, text) for text in fresh.values())
+            state.dirty = True
+            self._train_if_due(state)
+        self._start_flusher()
+
+    async def recall(
+        self, user_id: str, query: str, *, top_k: int, min_score: float = 0.0
+    ) -> list[Memory]:
+        async with self._pinned(user_id) as state:
+            if not len(state.index):
+                return []
+            (vector,) = await self.embedder.embed([query])
+            return [
+                Memory(text=state.records[row][1], kind=state.records[row][0], score=score)
+                for row, score in state.index.search(vector, top_k)
+                if score >= min_score
+            ]
+
+    async def flush(self) -> None:
+        """Write every changed user index to the directory, if one is configured."""
+        for user_id, state in list(self._users.items()):
+            if state.dirty:
+                await self._save(user_id, state)
+
+    async def clear(self) -> None:
+        self._users.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "users": len(self._users),
+            "memories": sum(len(state.records) for state in self._users.values()),
+            "partitioned_users": sum(state.index.partitioned for state in self._users.values()),
+            "evictions": self.evictions,
+        }
+
+    async def aclose(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await asyncio.gather(
+            *(state.training for state in self._users.values() if state.training),
+            return_exceptions=True,
+        )
+        await self.flush()
+        self._executor.shutdown(wait=True)
+        await super().aclose()
+
+
+class PineconeMemoryStore(MemoryStore):
+    """Memories kept in a Pinecone index, one namespace per user."""
+
+    def __init__(self, embedder: Embedder, *, api_key: str, index_host: str) -> None:
+        super().__init__(embedder)
+        if not index_host.startswith(("http://", "https://")):
+            index_host = f"https://{index_host}"
+        self._client = httpx.AsyncClient(
+            base_url=index_host.rstrip("/"),
+            headers={"Api-Key": api_key},
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+
+    async def remember(self, user_id: str, texts: Sequence[str], *, kind: str) -> None:
+        unique = {memory_id(user_id, text.strip()): text.strip() for text in texts if text.strip()}
+        if not unique:
+            return
+        # Fetching ids is far cheaper than embedding texts the index already holds.
+        response = await self._client.get(
+            "/vectors/fetch", params={"namespace": user_id, "ids": list(unique)}
+        )
+        response.raise_for_status()
+        for key in response.json().get("vectors", {}):
+            unique.pop(key, None)
+        if not unique:
+            return
+        vectors = await self.embedder.embed(list(unique.values()))
+        response = await self._client.post(
+            "/vectors/upsert",
+            json={
+                "namespace": user_id,
+                "vectors": [
+                    {"id": key, "values": vector.tolist(), "metadata": {"text": text, "kind": kind}}
+                    for (key, text), vector in zip(unique.items(), vectors)
+                ],
+            },
+        )
+        response.raise_for_status()
+
+    async def recall(
+        self, user_id: str, query: str, *, top_k: int, min_score: float = 0.0
+    ) -> list[Memory]:
+        (vector,) = await self.embedder.embed([query])
+        response = await self._client.post(
+            "/query",
+            json={
+                "namespace": user_id,
+                "vector": vector.tolist(),
+                "topK": top_k,
+                "includeMetadata": True,
+            },
+        )
+        response.raise_for_status()
+        return [
+            Memory(
+                text=match["metadata"]["text"],
+                kind=match["metadata"].get("kind", "unknown"),
+                score=match["score"],
+            )
+            for match in response.json().get("matches", [])
+            if match["score"] >= min_score and "text" in (match.get("metadata") or {})
+        ]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        await super().aclose()
+
+
+def build_memory_store(config: Settings) -> MemoryStore | None:
+    """Return the memory store selected by ``MEMORY_BACKEND`` when ``MEMORY_ENABLED`` is set."""
+    if not config.memory_enabled:
+        return None
+    embedder = build_embedder(config)
+    backend = config.memory_backend.lower()
+    if backend == "pinecone":
+        if config.pinecone_api_key and config.pinecone_index_host:
+            return PineconeMemoryStore(
+                embedder, api_key=config.pinecone_api_key, index_host=config.pinecone_index_host
+            )
+        LOGGER.info("Pinecone is not configured, keeping memories in process")
+    elif backend != "local":
+        LOGGER.error("Unknown memory backend '%s', using local", config.memory_backend)
+    return LocalMemoryStore(
+        embedder,
+        directory=config.memory_index_path,
+        max_users=config.memory_max_users,
+        flush_seconds=config.memory_flush_seconds,
+    )
+
+
+memory_store = build_memory_store(settings)
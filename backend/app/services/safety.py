@@ -2,10 +2,19 @@
 
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Iterable
 
-from ..schemas.safety import SafetyCheckRequest, SafetyCheckResult
+from ..core.config import Settings, settings
+from ..schemas.safety import SafetyCheckResult
+from .hotlines import REGIONAL_HOTLINES, HotlineDirectory
+from .matcher import PhraseMatcher, normalize_text
+
+LOGGER = logging.getLogger(__name__)
 
 CRISIS_KEYWORDS: dict[str, str] = {
     "suicide": "self-harm",
@@ -16,54 +25,130 @@ CRISIS_KEYWORDS: dict[str, str] = {
     "can't go on": "self-harm",
 }
 
-REGIONAL_HOTLINES: dict[str, str] = {
-    "en-US": "988 Suicide & Crisis Lifeline",
-    "en-IN": "Kiran Helpline: 1800-599-0019",
-    "en-GB": "Samaritans: 116 123",
-}
+CRISIS_ACTIONS: list[str] = [
+    "Reach out to a trusted friend or family member immediately.",
+    "Contact local emergency services or a crisis hotline for urgent support.",
+    "Avoid any self-harm; you deserve support and care right now.",
+]
 
+MATCH_CACHE_SIZE = 4096
 
-class SafetyService:
-    """Simple keyword-based crisis detector with extendable interface."""
 
-    def __init__(self, crisis_keywords: dict[str, str] | None = None) -> None:
+class SafetyService:
+    """Keyword-based crisis detector backed by a compiled phrase automaton.
+
+    Matches for recently seen texts are kept in an LRU keyed on a digest of
+    the normalised text, and results are copied from templates precomputed
+    per hotline, so a repeated message costs a hash and a shallow copy.
+    """
+
+    def __init__(
+        self,
+        crisis_keywords: dict[str, str] | None = None,
+        *,
+        hotlines: HotlineDirectory | None = None,
+        cache_size: int = MATCH_CACHE_SIZE,
+    ) -> None:
         self._keywords = crisis_keywords or CRISIS_KEYWORDS
+        self._matcher = PhraseMatcher(self._keywords)
+        self._hotlines = hotlines or HotlineDirectory(REGIONAL_HOTLINES)
+        self._templates: dict[tuple[str, bool], SafetyCheckResult] = {}
+        self._cache_size = cache_size
+        self._cache: OrderedDict[bytes, frozenset[str]] = OrderedDict()
+        # Batch screening matches from worker threads.
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def keywords(self) -> dict[str, str]:
+        """Phrase -> category lexicon the matcher was compiled from."""
+        return self._keywords
+
+    def match_categories(self, text: str) -> set[str]:
+        """Return the crisis categories matched in ``text`` in a single pass."""
+        if not self._cache_size:
+            return self._matcher.find_categories(text)
+
+        normalized = " ".join(normalize_text(text).split())
+        key = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return set(cached)
+            self.cache_misses += 1
+
+        categories = self._matcher.find_categories(text)
+        with self._lock:
+            self._cache[key] = frozenset(categories)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return categories
 
     def evaluate_text(self, text: str, *, locale: str = "en-US") -> SafetyCheckResult:
         """Run safety heuristics on a piece of text."""
-        normalized = text.lower()
-        matched_categories: set[str] = set()
+        return self.build_result(self.match_categories(text), locale=locale)
 
-        for phrase, category in self._keywords.items():
-            if phrase in normalized:
-                matched_categories.add(category)
+    def build_result(self, matched_categories: set[str], *, locale: str = "en-US") -> SafetyCheckResult:
+        """Assemble a safety result from already matched categories.
 
+        Results share their template's ``recommended_actions`` list and must
+        be treated as read-only.
+        """
         crisis_detected = bool(matched_categories)
-        hotline = REGIONAL_HOTLINES.get(locale, REGIONAL_HOTLINES["en-US"])
-
-        recommended_actions: list[str] = []
-        if crisis_detected:
-            recommended_actions.extend(
-                [
-                    "Reach out to a trusted friend or family member immediately.",
-                    "Contact local emergency services or a crisis hotline for urgent support.",
-                    "Avoid any self-harm; you deserve support and care right now.",
-                ]
-            )
-
-        return SafetyCheckResult(
-            crisis_detected=crisis_detected,
-            risk_level="high" if crisis_detected else "low",
-            matched_category=", ".join(sorted(matched_categories)) if matched_categories else None,
-            recommended_actions=recommended_actions,
-            hotline=hotline,
-            evaluated_at=datetime.now(timezone.utc),
+        template = self._template(self._hotlines.resolve(locale), crisis_detected)
+        return template.model_copy(
+            update={
+                "matched_category": (
+                    ", ".join(sorted(matched_categories)) if crisis_detected else None
+                ),
+                "evaluated_at": datetime.now(timezone.utc),
+            }
         )
 
-    def evaluate_messages(self, messages: Iterable[str], *, locale: str = "en-US") -> SafetyCheckResult:
-        """Evaluate multiple messages and combine results."""
-        combined_text = "\n".join(messages)
-        return self.evaluate_text(combined_text, locale=locale)
+    def _template(self, hotline: str, crisis_detected: bool) -> SafetyCheckResult:
+        template = self._templates.get((hotline, crisis_detected))
+        if template is None:
+            template = self._templates[(hotline, crisis_detected)] = SafetyCheckResult(
+                crisis_detected=crisis_detected,
+                risk_level="high" if crisis_detected else "low",
+                recommended_actions=list(CRISIS_ACTIONS) if crisis_detected else [],
+                hotline=hotline,
+                evaluated_at=datetime.min.replace(tzinfo=timezone.utc),
+            )
+        return template
 
+    def evaluate_messages(self, messages: Iterable[str], *, locale: str = "en-US") -> SafetyCheckResult:
+        """Evaluate multiple messages and combine results.
 
-safety_service = SafetyService()
+        Each message is scanned on its own, so the history is never copied
+        into one combined string.
+        """
+        matched_categories: set[str] = set()
+        for message in messages:
+            matched_categories |= self.match_categories(message)
+        return self.build_result(matched_categories, locale=locale)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "cached_texts": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "hotline_locales": len(self._hotlines),
+        }
+
+
+def build_safety_service(config: Settings) -> SafetyService:
+    """Use the hotline directory at ``SAFETY_HOTLINES_PATH``, else the built-in one."""
+    hotlines = None
+    if config.safety_hotlines_path:
+        try:
+            hotlines = HotlineDirectory.from_file(config.safety_hotlines_path)
+        except (OSError, ValueError) as exc:
+            LOGGER.error("Could not load hotline directory, using the built-in one: %s", exc)
+    return SafetyService(hotlines=hotlines, cache_size=config.safety_cache_max_entries)
+
+
+safety_service = build_safety_service(settings)
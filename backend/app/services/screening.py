@@ -0,0 +1,108 @@
+"""Batch safety screening for moderation pipelines."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Sequence
+
+from ..core.config import Settings, settings
+from .safety import SafetyService, safety_service
+
+SCREEN_CHUNK_SIZE = 512
+
+# Built once per worker process by ``_init_worker``.
+_worker_safety: SafetyService | None = None
+
+
+def _init_worker(keywords: dict[str, str]) -> None:
+    global _worker_safety
+    _worker_safety = SafetyService(keywords)
+
+
+def _match_chunk(texts: list[str]) -> list[set[str]]:
+    assert _worker_safety is not None
+    return [_worker_safety.match_categories(text) for text in texts]
+
+
+class SafetyScreener:
+    """Match many texts through ``SafetyService``, one compiled pass per text.
+
+    Texts are matched in chunks off the event loop and yielded in input order.
+    Matching is pure Python and holds the GIL, so batches of at least
+    ``parallel_threshold`` texts are spread over a pool of ``workers``
+    processes, each with its own compiled matcher; smaller batches (or every
+    batch when ``workers`` is 0) run in a background thread.
+    """
+
+    def __init__(
+        self,
+        safety: SafetyService = safety_service,
+        *,
+        workers: int,
+        parallel_threshold: int,
+        chunk_size: int = SCREEN_CHUNK_SIZE,
+    ) -> None:
+        self._safety = safety
+        self._workers = workers
+        self._parallel_threshold = parallel_threshold
+        self._chunk_size = chunk_size
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _match(self, texts: Sequence[str]) -> list[set[str]]:
+        return [self._safety.match_categories(text) for text in texts]
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that runs threads is unsafe, so workers are spawned.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._safety.keywords,),
+            )
+        return self._pool
+
+    async def screen(self, texts: Sequence[str]) -> AsyncIterator[list[set[str]]]:
+        """Yield the matched categories for ``texts`` a chunk at a time, in order."""
+        chunks = (
+            list(texts[start : start + self._chunk_size])
+            for start in range(0, len(texts), self._chunk_size)
+        )
+        if not self._workers or len(texts) < self._parallel_threshold:
+            for chunk in chunks:
+                yield await asyncio.to_thread(self._match, chunk)
+            return
+
+        pool = self._executor()
+        loop = asyncio.get_running_loop()
+        # Two chunks per worker keeps every process busy without buffering the batch.
+        pending: deque[asyncio.Future[list[set[str]]]] = deque()
+        try:
+            for chunk in chunks:
+                pending.append(loop.run_in_executor(pool, _match_chunk, chunk))
+                if len(pending) >= 2 * self._workers:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def build_safety_screener(config: Settings) -> SafetyScreener:
+    return SafetyScreener(
+        workers=config.safety_batch_workers,
+        parallel_threshold=config.safety_batch_parallel_threshold,
+    )
+
+
+safety_screener = build_safety_screener(settings)
@@ -0,0 +1,143 @@
+"""Incremental per-session safety and emotion state."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from ..core.config import settings
+from .emotion import EmotionService, emotion_service
+from .safety import SafetyService, safety_service
+
+
+@dataclass(slots=True)
+class DigestChain:
+    """Chained digest of the first ``count`` messages of a transcript.
+
+    ``previous`` covers all but the last of them. A resent transcript still
+    starts with those messages when it is long enough and its message at
+    ``count - 1`` chains ``previous`` into ``digest``, which costs one message
+    whatever the history length. Earlier messages are not re-read.
+    """
+
+    count: int = 0
+    previous: str = ""
+    digest: str = ""
+
+    def matches(self, texts: Sequence[str]) -> bool:
+        if len(texts) < self.count:
+            return False
+        return self.count == 0 or self.ends_with(texts[self.count - 1])
+
+    def ends_with(self, text: str) -> bool:
+        """Whether ``text`` is the last of the ``count`` messages, following the others."""
+        return chain_digest(self.previous, text) == self.digest
+
+    def extend(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.previous, self.digest = self.digest, chain_digest(self.digest, text)
+            self.count += 1
+
+
+@dataclass(slots=True)
+class SessionAnalysis:
+    """Running analysis over the user messages seen so far in a session."""
+
+    emotion_scores: np.ndarray
+    seen: DigestChain = field(default_factory=DigestChain)
+    categories: set[str] = field(default_factory=set)
+
+
+def update_digest(hasher: "hashlib._Hash", texts: Sequence[str]) -> None:
+    """Feed an ordered list of messages into a running transcript hash."""
+    for text in texts:
+        encoded = text.encode("utf-8")
+        # Length-prefix each message so ["ab", "c"] and ["a", "bc"] differ.
+        hasher.update(len(encoded).to_bytes(8, "little"))
+        hasher.update(encoded)
+
+
+def chain_digest(previous: str, text: str) -> str:
+    """Extend the digest of a transcript by one message."""
+    hasher = hashlib.blake2b(previous.encode("ascii"), digest_size=16)
+    update_digest(hasher, [text])
+    return hasher.hexdigest()
+
+
+class SessionAnalysisStore:
+    """Keep safety categories and summed emotion scores per session.
+
+    A turn only scores and scans the user messages that arrived since the
+    previous turn. A chained digest of the already-processed messages is
+    checked against the incoming history in constant time; when the client
+    truncated its transcript or rewrote its last processed message the state
+    is rebuilt from a full scan.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sessions: int,
+        safety: SafetyService = safety_service,
+        emotion: EmotionService = emotion_service,
+    ) -> None:
+        self._max_sessions = max_sessions
+        self._safety = safety
+        self._emotion = emotion
+        self._sessions: OrderedDict[str, SessionAnalysis] = OrderedDict()
+        self.incremental_updates = 0
+        self.full_scans = 0
+
+    def analyse(self, session_key: str | None, user_texts: Sequence[str]) -> SessionAnalysis:
+        """Return the analysis covering ``user_texts``.
+
+        The returned object is owned by the store and must not be mutated.
+        """
+        state = self._sessions.get(session_key) if session_key else None
+        if state is not None and state.seen.matches(user_texts):
+            new_texts = user_texts[state.seen.count:]
+            self._apply(state, new_texts)
+            state.seen.extend(new_texts)
+            self._sessions.move_to_end(session_key)
+            self.incremental_updates += 1
+            return state
+
+        state = SessionAnalysis(emotion_scores=self._emotion.empty_scores())
+        self._apply(state, user_texts)
+        state.seen.extend(user_texts)
+        self.full_scans += 1
+
+        if session_key:
+            self._sessions[session_key] = state
+            self._sessions.move_to_end(session_key)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+        return state
+
+    def forget(self, session_key: str) -> None:
+        self._sessions.pop(session_key, None)
+
+    def clear(self) -> None:
+        self._sessions.clear()
+        self.incremental_updates = 0
+        self.full_scans = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "incremental_updates": self.incremental_updates,
+            "full_scans": self.full_scans,
+        }
+
+    def _apply(self, state: SessionAnalysis, texts: Sequence[str]) -> None:
+        for text in texts:
+            state.categories |= self._safety.match_categories(text)
+        if texts:
+            state.emotion_scores += self._emotion.score_batch(texts).sum(axis=0)
+
+
+session_analysis_store = SessionAnalysisStore(max_sessions=settings.session_state_max_sessions)
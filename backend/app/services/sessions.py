@@ -0,0 +1,176 @@
+"""Server-side chat session transcripts."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Sequence
+
+from ..core.config import Settings, settings
+from ..core.sqlite import SQLiteDatabase
+from ..schemas.chat import ChatMessage
+
+
+class SessionStore(ABC):
+    """Storage for chat transcripts keyed by client-supplied session id."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> list[ChatMessage] | None:
+        """Return the stored transcript, or ``None`` for unknown sessions."""
+
+    @abstractmethod
+    async def append(self, session_id: str, messages: Sequence[ChatMessage]) -> None:
+        """Append messages to a transcript, creating the session if needed."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Remove a session; returns ``False`` when it did not exist."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drop every stored session (tests and local development)."""
+
+    async def aclose(self) -> None:
+        """Release resources held by the backend."""
+
+
+def _overflow(length: int, max_messages: int) -> int:
+    """How many of the oldest messages to drop from a transcript of ``length``.
+
+    A transcript that outgrows ``max_messages`` is cut back to half of it, so
+    its start moves rarely: the per-session analysis and summary, which are
+    keyed on that start, are rebuilt once per cut rather than on every turn.
+    """
+    if length <= max_messages:
+        return 0
+    return length - max_messages // 2
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local transcripts with least-recently-used eviction.
+
+    Each transcript keeps at most ``max_messages`` messages, far more than a
+    prompt's context window uses, so ``load`` copies a bounded list.
+    """
+
+    def __init__(self, *, max_sessions: int, max_messages: int) -> None:
+        self._max_sessions = max_sessions
+        self._max_messages = max_messages
+        self._sessions: OrderedDict[str, list[ChatMessage]] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def load(self, session_id: str) -> list[ChatMessage] | None:
+        async with self._lock:
+            transcript = self._sessions.get(session_id)
+            if transcript is None:
+                return None
+            self._sessions.move_to_end(session_id)
+            return list(transcript)
+
+    async def append(self, session_id: str, messages: Sequence[ChatMessage]) -> None:
+        async with self._lock:
+            transcript = self._sessions.setdefault(session_id, [])
+            transcript.extend(messages)
+            del transcript[: _overflow(len(transcript), self._max_messages)]
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str) -> bool:
+        async with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._sessions.clear()
+
+
+_SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteSessionStore(SessionStore):
+    """Durable transcripts in an embedded SQLite database.
+
+    Transcripts are trimmed to ``max_messages`` like the in-memory ones.
+    """
+
+    def __init__(self, path: str, *, max_messages: int) -> None:
+        self._db = SQLiteDatabase(path, schema=_SESSION_SCHEMA)
+        self._max_messages = max_messages
+
+    async def load(self, session_id: str) -> list[ChatMessage] | None:
+        def _load(connection: sqlite3.Connection) -> list[sqlite3.Row]:
+            return connection.execute(
+                "SELECT role, content FROM chat_messages WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+
+        rows = await self._db.run(_load)
+        if not rows:
+            return None
+        return [ChatMessage(role=row["role"], content=row["content"]) for row in rows]
+
+    async def append(self, session_id: str, messages: Sequence[ChatMessage]) -> None:
+        values = [(message.role, message.content) for message in messages]
+
+        def _append(connection: sqlite3.Connection) -> None:
+            first_seq, last_seq = connection.execute(
+                "SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), -1)"
+                " FROM chat_messages WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            connection.executemany(
+                "INSERT INTO chat_messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [
+                    (session_id, last_seq + offset, role, content)
+                    for offset, (role, content) in enumerate(values, start=1)
+                ],
+            )
+            # Sequence numbers are contiguous, so the length follows from the bounds.
+            dropped = _overflow(last_seq + len(values) - first_seq + 1, self._max_messages)
+            if dropped:
+                connection.execute(
+                    "DELETE FROM chat_messages WHERE session_id = ? AND seq < ?",
+                    (session_id, first_seq + dropped),
+                )
+
+        await self._db.run(_append)
+
+    async def delete(self, session_id: str) -> bool:
+        def _delete(connection: sqlite3.Connection) -> bool:
+            cursor = connection.execute(
+                "DELETE FROM chat_messages WHERE session_id = ?", (session_id,)
+            )
+            return cursor.rowcount > 0
+
+        return await self._db.run(_delete)
+
+    async def clear(self) -> None:
+        await self._db.run(lambda connection: connection.execute("DELETE FROM chat_messages"))
+
+    async def aclose(self) -> None:
+        await self._db.close()
+
+
+def build_session_store(config: Settings) -> SessionStore:
+    """Instantiate the backend selected by ``SESSION_STORE``."""
+    if config.session_store.lower() == "sqlite":
+        return SQLiteSessionStore(
+            config.session_store_path, max_messages=config.session_max_messages
+        )
+    return InMemorySessionStore(
+        max_sessions=config.session_max_sessions, max_messages=config.session_max_messages
+    )
+
+
+session_store = build_session_store(settings)
@@ -0,0 +1,75 @@
+"""Request coalescing for identical concurrent calls."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+def payload_key(payload: BaseModel) -> bytes:
+    """Digest of a request payload, so byte-identical retries share a key."""
+    return hashlib.blake2b(payload.model_dump_json().encode("utf-8"), digest_size=16).digest()
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight computation among concurrent callers with the same key.
+
+    The first caller for a key starts the computation in its own task; callers
+    arriving before it finishes await that task instead of starting another,
+    and all of them get its result or its exception. A caller that gives up
+    (a client disconnecting) leaves the computation running for the rest; it
+    is cancelled only once nobody is waiting on it. Nothing is kept once the
+    computation finishes, so later calls always run afresh.
+    """
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self._enabled = enabled
+        self._calls: dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self._enabled:
+            return await fn()
+
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                # Every caller left; later callers start a new computation.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
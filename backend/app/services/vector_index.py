@@ -0,0 +1,189 @@
+"""In-process nearest-neighbour indexes over unit-length embeddings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+
+# Below this many vectors an exact scan is cheaper than maintaining clusters.
+IVF_THRESHOLD = 4096
+IVF_PROBES = 8
+KMEANS_ITERATIONS = 8
+# k-means runs on at most this many sampled rows per cluster.
+KMEANS_SAMPLE_PER_CLUSTER = 32
+INITIAL_CAPACITY = 64
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` largest scores, best first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    best = np.argpartition(-scores, k)[:k]
+    return best[np.argsort(-scores[best])]
+
+
+@dataclass(slots=True)
+class Partition:
+    """IVF clusters fitted on the first ``size`` rows of an index."""
+
+    centroids: np.ndarray
+    # Rows of each cluster, in row order.
+    members: list[list[int]]
+    size: int
+
+
+def fit_partition(vectors: np.ndarray) -> Partition:
+    """Fit spherical k-means on a sample of ``vectors``, then assign every row.
+
+    Pure NumPy over a read-only view, so it can run on a worker thread while
+    the index keeps taking writes past ``len(vectors)``.
+    """
+    size = len(vectors)
+    count = max(1, int(np.sqrt(size)))
+    rng = np.random.default_rng(size)
+    sample_size = min(size, count * KMEANS_SAMPLE_PER_CLUSTER)
+    sample = vectors[np.sort(rng.choice(size, size=sample_size, replace=False))]
+    centroids = sample[rng.choice(sample_size, size=count, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        members, starts = np.unique(assignment[order], return_index=True)
+        sums = np.zeros_like(centroids)
+        sums[members] = np.add.reduceat(sample[order], starts, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Clusters that lost every row keep their previous centroid.
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+    centroids = centroids.astype(np.float32)
+    clusters = np.argmax(vectors @ centroids.T, axis=1)
+    order = np.argsort(clusters, kind="stable")
+    bounds = np.cumsum(np.bincount(clusters, minlength=count))[:-1]
+    return Partition(
+        centroids=centroids,
+        members=[rows.tolist() for rows in np.split(order, bounds)],
+        size=size,
+    )
+
+
+class VectorIndex:
+    """Cosine-similarity index; rows are numbered in insertion order.
+
+    Small indexes are scanned exactly with one matrix-vector product. Once an
+    index reaches ``ivf_threshold`` rows it is due an inverted-file (IVF)
+    partition: rows are clustered with k-means, each cluster keeps its row
+    list, and a query only scores the rows of its ``probes`` nearest
+    clusters. Clusters are refitted each time the index doubles in size.
+    Fitting is left to the owner (``training_due``, ``fit_partition``,
+    ``install``) so it can run off the event loop; ``train`` does all three
+    in place.
+
+    Vectors live in one contiguous float32 matrix, so ``save`` writes a plain
+    ``.npy`` file and ``load`` can memory-map it instead of reading it in.
+    """
+
+    def __init__(
+        self,
+        dimensions: int,
+        *,
+        ivf_threshold: int = IVF_THRESHOLD,
+        probes: int = IVF_PROBES,
+    ) -> None:
+        self.dimensions = dimensions
+        self._ivf_threshold = ivf_threshold
+        self._probes = probes
+        self._vectors = np.empty((INITIAL_CAPACITY, dimensions), dtype=np.float32)
+        self._size = 0
+        self._centroids: np.ndarray | None = None
+        self._members: list[list[int]] = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def partitioned(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def training_due(self) -> bool:
+        return self._size >= max(self._ivf_threshold, 2 * self._trained_size)
+
+    def rows(self) -> np.ndarray:
+        """Read-only view of the stored vectors; later writes never modify it."""
+        view = self._vectors[: self._size]
+        view.flags.writeable = False
+        return view
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        needed = self._size + len(vectors)
+        # Memory-mapped matrices are read-only, so the first write copies them.
+        if needed > len(self._vectors) or not self._vectors.flags.writeable:
+            capacity = max(INITIAL_CAPACITY, len(self._vectors))
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty((capacity, self.dimensions), dtype=np.float32)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+        start = self._size
+        self._vectors[start:needed] = vectors
+        self._size = needed
+        if self._centroids is not None:
+            self._assign(self._centroids, start, needed)
+
+    def _assign(self, centroids: np.ndarray, start: int, stop: int) -> None:
+        clusters = np.argmax(self._vectors[start:stop] @ centroids.T, axis=1)
+        for row, cluster in enumerate(clusters.tolist(), start):
+            self._members[cluster].append(row)
+
+    def install(self, partition: Partition) -> None:
+        """Switch to ``partition``, assigning the rows added while it was fitted."""
+        self._centroids = partition.centroids
+        self._members = partition.members
+        self._trained_size = partition.size
+        self._assign(partition.centroids, partition.size, self._size)
+
+    def train(self) -> None:
+        """Fit and install a partition on the calling thread."""
+        self.install(fit_partition(self.rows()))
+
+    def search(self, query: np.ndarray, k: int) -> list[tuple[int, float]]:
+        """Return up to ``k`` ``(row, cosine similarity)`` pairs, most similar first."""
+        if not self._size or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(self.dimensions)
+        if self._centroids is None:
+            scores = self._vectors[: self._size] @ query
+            best = _top_k(scores, k)
+            return [(int(row), float(scores[row])) for row in best]
+
+        probed = _top_k(self._centroids @ query, self._probes)
+        rows = np.fromiter(
+            chain.from_iterable(self._members[cluster] for cluster in probed.tolist()),
+            dtype=np.intp,
+        )
+        if not len(rows):
+            return []
+        scores = self._vectors[rows] @ query
+        best = _top_k(scores, k)
+        return [(int(rows[position]), float(scores[position])) for position in best]
+
+    def save(self, path: Path) -> None:
+        np.save(path, self._vectors[: self._size])
+
+    @classmethod
+    def load(
+        cls, path: Path, *, mmap: bool = True, size: int | None = None, **options: int
+    ) -> "VectorIndex":
+        """Open a saved index, memory-mapping the vectors unless ``mmap`` is false.
+
+        Only the first ``size`` rows are used when given. The index starts
+        unpartitioned; check ``training_due`` to fit one.
+        """
+        vectors = np.load(path, mmap_mode="r" if mmap else None)
+        index = cls(vectors.shape[1], **options)
+        index._vectors = vectors
+        index._size = len(vectors) if size is None else min(size, len(vectors))
+        return index
@@ -0,0 +1,74 @@
+"""Compare per-category set sums against the compiled lexicon's batch scorer,
+and time loading the largest lexicon from its binary file.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_emotion_scoring
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import tempfile
+import timeit
+from collections import Counter
+from pathlib import Path
+
+from app.services.lexicon import CATEGORIES, CompiledLexicon
+
+LEXICON_SIZES = (20, 1_000, 10_000, 50_000)
+BATCH_SIZE = 500
+TEXT_WORDS = 40
+REPEATS = 3
+VOCABULARY_SIZE = 60_000
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 8)))
+
+
+def _naive_batch(sets: dict[str, set[str]], texts: list[str]) -> list[dict[str, int]]:
+    results = []
+    for text in texts:
+        tokens = Counter(word.strip(".,!?").lower() for word in text.split())
+        results.append(
+            {category: sum(tokens[term] for term in terms) for category, terms in sets.items()}
+        )
+    return results
+
+
+def main() -> None:
+    rng = random.Random(11)
+    words: set[str] = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(_random_word(rng))
+    vocabulary = sorted(words)
+
+    print(f"{BATCH_SIZE} texts of {TEXT_WORDS} words, best of {REPEATS} runs")
+    print(f"{'terms':>7} {'naive ms/batch':>15} {'compiled ms/batch':>18} {'speedup':>8}")
+    for size in LEXICON_SIZES:
+        terms = rng.sample(vocabulary, size)
+        sets = {
+            category: set(terms[index :: len(CATEGORIES)])
+            for index, category in enumerate(CATEGORIES)
+        }
+        lexicon = CompiledLexicon.from_sets(sets)
+        texts = [" ".join(rng.choices(vocabulary, k=TEXT_WORDS)) for _ in range(BATCH_SIZE)]
+
+        naive = min(timeit.repeat(lambda: _naive_batch(sets, texts), number=1, repeat=REPEATS))
+        compiled = min(timeit.repeat(lambda: lexicon.score_batch(texts), number=1, repeat=REPEATS))
+        print(f"{size:>7} {naive * 1e3:>15.1f} {compiled * 1e3:>18.1f} {naive / compiled:>7.1f}x")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "lexicon.npz"
+        lexicon.save(path)
+        load = min(timeit.repeat(lambda: CompiledLexicon.load(path), number=1, repeat=REPEATS))
+        print(
+            f"loading {len(lexicon)} terms: {load * 1e3:.1f} ms "
+            f"from {path.stat().st_size / 1024:.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure batch safety screening throughput, overall and per core.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_safety_batch
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import string
+import time
+
+from app.services.safety import CRISIS_KEYWORDS, SafetyService
+from app.services.screening import SafetyScreener
+
+BATCH_SIZE = 20_000
+TEXT_WORDS = 40
+CRISIS_SHARE = 0.02
+
+
+def _texts(rng: random.Random) -> list[str]:
+    phrases = list(CRISIS_KEYWORDS)
+    texts = []
+    for _ in range(BATCH_SIZE):
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9)))
+            for _ in range(TEXT_WORDS)
+        ]
+        if rng.random() < CRISIS_SHARE:
+            words.insert(rng.randrange(len(words)), rng.choice(phrases))
+        texts.append(" ".join(words))
+    return texts
+
+
+async def _screen(screener: SafetyScreener, texts: list[str]) -> float:
+    start = time.perf_counter()
+    async for _ in screener.screen(texts):
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    texts = _texts(random.Random(3))
+    safety = SafetyService()
+    cores = os.cpu_count() or 1
+
+    start = time.perf_counter()
+    for text in texts:
+        safety.match_categories(text)
+    baseline = time.perf_counter() - start
+
+    print(f"{BATCH_SIZE} texts of ~{TEXT_WORDS} words, {cores} CPU(s)")
+    print(f"{'mode':>22} {'texts/s':>10} {'texts/s/core':>13}")
+    print(f"{'sequential, in-loop':>22} {BATCH_SIZE / baseline:>10.0f} {BATCH_SIZE / baseline:>13.0f}")
+
+    threaded = SafetyScreener(safety, workers=0, parallel_threshold=0)
+    elapsed = asyncio.run(_screen(threaded, texts))
+    print(f"{'batch, thread':>22} {BATCH_SIZE / elapsed:>10.0f} {BATCH_SIZE / elapsed:>13.0f}")
+
+    for workers in sorted({1, 2, cores}):
+        screener = SafetyScreener(safety, workers=workers, parallel_threshold=0)
+        try:
+            # The first batch pays for spawning the workers.
+            asyncio.run(_screen(screener, texts[:1]))
+            elapsed = asyncio.run(_screen(screener, texts))
+        finally:
+            screener.close()
+        used = min(workers, cores)
+        label = f"batch, {workers} process(es)"
+        print(f"{label:>22} {BATCH_SIZE / elapsed:>10.0f} {BATCH_SIZE / elapsed / used:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare per-phrase substring scans against the compiled phrase matcher.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_safety_matcher
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import timeit
+
+from app.services.matcher import PhraseMatcher, normalize_text
+
+KEYWORD_COUNTS = (10, 100, 1_000, 5_000)
+TEXT_WORDS = 200
+REPEATS = 50
+
+
+def _random_phrase(rng: random.Random) -> str:
+    words = rng.randint(1, 3)
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(words)
+    )
+
+
+def _naive_scan(keywords: dict[str, str], text: str) -> set[str]:
+    normalized = normalize_text(text)
+    return {category for phrase, category in keywords.items() if phrase in normalized}
+
+
+def main() -> None:
+    rng = random.Random(7)
+    text = " ".join(_random_phrase(rng) for _ in range(TEXT_WORDS // 2))
+
+    print(f"text length: {len(text)} chars, {REPEATS} scans per measurement")
+    print(f"{'keywords':>9} {'naive us/scan':>14} {'automaton us/scan':>18} {'speedup':>8}")
+    for count in KEYWORD_COUNTS:
+        keywords = {_random_phrase(rng): f"category-{index % 5}" for index in range(count)}
+        matcher = PhraseMatcher(keywords)
+
+        naive = timeit.timeit(lambda: _naive_scan(keywords, text), number=REPEATS) / REPEATS
+        compiled = timeit.timeit(lambda: matcher.find_categories(text), number=REPEATS) / REPEATS
+        print(f"{count:>9} {naive * 1e6:>14.1f} {compiled * 1e6:>18.1f} {naive / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
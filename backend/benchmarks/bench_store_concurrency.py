@@ -0,0 +1,90 @@
+"""Throughput of the journal store as concurrent users grow.
+
+Compares the previous single ``asyncio.Lock`` store with the lock-free
+per-user in-memory repository. Run from the ``backend`` directory::
+
+    python -m benchmarks.bench_store_concurrency
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, Sequence
+
+from app.repositories import JournalRepository
+from app.repositories.memory import InMemoryJournalRepository
+from app.schemas.journal import JournalEntry
+
+USER_COUNTS = (1, 10, 100, 1_000)
+OPS_PER_USER = 200
+PRELOADED_ENTRIES = 200
+
+
+class GlobalLockJournalRepository(JournalRepository):
+    """The previous layout: one dict and one lock for every user."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, list[JournalEntry]] = {}
+        self._lock = asyncio.Lock()
+
+    async def add(self, user_id: str, entry: JournalEntry) -> None:
+        async with self._lock:
+            self._entries.setdefault(user_id, []).append(entry)
+
+    async def add_many(self, user_id: str, entries: Sequence[JournalEntry]) -> None:
+        async with self._lock:
+            self._entries.setdefault(user_id, []).extend(entries)
+
+    async def list(self, user_id: str) -> list[JournalEntry]:
+        async with self._lock:
+            return list(self._entries.get(user_id, []))
+
+    async def clear(self) -> None:
+        async with self._lock:
+            self._entries.clear()
+
+
+def _entry(index: int) -> JournalEntry:
+    now = datetime.now(timezone.utc)
+    return JournalEntry(
+        id=f"entry-{index}", content="Short note.", created_at=now, updated_at=now
+    )
+
+
+async def _user_workload(repository: JournalRepository, user_id: str, entry: JournalEntry) -> None:
+    for op in range(OPS_PER_USER):
+        if op % 4 == 0:
+            await repository.add(user_id, entry)
+        else:
+            await repository.list(user_id)
+        # Yield like a real request handler would between awaits on I/O.
+        await asyncio.sleep(0)
+
+
+async def _measure(repository: JournalRepository, users: int) -> float:
+    preload = [_entry(index) for index in range(PRELOADED_ENTRIES)]
+    for user in range(users):
+        await repository.add_many(f"user-{user}", preload)
+
+    entry = _entry(-1)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_user_workload(repository, f"user-{user}", entry) for user in range(users))
+    )
+    elapsed = time.perf_counter() - started
+    return users * OPS_PER_USER / elapsed
+
+
+async def main() -> None:
+    print(f"{OPS_PER_USER} ops per user (25% writes), {PRELOADED_ENTRIES} entries per user")
+    print(f"{'users':>6} {'global lock ops/s':>18} {'per-user ops/s':>14} {'ratio':>6}")
+    for users in USER_COUNTS:
+        baseline = await _measure(GlobalLockJournalRepository(), users)
+        per_user = await _measure(InMemoryJournalRepository(), users)
+        print(f"{users:>6} {baseline:>18,.0f} {per_user:>14,.0f} {per_user / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
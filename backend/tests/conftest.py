@@ -11,6 +11,7 @@ from httpx import ASGITransport, AsyncClient
 from app.main import create_app
 from app.services.journal import journal_service
 from app.services.mood import mood_service
+from app.services.sessions import session_store
 
 
 @pytest.fixture()
@@ -32,6 +33,8 @@ async def reset_state() -> AsyncGenerator[None, None]:
     """Clear in-memory services before and after each test."""
     await journal_service.clear()
     await mood_service.clear()
+    await session_store.clear()
     yield
     await journal_service.clear()
     await mood_service.clear()
+    await session_store.clear()
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import json
+
 import pytest
 
 
@@ -51,6 +53,19 @@ async def test_journal_flow(client) -> None:
     assert summary_response.status_code == 200
     assert summary["total_entries"] == 1
     assert summary["mood_counts"]["sad"] == 1
+    assert summary["tag_counts"] == {"daily": 1}
+    assert len(summary["entries_per_week"]) == 12
+    assert summary["entries_per_week"][-1]["count"] == 1
+    assert summary["last_entry_at"] == entries[0]["created_at"]
+
+    search_response = await client.get(
+        "/api/journal/user-1/search", params={"q": "heavy day", "tag": "daily"}
+    )
+    assert search_response.status_code == 200
+    hits = search_response.json()
+    assert [hit["id"] for hit in hits] == [entries[0]["id"]]
+    assert hits[0]["score"] > 0
+    assert "X-Next-Offset" not in search_response.headers
 
 
 @pytest.mark.anyio("asyncio")
@@ -73,7 +88,118 @@ async def test_mood_logging_and_trend(client) -> None:
     assert trend_response.status_code == 200
     trend = trend_response.json()
     assert len(trend) == 1
-    assert "average_intensity" in trend[0]
+    assert trend[0]["average_intensity"] == 3
+    assert trend[0]["dominant_mood"] == "anxious"
+    assert trend[0]["count"] == 2
+
+    monthly = await client.get(
+        "/api/mood/user-2/trend", params={"granularity": "month", "range": "year"}
+    )
+    assert monthly.status_code == 200
+    assert monthly.json()[0]["date"].endswith("-01")
+    assert monthly.json()[0]["count"] == 2
+
+    invalid = await client.get("/api/mood/user-2/trend", params={"range": "decade"})
+    assert invalid.status_code == 422
+
+    local = await client.get("/api/mood/user-2/trend", params={"timezone": "Asia/Tokyo"})
+    assert local.status_code == 200
+    assert sum(point["count"] for point in local.json()) == 2
+
+    unknown = await client.get("/api/mood/user-2/trend", params={"timezone": "Mars/Olympus"})
+    assert unknown.status_code == 400
+
+
+@pytest.mark.anyio("asyncio")
+async def test_journal_bulk_upload_is_idempotent_and_reports_each_item(client) -> None:
+    items = [
+        {"content": "Offline note", "created_at": "2024-03-01T08:00:00Z", "idempotency_key": "n1"},
+        {"content": ""},
+        {"content": "Another", "mood": "calm", "idempotency_key": "n2"},
+        {"content": "Time traveller", "created_at": "2999-01-01T00:00:00Z"},
+    ]
+    response = await client.post("/api/journal/user-1/entries/bulk", json=items)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["duplicates"], body["invalid"]) == (2, 0, 2)
+    assert [item["status"] for item in body["items"]] == ["created", "invalid", "created", "invalid"]
+    assert body["items"][1]["errors"][0]["loc"] == ["content"]
+
+    retry = await client.post("/api/journal/user-1/entries/bulk", json=items[:1] + items[2:3])
+    assert [item["status"] for item in retry.json()["items"]] == ["duplicate", "duplicate"]
+    assert retry.json()["items"][0]["id"] == body["items"][0]["id"]
+
+    entries = (await client.get("/api/journal/user-1/entries")).json()
+    assert [entry["content"] for entry in entries] == ["Offline note", "Another"]
+    assert entries[0]["created_at"].startswith("2024-03-01T08:00:00")
+    summary = (await client.get("/api/journal/user-1/summary")).json()
+    assert summary["total_entries"] == 2
+
+    assert (await client.post("/api/journal/user-1/entries/bulk", json={"a": 1})).status_code == 400
+    assert (await client.post("/api/journal/user-1/entries/bulk", json=[])).status_code == 400
+
+
+@pytest.mark.anyio("asyncio")
+async def test_mood_bulk_upload_accepts_ndjson(client) -> None:
+    lines = [
+        json.dumps({"mood": "calm", "intensity": 3, "recorded_at": "2024-03-01T08:00:00Z"}),
+        "{not json",
+        json.dumps({"mood": "sad", "intensity": 2, "idempotency_key": "m1"}),
+    ]
+    response = await client.post(
+        "/api/mood/user-1/logs/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["status"] for item in body["items"]] == ["created", "invalid", "created"]
+
+    trend = (await client.get("/api/mood/user-1/trend")).json()
+    assert sum(point["count"] for point in trend) == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_change_feeds_return_only_new_records(client) -> None:
+    first = await client.post("/api/journal/user-1/entries", json={"content": "First"})
+    sync = (await client.get("/api/journal/user-1/changes")).json()
+    assert sync["full"] is True
+    assert [entry["id"] for entry in sync["entries"]] == [first.json()["id"]]
+
+    second = await client.post("/api/journal/user-1/entries", json={"content": "Second"})
+    delta = await client.get(
+        "/api/journal/user-1/changes", params={"since_version": sync["version"]}
+    )
+    assert delta.status_code == 200
+    body = delta.json()
+    assert body["full"] is False
+    assert [entry["id"] for entry in body["entries"]] == [second.json()["id"]]
+    assert body["deleted"] == []
+    assert body["version"] == sync["version"] + 1
+
+    await client.post("/api/mood/user-1/logs", json={"mood": "calm", "intensity": 3})
+    await client.post("/api/mood/user-1/logs", json={"mood": "sad", "intensity": 2})
+    page = (
+        await client.get("/api/mood/user-1/changes", params={"since_version": 1, "limit": 1})
+    ).json()
+    assert [log["mood"] for log in page["logs"]] == ["sad"]
+    assert page["has_more"] is False
+
+    snapshot = (await client.get("/api/mood/user-1/changes", params={"limit": 1})).json()
+    assert (snapshot["full"], snapshot["has_more"]) == (True, True)
+    following = (
+        await client.get(
+            "/api/mood/user-1/changes",
+            params={"since_version": snapshot["version"], "cursor": snapshot["cursor"], "limit": 1},
+        )
+    ).json()
+    assert (following["full"], following["has_more"], following["cursor"]) == (False, False, None)
+    assert [log["mood"] for log in snapshot["logs"] + following["logs"]] == ["calm", "sad"]
+
+    invalid = await client.get("/api/mood/user-1/changes", params={"since_version": -1})
+    assert invalid.status_code == 422
+    garbled = await client.get("/api/journal/user-1/changes", params={"cursor": "%%%"})
+    assert garbled.status_code == 400
 
 
 @pytest.mark.anyio("asyncio")
@@ -89,3 +215,141 @@ async def test_safety_check_detects_crisis(client) -> None:
     assert body["crisis_detected"] is True
     assert body["risk_level"] == "high"
     assert body["hotline"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_safety_batch_streams_results_in_order(client) -> None:
+    payload = {
+        "items": [
+            {"id": "a", "text": "Lovely walk today."},
+            {"id": "b", "text": "I might overdose tonight.", "locale": "en-GB"},
+            {"text": "I can't go on"},
+        ]
+    }
+    response = await client.post("/api/safety/check/batch", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["id"] for result in results] == ["a", "b", None]
+    assert [result["crisis_detected"] for result in results] == [False, True, True]
+    assert results[1]["matched_category"] == "substance-risk"
+    assert results[1]["hotline"].startswith("Samaritans")
+
+
+@pytest.mark.anyio("asyncio")
+async def test_safety_batch_accepts_ndjson_bodies(client) -> None:
+    lines = "\n".join(json.dumps({"id": str(index), "text": f"note {index}"}) for index in range(5))
+    body = lines + '\n{"id": "last", "text": "I want to end it all"}\n'
+    response = await client.post(
+        "/api/safety/check/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+        params={"locale": "en-IN"},
+    )
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert len(results) == 6
+    assert results[-1]["id"] == "last" and results[-1]["crisis_detected"] is True
+    assert results[0]["hotline"].startswith("Kiran")
+
+    invalid = await client.post(
+        "/api/safety/check/batch",
+        content='{"text": "fine"}\n{"text": ""}\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"]["line"] == 2
+
+
+@pytest.mark.anyio("asyncio")
+async def test_chat_session_stream_emits_deltas_and_trailer(client) -> None:
+    payload = {
+        "messages": [
+            {"role": "user", "content": "I'm feeling anxious about tomorrow."}
+        ]
+    }
+    response = await client.post("/api/chat/session/stream", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    frames = [json.loads(line) for line in response.text.splitlines() if line]
+    deltas = [frame for frame in frames if frame["type"] == "delta"]
+    trailer = frames[-1]
+    assert deltas
+    assert trailer["type"] == "final"
+    assert trailer["reply"]["content"] == "".join(frame["content"] for frame in deltas).strip()
+    assert trailer["safety"]["crisis_detected"] is False
+    assert isinstance(trailer["suggestions"], list)
+
+
+@pytest.mark.anyio("asyncio")
+async def test_chat_session_stream_crisis_skips_model(client) -> None:
+    payload = {"messages": [{"role": "user", "content": "I want to end it all."}]}
+    response = await client.post("/api/chat/session/stream", json=payload)
+    assert response.status_code == 200
+
+    frames = [json.loads(line) for line in response.text.splitlines() if line]
+    assert frames[-1]["safety"]["crisis_detected"] is True
+    assert "concerned for your safety" in frames[0]["content"]
+
+
+@pytest.mark.anyio("asyncio")
+async def test_metrics_endpoint(client) -> None:
+    response = await client.get("/api/metrics")
+    assert response.status_code == 200
+    assert "reply_cache" in response.json()
+    assert set(response.json()["single_flight"]) == {"chat", "mood", "journal"}
+
+
+@pytest.mark.anyio("asyncio")
+async def test_chat_session_appends_to_server_side_transcript(client) -> None:
+    first = await client.post(
+        "/api/chat/session",
+        json={"session_id": "s-1", "messages": [{"role": "user", "content": "hi"}]},
+    )
+    assert first.status_code == 200
+    assert first.json()["session_id"] == "s-1"
+
+    second = await client.post(
+        "/api/chat/session",
+        json={"session_id": "s-1", "messages": [{"role": "user", "content": "I feel lonely"}]},
+    )
+    assert second.status_code == 200
+
+    transcript = (await client.get("/api/chat/sessions/s-1")).json()
+    assert [message["role"] for message in transcript["messages"]] == [
+        "user",
+        "assistant",
+        "user",
+        "assistant",
+    ]
+    assert transcript["messages"][2]["content"] == "I feel lonely"
+
+    assert (await client.delete("/api/chat/sessions/s-1")).status_code == 204
+    assert (await client.get("/api/chat/sessions/s-1")).status_code == 404
+
+
+@pytest.mark.anyio("asyncio")
+async def test_journal_entries_are_paginated(client) -> None:
+    for index in range(3):
+        await client.post(
+            "/api/journal/user-3/entries",
+            json={"title": f"Entry {index}", "content": "Some thoughts."},
+        )
+
+    first = await client.get("/api/journal/user-3/entries", params={"limit": 2})
+    assert [entry["title"] for entry in first.json()] == ["Entry 0", "Entry 1"]
+    cursor = first.headers["x-next-cursor"]
+
+    second = await client.get(
+        "/api/journal/user-3/entries",
+        params={"limit": 2, "cursor": cursor, "include_content": "false"},
+    )
+    assert [entry["title"] for entry in second.json()] == ["Entry 2"]
+    assert "content" not in second.json()[0]
+    assert "x-next-cursor" not in second.headers
+
+    invalid = await client.get("/api/journal/user-3/entries", params={"cursor": "%%%"})
+    assert invalid.status_code == 400
@@ -0,0 +1,68 @@
+"""Unit tests for prompt context windowing."""
+
+from __future__ import annotations
+
+from app.schemas.chat import ChatMessage
+from app.services import context, session_state
+from app.services.context import ContextWindowManager, estimate_tokens
+
+
+def _transcript(turns: int) -> list[ChatMessage]:
+    messages: list[ChatMessage] = []
+    for index in range(turns):
+        messages.append(ChatMessage(role="user", content=f"Message {index}. " + "detail " * 20))
+        messages.append(ChatMessage(role="assistant", content="I hear you. " + "reply " * 20))
+    return messages
+
+
+def test_short_transcripts_pass_through_untouched() -> None:
+    manager = ContextWindowManager(token_budget=2000, summary_token_budget=100, max_sessions=10)
+    messages = _transcript(2)
+
+    window = manager.fit("s", messages)
+
+    assert window.messages == messages
+    assert window.summary is None
+
+
+def test_long_transcripts_keep_recent_turns_and_summarise_the_rest() -> None:
+    manager = ContextWindowManager(token_budget=300, summary_token_budget=60, max_sessions=10)
+    messages = _transcript(10)
+
+    window = manager.fit("s", messages)
+
+    assert window.messages[-1] == messages[-1]
+    assert len(window.messages) < len(messages)
+    assert sum(estimate_tokens(message.content) for message in window.messages) <= 300
+    assert window.summary is not None and "Message" in window.summary
+    assert estimate_tokens(window.summary) <= 60
+
+
+def test_summaries_are_extended_without_resummarising_the_prefix(monkeypatch) -> None:
+    manager = ContextWindowManager(token_budget=300, summary_token_budget=200, max_sessions=10)
+    calls: list[str] = []
+    original = context._snippet
+
+    def _counting_snippet(message: ChatMessage) -> str | None:
+        calls.append(message.content)
+        return original(message)
+
+    monkeypatch.setattr(context, "_snippet", _counting_snippet)
+
+    messages = _transcript(10)
+    manager.fit("s", messages)
+    first_pass = len(calls)
+
+    hashed: list[str] = []
+    chain_digest = session_state.chain_digest
+    monkeypatch.setattr(
+        session_state,
+        "chain_digest",
+        lambda previous, text: hashed.append(text) or chain_digest(previous, text),
+    )
+
+    manager.fit("s", messages + _transcript(1))
+    assert manager.stats()["summaries_reused"] == 1
+    assert len(calls) - first_pass == 2
+    # The memo is checked against its last dropped message, then extended by the new ones.
+    assert len(hashed) == 3
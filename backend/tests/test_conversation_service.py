@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 
+from app.schemas.chat import ChatMessage, ChatRequest
 from app.services.conversation import ConversationService
+from app.services.embeddings import HashingEmbedder
+from app.services.llm import FakeProvider, GeminiProvider, LLMResult
+from app.services.retrieval import LocalMemoryStore
 
 
 @dataclass
@@ -44,7 +49,7 @@ def test_extract_response_text_returns_joined_text() -> None:
         ]
     )
 
-    text, finish_reason = ConversationService._extract_response_text(response)
+    text, finish_reason = GeminiProvider._extract_response_text(response)
 
     assert text == "Hello world"
     assert finish_reason == "FinishReason.MAX_TOKENS"
@@ -58,8 +63,139 @@ def test_extract_response_text_handles_missing_parts_and_feedback() -> None:
         prompt_feedback=_PromptFeedback(block_reason="BlockedReason.SAFETY"),
     )
 
-    text, finish_reason = ConversationService._extract_response_text(response)
+    text, finish_reason = GeminiProvider._extract_response_text(response)
 
     assert text is None
     # We should still surface the finish_reason from the candidate even without text parts
     assert finish_reason == "FinishReason.MAX_TOKENS"
+
+
+def test_extract_chunk_text_preserves_whitespace() -> None:
+    chunk = _Response(
+        candidates=[
+            _Candidate(content=_Content(parts=[_Part(text=" there,"), _Part(text=" friend ")]), finish_reason=None)
+        ]
+    )
+
+    assert GeminiProvider._extract_chunk_text(chunk) == " there, friend "
+    assert GeminiProvider._extract_chunk_text(_Response(candidates=[])) == ""
+
+
+class _CountingProvider(FakeProvider):
+    """Fake provider that records how many calls overlap."""
+
+    def __init__(self, max_concurrency: int) -> None:
+        super().__init__(max_concurrency=max_concurrency)
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return LLMResult(text="Hi", finish_reason="STOP")
+
+
+async def test_draft_llm_respects_provider_concurrency_limit() -> None:
+    provider = _CountingProvider(max_concurrency=2)
+    service = ConversationService(provider)
+
+    messages = [ChatMessage(role="user", content="hello")]
+    drafts = await asyncio.gather(*(service._draft_llm(messages, locale="en-US") for _ in range(6)))
+
+    assert [reply for _, reply, _ in drafts] == ["Hi"] * 6
+    assert provider.peak == 2
+
+
+async def test_fake_provider_drives_full_pipeline() -> None:
+    service = ConversationService(FakeProvider(latency_ms=1, tokens_per_second=10_000))
+    request = ChatRequest(messages=[ChatMessage(role="user", content="I feel worried")])
+
+    response = await service.generate_reply(request)
+    assert response.reply.content == "I hear you saying: I feel worried. Tell me more about that."
+
+    streamed = [event async for event in service.stream_reply(request)]
+    deltas = "".join(event.content for event in streamed[:-1])
+    assert deltas == response.reply.content
+    assert streamed[-1].reply.content == response.reply.content
+
+
+class _SlowProvider(FakeProvider):
+    """Fake provider whose calls hang until cancelled."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = 0
+        self.cancelled = 0
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        self.started += 1
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return LLMResult(text="too late", finish_reason="STOP")
+
+    async def _stream(self, prompt: str):
+        result = await self._generate(prompt)
+        yield result.text
+
+
+async def test_crisis_turn_cancels_the_in_flight_model_call() -> None:
+    provider = _SlowProvider()
+    service = ConversationService(provider)
+    request = ChatRequest(messages=[ChatMessage(role="user", content="I want to end it all")])
+
+    response = await asyncio.wait_for(service.generate_reply(request), timeout=2)
+
+    assert response.safety.crisis_detected
+    assert "concerned" in response.reply.content
+    assert provider.cancelled == provider.started
+    assert service.metrics()["cancelled_llm_calls"] == 1
+
+
+async def test_crisis_stream_never_forwards_model_output() -> None:
+    provider = _SlowProvider()
+    service = ConversationService(provider)
+    request = ChatRequest(messages=[ChatMessage(role="user", content="I want to end it all")])
+
+    frames = await asyncio.wait_for(_collect(service.stream_reply(request)), timeout=2)
+
+    assert frames[0].content == frames[-1].reply.content
+    assert frames[-1].safety.crisis_detected
+    assert service.metrics()["cancelled_llm_calls"] == 1
+
+
+async def _collect(stream):
+    return [frame async for frame in stream]
+
+
+class _RecordingMemory(LocalMemoryStore):
+    """Local memory store that records the texts passed to each ``remember``."""
+
+    def __init__(self) -> None:
+        super().__init__(HashingEmbedder())
+        self.remembered: list[list[str]] = []
+
+    async def remember(self, user_id, texts, *, kind):
+        self.remembered.append(list(texts))
+        await super().remember(user_id, texts, kind=kind)
+
+
+async def test_turns_remember_only_the_new_user_message() -> None:
+    memory = _RecordingMemory()
+    service = ConversationService(FakeProvider(latency_ms=1), memory=memory)
+    history: list[ChatMessage] = []
+
+    for text in ("Work was long", "Then I walked by the lake", "Slept early"):
+        history.append(ChatMessage(role="user", content=text))
+        response = await service.generate_reply(
+            ChatRequest(user_id="user-1", messages=list(history))
+        )
+        history.append(response.reply)
+
+    assert memory.remembered == [["Work was long"], ["Then I walked by the lake"], ["Slept early"]]
+    assert memory.stats()["memories"] == 3
+    await memory.aclose()
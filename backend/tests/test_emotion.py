@@ -0,0 +1,106 @@
+"""Unit tests for compiled lexicon emotion scoring."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services.emotion import EmotionService
+from app.services.lexicon import CompiledLexicon
+
+
+def test_batch_scores_each_text_independently() -> None:
+    service = EmotionService()
+
+    scores = service.score_batch(["Calm, hopeful and calm!", "", "still worried and sad"])
+
+    assert scores.shape == (3, len(service.lexicon.categories))
+    column = {category: index for index, category in enumerate(service.lexicon.categories)}
+    assert scores[0, column["positive"]] == 3
+    assert not scores[1].any()
+    assert scores[2, column["anxious"]] == 1
+    assert scores[2, column["sad"]] == 1
+
+
+def test_batch_estimates_match_single_text_estimates() -> None:
+    service = EmotionService()
+    texts = ["Grateful and relieved today", "Nothing much", "Angry, upset and lonely"]
+
+    assert service.estimate_batch(texts) == [service.estimate([text]) for text in texts]
+    assert service.estimate_batch(["Nothing much"])[0][0].label == "neutral"
+
+
+def test_weighted_terms_can_count_towards_several_categories() -> None:
+    lexicon = CompiledLexicon(
+        {"heartbroken": {"sad": 1.0, "negative": 0.5}, "calm": {"positive": 1.0}}
+    )
+    service = EmotionService(lexicon)
+
+    (estimates,) = service.estimate_batch(["Heartbroken but calm"])
+
+    confidences = {estimate.label: estimate.confidence for estimate in estimates}
+    assert confidences == pytest.approx({"positive": 0.4, "negative": 0.2, "sad": 0.4})
+    np.testing.assert_allclose(
+        lexicon.score_batch(["heartbroken, heartbroken"])[0], [0.0, 1.0, 0.0, 2.0, 0.0]
+    )
+
+
+def test_negation_flips_terms_within_its_clause() -> None:
+    service = EmotionService()
+    column = {category: index for index, category in enumerate(service.lexicon.categories)}
+
+    not_calm, not_worried, clause, far = service.score_batch(
+        [
+            "I am not calm",
+            "I'm honestly not worried",
+            "It wasn't bad, but I feel lonely",
+            "no idea why I feel so calm",
+        ]
+    )
+
+    assert not_calm[column["positive"]] == 0
+    assert not_calm[column["negative"]] == 0.5
+    assert not_worried[column["anxious"]] == 0
+    assert not_worried[column["positive"]] == 0.5
+    assert clause[column["positive"]] == 0.5
+    assert clause[column["sad"]] == 1
+    assert far[column["positive"]] == pytest.approx(1.3)
+    assert service.estimate(["not calm"])[0].label == "negative"
+
+
+def test_intensifiers_scale_the_next_sentiment_term() -> None:
+    service = EmotionService()
+    column = {category: index for index, category in enumerate(service.lexicon.categories)}
+
+    (scores,) = service.score_batch(["extremely worried and slightly sad, very much"])
+
+    assert scores[column["anxious"]] == 2.0
+    assert scores[column["sad"]] == 0.5
+    assert scores.sum() == 2.5
+
+
+def test_compiled_lexicon_round_trips_through_binary_file(tmp_path) -> None:
+    source = tmp_path / "lexicon.tsv"
+    source.write_text(
+        "term\temotion\tscore\n"
+        "serene\tjoy\t0.6\n"
+        "serene\tpositive\t0.9\n"
+        "dread\tfear\t0.8\n"
+        "dread\tsurprise\t0.3\n"
+        "bleak\tsadness\t0\n",
+        "utf-8",
+    )
+    lexicon = CompiledLexicon.from_tsv(source)
+    lexicon.save(tmp_path / "lexicon.npz")
+
+    loaded = CompiledLexicon.load(tmp_path / "lexicon.npz")
+
+    assert len(loaded) == 2
+    assert loaded.categories == lexicon.categories
+    assert loaded.intensifiers == pytest.approx(lexicon.intensifiers)
+    texts = ["serene", "not dread", "bleak"]
+    scores = loaded.score_batch(texts)
+    np.testing.assert_allclose(scores, lexicon.score_batch(texts), atol=1e-3)
+    np.testing.assert_allclose(scores[0], [0.9, 0, 0, 0, 0], atol=1e-3)
+    np.testing.assert_allclose(scores[1], [0.4, 0, 0, 0, 0], atol=1e-3)
+    assert not scores[2].any()
@@ -0,0 +1,79 @@
+"""Unit tests for the reply cache."""
+
+from __future__ import annotations
+
+from app.schemas.chat import ChatMessage, ChatRequest
+from app.services.cache import ReplyCache
+from app.services.conversation import ConversationService
+from app.services.llm import FakeProvider, LLMResult
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_normalises_prompt_and_partitions_by_locale() -> None:
+    cache = ReplyCache(ttl_seconds=60, max_entries=10, max_bytes=10_000)
+    cache.set("en-US", "User: I feel  Anxious\nLyra:", "Let's breathe.")
+
+    assert cache.get("en-US", "user: i feel anxious lyra:") == "Let's breathe."
+    assert cache.get("en-GB", "User: I feel anxious\nLyra:") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_expires_entries_and_evicts_least_recently_used() -> None:
+    clock = _Clock()
+    cache = ReplyCache(ttl_seconds=10, max_entries=2, max_bytes=10_000, clock=clock)
+    cache.set("en-US", "a", "reply a")
+    cache.set("en-US", "b", "reply b")
+    assert cache.get("en-US", "a") == "reply a"
+
+    cache.set("en-US", "c", "reply c")
+    assert cache.get("en-US", "b") is None
+    assert cache.stats()["evictions"] == 1
+
+    clock.now = 11
+    assert cache.get("en-US", "a") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_cache_respects_byte_budget() -> None:
+    cache = ReplyCache(ttl_seconds=60, max_entries=100, max_bytes=400)
+    cache.set("en-US", "a", "x" * 100)
+    cache.set("en-US", "b", "y" * 100)
+
+    assert cache.get("en-US", "a") is None
+    assert cache.get("en-US", "b") == "y" * 100
+    assert cache.stats()["bytes"] <= 400
+
+
+class _CountingProvider(FakeProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        self.calls += 1
+        return await super()._generate(prompt)
+
+
+async def test_conversation_serves_repeats_from_cache_but_not_crises() -> None:
+    provider = _CountingProvider()
+    cache = ReplyCache(ttl_seconds=60, max_entries=10, max_bytes=10_000)
+    service = ConversationService(provider, reply_cache=cache)
+
+    hello = ChatRequest(messages=[ChatMessage(role="user", content="hi")])
+    first = await service.generate_reply(hello)
+    second = await service.generate_reply(hello)
+    assert first.reply.content == second.reply.content
+    assert provider.calls == 1
+
+    crisis = ChatRequest(messages=[ChatMessage(role="user", content="I want to end it all")])
+    response = await service.generate_reply(crisis)
+    assert response.safety.crisis_detected
+    assert cache.stats()["entries"] == 1
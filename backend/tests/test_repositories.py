@@ -0,0 +1,484 @@
+"""Contract tests shared by the journal and mood storage backends."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.core.sqlite import SQLiteDatabase
+from app.repositories import (
+    JournalRepository,
+    MoodRepository,
+    PageQuery,
+    SearchQuery,
+    decode_cursor,
+)
+from app.repositories.aggregates import MoodBucket, MoodSlot
+from app.repositories.base import split_changes
+from app.repositories.memory import InMemoryJournalRepository, InMemoryMoodRepository
+from app.repositories.sqlite import SCHEMA, SQLiteJournalRepository, SQLiteMoodRepository
+from app.schemas.journal import JournalEntry
+from app.schemas.mood import MoodLog
+
+BASE_TIME = datetime(2025, 1, 6, 9, 30, 0, 123456, tzinfo=timezone.utc)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def repositories(request) -> AsyncGenerator[tuple[JournalRepository, MoodRepository], None]:
+    if request.param == "memory":
+        yield InMemoryJournalRepository(), InMemoryMoodRepository()
+        return
+
+    database = SQLiteDatabase(":memory:", schema=SCHEMA)
+    journal, mood = SQLiteJournalRepository(database), SQLiteMoodRepository(database)
+    await journal.initialize()
+    yield journal, mood
+    await journal.close()
+    await mood.close()
+
+
+def _entry(index: int) -> JournalEntry:
+    created = BASE_TIME + timedelta(minutes=index)
+    return JournalEntry(
+        id=f"entry-{index}",
+        title=f"Entry {index}",
+        content="Wrote a few thoughts down.",
+        mood="calm" if index % 2 else None,
+        tags=["daily", f"tag-{index}"],
+        created_at=created,
+        updated_at=created,
+    )
+
+
+def _log(index: int) -> MoodLog:
+    return MoodLog(
+        id=f"log-{index}",
+        mood="anxious",
+        intensity=index % 5 + 1,
+        notes=None,
+        recorded_at=BASE_TIME + timedelta(hours=index),
+    )
+
+
+def _log_at(log_id: str, recorded_at: datetime) -> MoodLog:
+    return MoodLog(id=log_id, mood="calm", intensity=3, notes=None, recorded_at=recorded_at)
+
+
+async def test_journal_entries_round_trip_in_creation_order(repositories) -> None:
+    journal, _ = repositories
+    await journal.add("user-1", _entry(0))
+    await journal.add_many("user-1", [_entry(1), _entry(2)])
+    await journal.add("user-2", _entry(3))
+
+    entries = await journal.list("user-1")
+    assert entries == [_entry(0), _entry(1), _entry(2)]
+    assert await journal.list("missing") == []
+
+    await journal.clear()
+    assert await journal.list("user-1") == []
+
+
+
+async def test_journal_stats_are_maintained_on_write(repositories) -> None:
+    journal, _ = repositories
+    assert (await journal.stats("user-1")).total_entries == 0
+
+    repeated = _entry(0).model_copy(update={"tags": ["daily", "daily"]})
+    await journal.add("user-1", repeated)
+    # Entry 10080 lands a week (10080 minutes) later than entry 0.
+    await journal.add_many("user-1", [_entry(10080), _entry(1)])
+
+    first_week, second_week = date(2025, 1, 6), date(2025, 1, 13)
+    stats = await journal.stats("user-1", weeks=[first_week, second_week, date(2025, 1, 20)])
+    assert stats.total_entries == 3
+    assert stats.mood_counts == {"calm": 1}
+    assert stats.tag_counts == {"daily": 3, "tag-1": 1, "tag-10080": 1}
+    assert stats.weekly_counts == {first_week: 2, second_week: 1}
+    assert stats.first_entry_at == _entry(0).created_at
+    assert stats.last_entry_at == _entry(10080).created_at
+
+    assert (await journal.stats("user-1")).weekly_counts == {}
+    await journal.clear()
+    assert (await journal.stats("user-1")).total_entries == 0
+
+
+async def test_journal_search_ranks_matches_and_filters_by_tag(repositories) -> None:
+    journal, _ = repositories
+    walk = _entry(0).model_copy(
+        update={"title": "Evening walk", "content": "A long walk by the river.", "tags": ["outside"]}
+    )
+    work = _entry(1).model_copy(update={"content": "Work felt heavy, then a short walk."})
+    other = _entry(2).model_copy(update={"content": "Nothing much happened."})
+    await journal.add_many("user-1", [walk, work, other])
+    await journal.add("user-2", _entry(3).model_copy(update={"content": "walk walk walk"}))
+
+    hits = await journal.search("user-1", SearchQuery(text="Walk river"))
+    assert [hit.entry.id for hit in hits] == ["entry-0", "entry-1"]
+    assert hits[0].score > hits[1].score
+
+    tagged = await journal.search("user-1", SearchQuery(text="walk", tags=("daily", "tag-1")))
+    assert [hit.entry.id for hit in tagged] == ["entry-1"]
+
+    second = await journal.search("user-1", SearchQuery(text="walk", limit=1, offset=1))
+    assert len(second) == 1
+    assert await journal.search("user-1", SearchQuery(text="!!")) == []
+    assert await journal.search("missing", SearchQuery(text="walk")) == []
+
+
+async def test_journal_search_ranks_against_the_users_own_entries(repositories) -> None:
+    journal, _ = repositories
+    river = _entry(0).model_copy(update={"content": "A walk by the river."})
+    await journal.add_many("user-1", [river, _entry(1), _entry(2)])
+    before = await journal.search("user-1", SearchQuery(text="river walk"))
+
+    # Other users writing about rivers leave this user's ranking untouched.
+    crowd = [_entry(index).model_copy(update={"content": "river"}) for index in range(10, 30)]
+    await journal.add_many("user-10", crowd)
+    after = await journal.search("user-1", SearchQuery(text="river walk"))
+
+    assert [(hit.entry.id, hit.score) for hit in after] == [
+        (hit.entry.id, hit.score) for hit in before
+    ]
+    assert [hit.entry.id for hit in after] == ["entry-0"]
+    # A user whose id differs only in punctuation shares no matches.
+    assert await journal.search("user1", SearchQuery(text="river")) == []
+
+
+async def test_journal_search_pages_follow_the_full_ranking(repositories) -> None:
+    journal, _ = repositories
+    words = ["rain", "rain walk", "walk", "rain rain", "walk by the rain", "sun"]
+    await journal.add_many(
+        "user-1",
+        [
+            _entry(index).model_copy(update={"content": words[index % len(words)]})
+            for index in range(30)
+        ],
+    )
+    ranked = await journal.search("user-1", SearchQuery(text="rain walk", limit=100))
+    assert len(ranked) == 25
+    assert [hit.score for hit in ranked] == sorted((hit.score for hit in ranked), reverse=True)
+
+    pages = [
+        await journal.search("user-1", SearchQuery(text="rain walk", limit=7, offset=offset))
+        for offset in range(0, 28, 7)
+    ]
+    assert [hit.entry.id for page in pages for hit in page] == [hit.entry.id for hit in ranked]
+
+
+async def test_mood_logs_round_trip_in_recorded_order(repositories) -> None:
+    _, mood = repositories
+    await mood.add_many("user-1", [_log(0), _log(1)])
+    await mood.add("user-1", _log(2))
+
+    assert await mood.list("user-1") == [_log(0), _log(1), _log(2)]
+    assert await mood.list("user-2") == []
+
+
+async def test_journal_pages_follow_keyset_cursor_and_time_range(repositories) -> None:
+    journal, _ = repositories
+    # Insert out of order to exercise the sorted index.
+    await journal.add_many("user-1", [_entry(index) for index in (3, 0, 4, 1, 2)])
+
+    first = await journal.page("user-1", PageQuery(limit=2))
+    assert [entry.id for entry in first] == ["entry-0", "entry-1"]
+
+    after = (first[-1].created_at, first[-1].id)
+    second = await journal.page("user-1", PageQuery(limit=2, after=after))
+    assert [entry.id for entry in second] == ["entry-2", "entry-3"]
+
+    newest = await journal.page("user-1", PageQuery(limit=2, descending=True))
+    assert [entry.id for entry in newest] == ["entry-4", "entry-3"]
+    older = await journal.page(
+        "user-1", PageQuery(limit=5, descending=True, after=(newest[-1].created_at, newest[-1].id))
+    )
+    assert [entry.id for entry in older] == ["entry-2", "entry-1", "entry-0"]
+
+    ranged = await journal.page(
+        "user-1",
+        PageQuery(since=_entry(1).created_at, until=_entry(3).created_at),
+        include_content=False,
+    )
+    assert [entry.id for entry in ranged] == ["entry-1", "entry-2"]
+    assert not hasattr(ranged[0], "content")
+
+
+async def test_mood_pages_can_omit_notes(repositories) -> None:
+    _, mood = repositories
+    noted = _log(0).model_copy(update={"notes": "long reflection"})
+    await mood.add_many("user-1", [noted, _log(1)])
+
+    logs = await mood.page("user-1", PageQuery(limit=1), include_notes=False)
+    assert [log.id for log in logs] == ["log-0"]
+    assert logs[0].notes is None
+
+
+
+async def test_mood_buckets_roll_up_day_week_and_month(repositories) -> None:
+    _, mood = repositories
+    logs = [
+        _log(0),
+        _log(1).model_copy(update={"mood": "calm"}),
+        _log(24).model_copy(update={"mood": "joyful"}),
+        _log(720),
+    ]
+    # Out of order, split across a bulk write and a single add.
+    await mood.add_many("user-1", [logs[3], logs[1]])
+    await mood.add_many("user-1", [logs[0]])
+    await mood.add("user-1", logs[2])
+
+    days = await mood.buckets("user-1", "day")
+    assert [(bucket.start, bucket.count, bucket.total) for bucket in days] == [
+        (date(2025, 1, 6), 2, 3),
+        (date(2025, 1, 7), 1, 5),
+        (date(2025, 2, 5), 1, 1),
+    ]
+    assert days[0].dominant_mood == "calm"
+    assert days[0].average_intensity == 1.5
+
+    weeks = await mood.buckets("user-1", "week")
+    assert [(bucket.start, bucket.count) for bucket in weeks] == [
+        (date(2025, 1, 6), 3),
+        (date(2025, 2, 3), 1),
+    ]
+    assert weeks[0].dominant_mood == "joyful"
+
+    months = await mood.buckets("user-1", "month", since=date(2025, 2, 1))
+    assert [(bucket.start, bucket.count) for bucket in months] == [(date(2025, 2, 1), 1)]
+    assert await mood.buckets("user-2", "day") == []
+
+    await mood.clear()
+    assert await mood.buckets("user-1", "day") == []
+
+
+async def test_utc_mood_buckets_cost_the_same_however_many_logs(
+    repositories, monkeypatch
+) -> None:
+    _, mood = repositories
+    calls: list[str] = []
+    original_init, original_merge = MoodBucket.__init__, MoodBucket.merge
+
+    def counting_init(self, *args, **kwargs) -> None:
+        calls.append("init")
+        original_init(self, *args, **kwargs)
+
+    def counting_merge(self, other) -> None:
+        calls.append("merge")
+        original_merge(self, other)
+
+    async def work() -> list[tuple[int, int]]:
+        counts = []
+        monkeypatch.setattr(MoodBucket, "__init__", counting_init)
+        monkeypatch.setattr(MoodBucket, "merge", counting_merge)
+        for granularity in ("day", "week", "month"):
+            calls.clear()
+            buckets = await mood.buckets("user-1", granularity)
+            counts.append((len(calls), len(buckets)))
+        monkeypatch.undo()
+        return counts
+
+    await mood.add("user-1", _log_at("first", BASE_TIME))
+    before = await work()
+
+    # Hundreds more logs on the same day, spread over dozens of 15-minute slots.
+    await mood.add_many(
+        "user-1",
+        [
+            _log_at(f"more-{index}", BASE_TIME + timedelta(minutes=index))
+            for index in range(0, 840, 15)
+        ],
+    )
+    await mood.add_many(
+        "user-1",
+        [_log_at(f"again-{index}", BASE_TIME + timedelta(seconds=index)) for index in range(300)],
+    )
+    assert await work() == before
+
+
+async def test_mood_buckets_follow_the_requested_timezone(repositories) -> None:
+    _, mood = repositories
+    # 02:00 UTC on 7 January is still the evening of 6 January in New York.
+    await mood.add("user-1", _log_at("late", datetime(2025, 1, 7, 2, tzinfo=timezone.utc)))
+
+    utc_days = await mood.buckets("user-1", "day")
+    assert [bucket.start for bucket in utc_days] == [date(2025, 1, 7)]
+
+    local_days = await mood.buckets("user-1", "day", zone="America/New_York")
+    assert [bucket.start for bucket in local_days] == [date(2025, 1, 6)]
+
+    await mood.add("user-1", _log_at("next", datetime(2025, 1, 7, 15, tzinfo=timezone.utc)))
+    utc_days = await mood.buckets("user-1", "day")
+    assert [(bucket.start, bucket.count) for bucket in utc_days] == [(date(2025, 1, 7), 2)]
+
+    # Every zone is summed from the same UTC days and slots, however many are asked for.
+    for zone in ("Asia/Kolkata", "Europe/Berlin", "Australia/Sydney", "Pacific/Kiritimati"):
+        await mood.buckets("user-1", "day", zone=zone)
+    local_days = await mood.buckets("user-1", "day", zone="America/New_York")
+    assert [(bucket.start, bucket.count) for bucket in local_days] == [
+        (date(2025, 1, 6), 1),
+        (date(2025, 1, 7), 1),
+    ]
+    local_days = await mood.buckets(
+        "user-1", "day", zone="America/New_York", since=date(2025, 1, 7)
+    )
+    assert [(bucket.start, bucket.count) for bucket in local_days] == [(date(2025, 1, 7), 1)]
+
+
+async def test_mood_slots_split_days_at_quarter_hour_offsets(repositories) -> None:
+    _, mood = repositories
+    # Kathmandu is UTC+5:45: 18:14 UTC is 23:59 local, 18:16 UTC is 00:01 the next day.
+    await mood.add("user-1", _log_at("before", datetime(2025, 1, 6, 18, 14, tzinfo=timezone.utc)))
+    await mood.add("user-1", _log_at("after", datetime(2025, 1, 6, 18, 16, tzinfo=timezone.utc)))
+
+    local_days = await mood.buckets("user-1", "day", zone="Asia/Kathmandu")
+    assert [(bucket.start, bucket.count) for bucket in local_days] == [
+        (date(2025, 1, 6), 1),
+        (date(2025, 1, 7), 1),
+    ]
+    local_months = await mood.buckets("user-1", "month", zone="Asia/Kathmandu")
+    assert [(bucket.start, bucket.count, bucket.total) for bucket in local_months] == [
+        (date(2025, 1, 1), 2, 6)
+    ]
+
+
+async def test_mood_buckets_follow_daylight_saving_changes(repositories) -> None:
+    _, mood = repositories
+    # London springs forward on 30 March 2025, so that local day ends at 23:00 UTC.
+    for log_id, hour in (("before", 22), ("after", 23)):
+        recorded_at = datetime(2025, 3, 30, hour, 30, tzinfo=timezone.utc)
+        await mood.add("user-1", _log_at(log_id, recorded_at))
+    await mood.add("user-1", _log_at("winter", datetime(2025, 3, 29, 12, tzinfo=timezone.utc)))
+
+    local_days = await mood.buckets("user-1", "day", zone="Europe/London")
+    assert [(bucket.start, bucket.count) for bucket in local_days] == [
+        (date(2025, 3, 29), 1),
+        (date(2025, 3, 30), 1),
+        (date(2025, 3, 31), 1),
+    ]
+    local_weeks = await mood.buckets("user-1", "week", zone="Europe/London")
+    assert [(bucket.start, bucket.count) for bucket in local_weeks] == [
+        (date(2025, 3, 24), 2),
+        (date(2025, 3, 31), 1),
+    ]
+
+
+async def test_zone_buckets_read_slots_only_at_bucket_edges(repositories, monkeypatch) -> None:
+    _, mood = repositories
+    # Every 15 minutes from 10 to 20 January: whole UTC days inside one local month.
+    first = datetime(2025, 1, 10, tzinfo=timezone.utc)
+    await mood.add_many(
+        "user-1",
+        [
+            _log_at(f"mid-{index}", first + timedelta(minutes=15 * index))
+            for index in range(96 * 10)
+        ],
+    )
+    slots_read: list[object] = []
+    original_merge = MoodBucket.merge
+
+    def counting_merge(self, other) -> None:
+        if isinstance(other, MoodSlot):
+            slots_read.append(other)
+        original_merge(self, other)
+
+    monkeypatch.setattr(MoodBucket, "merge", counting_merge)
+    months = await mood.buckets("user-1", "month", zone="America/New_York")
+    assert [(bucket.start, bucket.count) for bucket in months] == [(date(2025, 1, 1), 960)]
+    assert slots_read == []
+
+    # 03:00 UTC on 1 February is still January in New York: only that day's slots are read.
+    await mood.add("user-1", _log_at("edge", datetime(2025, 2, 1, 3, tzinfo=timezone.utc)))
+    months = await mood.buckets("user-1", "month", zone="America/New_York")
+    assert [(bucket.start, bucket.count) for bucket in months] == [(date(2025, 1, 1), 961)]
+    assert len(slots_read) == 1
+
+
+async def test_add_new_skips_stored_and_repeated_ids(repositories) -> None:
+    journal, mood = repositories
+    await journal.add("user-1", _entry(0))
+
+    stored = await journal.add_new("user-1", [_entry(0), _entry(1), _entry(2), _entry(1)])
+
+    assert stored == [False, True, True, False]
+    assert [entry.id for entry in await journal.list("user-1")] == ["entry-0", "entry-1", "entry-2"]
+    stats = await journal.stats("user-1")
+    assert stats.total_entries == 3
+    assert stats.tag_counts["daily"] == 3
+    assert len(await journal.search("user-1", SearchQuery(text="thoughts"))) == 3
+    assert await journal.add_new("user-1", []) == []
+
+    assert await mood.add_new("user-1", [_log(0), _log(0), _log(1)]) == [True, False, True]
+    assert await mood.add_new("user-1", [_log(1), _log(2)]) == [False, True]
+    assert len(await mood.list("user-1")) == 3
+    buckets = await mood.buckets("user-1", "month")
+    assert sum(bucket.count for bucket in buckets) == 3
+
+
+async def test_changes_replay_writes_after_a_version(repositories) -> None:
+    journal, mood = repositories
+    first = await journal.changes("user-1", 0, 10)
+    assert (first.version, first.full, first.records) == (0, True, [])
+
+    await journal.add_many("user-1", [_entry(0), _entry(1)])
+    await journal.add_new("user-1", [_entry(1), _entry(2)])
+    await journal.add("user-2", _entry(3))
+
+    full = await journal.changes("user-1", 0, 10)
+    assert full.full and full.version == 3
+    assert [entry.id for entry in full.records] == ["entry-0", "entry-1", "entry-2"]
+
+    delta = await journal.changes("user-1", 1, 1)
+    assert (delta.version, delta.full, delta.has_more, delta.deleted) == (2, False, True, [])
+    assert [entry.id for entry in delta.records] == ["entry-1"]
+    rest = await journal.changes("user-1", delta.version, 10)
+    assert [entry.id for entry in rest.records] == ["entry-2"]
+    assert rest.records[0] == _entry(2)
+    assert (rest.version, rest.has_more) == (3, False)
+
+    caught_up = await journal.changes("user-1", 3, 10)
+    assert (caught_up.version, caught_up.full, caught_up.records) == (3, False, [])
+    # A version the store never issued (e.g. after a server reset) forces a full resync.
+    assert (await journal.changes("user-1", 7, 10)).full
+
+    await mood.add_new("user-1", [_log(0), _log(1)])
+    await mood.add("user-1", _log(2))
+    logs = await mood.changes("user-1", 2, 10)
+    assert [log.id for log in logs.records] == ["log-2"]
+    assert logs.version == 3
+    assert (await journal.changes("user-1", 3, 10)).records == []
+
+
+async def test_full_changes_page_through_a_snapshot(repositories) -> None:
+    journal, mood = repositories
+    await journal.add_many("user-1", [_entry(0), _entry(1), _entry(2)])
+
+    first = await journal.changes("user-1", 0, 2)
+    assert (first.version, first.full, first.has_more) == (3, True, True)
+    assert [entry.id for entry in first.records] == ["entry-0", "entry-1"]
+    assert first.cursor is not None
+
+    # Written mid-snapshot: listed by the next page and replayed after the snapshot.
+    await journal.add("user-1", _entry(3))
+    rest = await journal.changes("user-1", first.version, 2, after=decode_cursor(first.cursor))
+    assert (rest.version, rest.full, rest.has_more, rest.cursor) == (3, False, False, None)
+    assert [entry.id for entry in rest.records] == ["entry-2", "entry-3"]
+    delta = await journal.changes("user-1", rest.version, 2)
+    assert [entry.id for entry in delta.records] == ["entry-3"]
+
+    # A cursor from a version the store never issued starts the snapshot over.
+    restarted = await journal.changes("user-1", 9, 2, after=decode_cursor(first.cursor))
+    assert restarted.full
+    assert [entry.id for entry in restarted.records] == ["entry-0", "entry-1"]
+
+    await mood.add_many("user-1", [_log(0), _log(1)])
+    logs = await mood.changes("user-1", 0, 1)
+    assert (logs.full, logs.has_more, [log.id for log in logs.records]) == (True, True, ["log-0"])
+    assert logs.cursor is not None
+    more = await mood.changes("user-1", logs.version, 1, after=decode_cursor(logs.cursor))
+    assert (more.full, more.has_more, [log.id for log in more.records]) == (False, False, ["log-1"])
+
+
+def test_split_changes_keeps_the_latest_change_per_record() -> None:
+    changes = [("a", False), ("b", False), ("a", True), ("c", True), ("c", False)]
+    assert split_changes(changes) == (["b", "c"], ["a"])
@@ -0,0 +1,158 @@
+"""Tests for LLM call deadlines, circuit breaking and hedging."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+
+from app.schemas.chat import ChatMessage, ChatRequest
+from app.services.conversation import ConversationService
+from app.services.llm import FakeProvider, LLMResult
+from app.services.resilience import CircuitBreaker, CircuitOpenError, GuardedProvider
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _ScriptedProvider(FakeProvider):
+    """Sleeps for the next scripted delay on each call; ``None`` raises instead."""
+
+    def __init__(self, delays: list[float | None]) -> None:
+        super().__init__()
+        self._delays = delays
+        self.calls = 0
+        self.cancelled = 0
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        delay = self._delays[min(self.calls, len(self._delays) - 1)]
+        self.calls += 1
+        if delay is None:
+            raise RuntimeError("provider down")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return LLMResult(text=f"reply {self.calls}", finish_reason="STOP")
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        for delay in self._delays:
+            await asyncio.sleep(delay or 0)
+            yield "chunk "
+
+
+def _guard(inner, *, clock=None, hedge_quantile=None, timeout=1.0) -> GuardedProvider:
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=clock or _Clock())
+    return GuardedProvider(
+        inner,
+        breaker=breaker,
+        max_timeout=timeout,
+        min_timeout=0.05,
+        latency_factor=3,
+        hedge_quantile=hedge_quantile,
+    )
+
+
+def test_breaker_opens_probes_and_closes() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 31
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 62
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 2
+
+
+async def test_slow_calls_time_out_then_fail_fast() -> None:
+    provider = _guard(_ScriptedProvider([5.0]), timeout=0.02)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            await provider.generate("prompt")
+    with pytest.raises(CircuitOpenError):
+        await provider.generate("prompt")
+
+    stats = provider.stats()
+    assert stats["timeouts"] == 2
+    assert stats["breaker"]["state"] == "open"
+    assert stats["breaker"]["rejected"] == 1
+
+
+async def test_deadline_adapts_to_recent_latency() -> None:
+    provider = _guard(_ScriptedProvider([0.0]), timeout=10)
+    assert provider.deadline() == 10
+    for _ in range(20):
+        provider.latency.add(0.1)
+    assert provider.deadline() == pytest.approx(0.3)
+
+
+async def test_cancelled_probe_frees_the_probe_slot() -> None:
+    clock = _Clock()
+    provider = _guard(_ScriptedProvider([None, None, 5.0]), clock=clock)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await provider.generate("prompt")
+
+    clock.now = 31
+    probe = asyncio.create_task(provider.generate("prompt"))
+    await asyncio.sleep(0)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert provider.breaker.allow()
+
+
+async def test_slow_call_is_hedged_and_the_faster_reply_wins() -> None:
+    inner = _ScriptedProvider([1.0, 0.0])
+    provider = _guard(inner, hedge_quantile=0.95, timeout=5)
+    for _ in range(20):
+        provider.latency.add(0.01)
+
+    result = await provider.generate("prompt")
+
+    assert result.text == "reply 2"
+    assert (provider.hedges, provider.hedge_wins) == (1, 1)
+    await asyncio.sleep(0)
+    assert inner.cancelled == 1
+
+
+async def test_stalled_stream_times_out() -> None:
+    provider = _guard(_ScriptedProvider([0.0, 5.0]), timeout=0.02)
+    chunks = []
+    with pytest.raises(TimeoutError):
+        async for chunk in provider.stream("prompt"):
+            chunks.append(chunk)
+    assert chunks == ["chunk "]
+    assert provider.timeouts == 1
+
+
+async def test_conversation_falls_back_while_the_circuit_is_open() -> None:
+    provider = _guard(_ScriptedProvider([None]))
+    service = ConversationService(provider)
+    request = ChatRequest(messages=[ChatMessage(role="user", content="I feel anxious")])
+
+    for _ in range(3):
+        response = await service.generate_reply(request)
+        assert "Anxiety" in response.reply.content
+
+    assert service.metrics()["llm"]["breaker"]["state"] == "open"
+    assert provider.breaker.rejected == 1
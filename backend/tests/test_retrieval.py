@@ -0,0 +1,146 @@
+"""Tests for semantic memory retrieval and its use in chat prompts."""
+
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from app.schemas.chat import ChatMessage, ChatRequest
+from app.services.conversation import ConversationService
+from app.services.embeddings import HashingEmbedder
+from app.services.llm import FakeProvider
+from app.services.retrieval import LocalMemoryStore
+from app.services.vector_index import VectorIndex, fit_partition
+
+
+def _unit_vectors(count: int, dimensions: int, *, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(16, dimensions))
+    vectors = centres[rng.integers(0, 16, count)] + 0.3 * rng.normal(size=(count, dimensions))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_hashing_embedder_scores_related_texts_higher() -> None:
+    embedder = HashingEmbedder(dimensions=128)
+    query, related, unrelated = embedder.embed_sync(
+        ["my sister visited", "dinner when my sister visited", "deadline at work"]
+    )
+
+    assert np.isclose(np.linalg.norm(query), 1.0)
+    assert query @ related > query @ unrelated
+
+
+def test_partitioned_index_matches_exact_search_on_clustered_data() -> None:
+    vectors = _unit_vectors(3000, 32)
+    exact = VectorIndex(32, ivf_threshold=10**9)
+    partitioned = VectorIndex(32, ivf_threshold=1000, probes=8)
+    for start in range(0, len(vectors), 250):
+        exact.add(vectors[start:start + 250])
+        partitioned.add(vectors[start:start + 250])
+        if partitioned.training_due:
+            partitioned.train()
+
+    assert partitioned.partitioned and not exact.partitioned
+    overlap = 0
+    for query in vectors[:50]:
+        expected = {row for row, _ in exact.search(query, 10)}
+        overlap += len(expected & {row for row, _ in partitioned.search(query, 10)})
+    assert overlap / 500 > 0.9
+
+
+def test_rows_added_while_a_partition_is_fitted_stay_searchable() -> None:
+    vectors = _unit_vectors(1200, 32)
+    index = VectorIndex(32, ivf_threshold=1000, probes=4)
+    index.add(vectors[:1000])
+    assert index.training_due and not index.partitioned
+
+    partition = fit_partition(index.rows())
+    index.add(vectors[1000:])
+    index.install(partition)
+
+    assert index.partitioned and not index.training_due
+    assert index.search(vectors[1100], 1)[0][0] == 1100
+    assert index.search(vectors[10], 1)[0][0] == 10
+
+
+def test_saved_index_is_memory_mapped_and_copied_on_write(tmp_path) -> None:
+    vectors = _unit_vectors(100, 16)
+    index = VectorIndex(16)
+    index.add(vectors)
+    index.save(tmp_path / "index.npy")
+
+    loaded = VectorIndex.load(tmp_path / "index.npy")
+    assert loaded.search(vectors[7], 1)[0][0] == 7
+
+    loaded.add(vectors[:1])
+    assert len(loaded) == 101
+    assert loaded.search(vectors[0], 2)[1][0] == 100
+
+
+async def test_local_store_skips_duplicates_and_persists(tmp_path) -> None:
+    store = LocalMemoryStore(HashingEmbedder(), directory=str(tmp_path))
+    await store.remember(
+        "user-1", ["Walked with my sister by the lake", "Work deadline"], kind="journal"
+    )
+    await store.remember("user-1", ["Walked with my sister by the lake"], kind="chat")
+    assert store.stats()["memories"] == 2
+
+    await store.aclose()
+    reopened = LocalMemoryStore(HashingEmbedder(), directory=str(tmp_path))
+    memories = await reopened.recall("user-1", "my sister", top_k=1)
+    assert [(memory.kind, memory.text) for memory in memories] == [
+        ("journal", "Walked with my sister by the lake")
+    ]
+    assert await reopened.recall("user-2", "my sister", top_k=1) == []
+
+
+async def test_local_store_saves_evicted_users_and_reloads_them(tmp_path) -> None:
+    store = LocalMemoryStore(HashingEmbedder(), directory=str(tmp_path), max_users=1)
+    await store.remember("user-1", ["Walked with my sister by the lake"], kind="journal")
+    await store.remember("user-2", ["Work deadline"], kind="journal")
+    assert store.stats()["users"] == 1 and store.stats()["evictions"] == 1
+
+    memories = await store.recall("user-1", "my sister", top_k=1)
+    assert [memory.text for memory in memories] == ["Walked with my sister by the lake"]
+    assert store.stats()["evictions"] == 2
+    memories = await store.recall("user-2", "deadline", top_k=1)
+    assert [memory.text for memory in memories] == ["Work deadline"]
+    await store.aclose()
+
+
+async def test_local_store_saves_changes_periodically(tmp_path) -> None:
+    store = LocalMemoryStore(HashingEmbedder(), directory=str(tmp_path), flush_seconds=0.01)
+    await store.remember("user-1", ["Walked with my sister by the lake"], kind="journal")
+    for _ in range(100):
+        if list(tmp_path.glob("*.json")):
+            break
+        await asyncio.sleep(0.01)
+
+    # Readable by another process before this store is ever closed.
+    reopened = LocalMemoryStore(HashingEmbedder(), directory=str(tmp_path))
+    assert len(await reopened.recall("user-1", "my sister", top_k=1)) == 1
+    await store.aclose()
+    await reopened.aclose()
+
+
+async def test_conversation_injects_recalled_memories_into_prompt() -> None:
+    prompts: list[str] = []
+
+    class RecordingProvider(FakeProvider):
+        async def _generate(self, prompt: str):  # type: ignore[override]
+            prompts.append(prompt)
+            return await super()._generate(prompt)
+
+    memory = LocalMemoryStore(HashingEmbedder())
+    await memory.remember("user-1", ["My sister Ana always calms me down"], kind="journal")
+    service = ConversationService(provider=RecordingProvider(), memory=memory)
+
+    request = ChatRequest(
+        user_id="user-1",
+        messages=[ChatMessage(role="user", content="I wish my sister was here tonight")],
+    )
+    await service.generate_reply(request)
+
+    assert "My sister Ana always calms me down" in prompts[-1]
+    assert service.metrics()["memory"]["memories"] == 2
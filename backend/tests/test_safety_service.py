@@ -0,0 +1,124 @@
+"""Unit tests for crisis phrase matching."""
+
+from __future__ import annotations
+
+import json
+
+from app.services.hotlines import HotlineDirectory
+from app.services.matcher import PhraseMatcher
+from app.services.safety import SafetyService
+from app.services.screening import SafetyScreener
+
+
+def test_matcher_finds_overlapping_phrases_in_one_pass() -> None:
+    matcher = PhraseMatcher({"he": "a", "she": "b", "hers": "c", "his": "d"})
+
+    matches = sorted(matcher.iter_matches("ushers his"))
+    assert [category for _, _, category in matches] == ["d"]
+
+    matcher = PhraseMatcher({"end it": "a", "end it all": "b", "it all": "c"})
+    assert matcher.find_categories("I want to end it all.") == {"a", "b", "c"}
+
+
+def test_matcher_respects_word_boundaries() -> None:
+    matcher = PhraseMatcher({"overdose": "substance-risk", "can't go on": "self-harm"})
+
+    assert matcher.find_categories("Thinking about an OVERDOSE.") == {"substance-risk"}
+    assert matcher.find_categories("I can’t go on like this") == {"self-harm"}
+    assert matcher.find_categories("no antioverdose kit, I can go on") == set()
+
+
+def test_matcher_matches_inflected_last_words() -> None:
+    matcher = PhraseMatcher({"overdose": "a", "end it all": "b", "it all": "c"})
+
+    assert matcher.find_categories("I overdosed last night") == {"a"}
+    assert matcher.find_categories("Overdosing, overdoses") == {"a"}
+    assert matcher.find_categories("I'll end its all") == set()
+
+
+def test_matcher_last_word_does_not_match_longer_words() -> None:
+    matcher = PhraseMatcher({"die": "a", "end it": "b", "can't go on": "c"})
+
+    assert matcher.find_categories("I could die. He died.") == {"a"}
+    assert matcher.find_categories("my diet and my dietitian") == set()
+    assert matcher.find_categories("I can't go online today") == set()
+    assert matcher.find_categories("the end item") == set()
+
+
+def test_inflected_crisis_terms_are_flagged() -> None:
+    service = SafetyService(cache_size=0)
+
+    for text in ("I overdosed last night", "I keep reading about suicides", "Overdoses scare me"):
+        result = service.evaluate_text(text)
+        assert result.crisis_detected is True, text
+
+
+def test_words_that_merely_start_with_a_crisis_term_are_not_flagged() -> None:
+    service = SafetyService(cache_size=0)
+
+    for text in (
+        "I can't go online today",
+        "I will end it allergy season",
+        "Posting a hurt myselfie",
+        "Trying a new diet with my dietitian",
+    ):
+        assert service.evaluate_text(text).crisis_detected is False, text
+
+
+def test_evaluate_messages_combines_categories_across_messages() -> None:
+    service = SafetyService()
+
+    result = service.evaluate_messages(["I might overdose", "I want to hurt myself"])
+
+    assert result.crisis_detected is True
+    assert result.matched_category == "self-harm, substance-risk"
+    assert service.evaluate_messages(["hello", "how are you"]).crisis_detected is False
+
+
+async def test_screener_keeps_input_order_across_worker_processes() -> None:
+    texts = [f"entry {index}" if index % 7 else "thinking about suicide" for index in range(40)]
+    screener = SafetyScreener(SafetyService(), workers=2, parallel_threshold=10, chunk_size=4)
+    try:
+        matches = [categories async for chunk in screener.screen(texts) for categories in chunk]
+    finally:
+        screener.close()
+
+    assert len(matches) == len(texts)
+    assert [bool(categories) for categories in matches] == [index % 7 == 0 for index in range(40)]
+
+
+def test_hotlines_fall_back_from_region_to_language_to_default(tmp_path) -> None:
+    path = tmp_path / "hotlines.json"
+    path.write_text(
+        json.dumps(
+            {
+                "default_locale": "en-US",
+                "hotlines": {"en-US": "988", "es": "Línea de la Vida", "es-ES": "024"},
+            }
+        ),
+        "utf-8",
+    )
+    directory = HotlineDirectory.from_file(path)
+    service = SafetyService(hotlines=directory)
+
+    assert directory.resolve("es-ES") == "024"
+    assert directory.resolve("es_MX") == "Línea de la Vida"
+    assert directory.resolve("fr-FR") == "988"
+    assert service.evaluate_text("I feel fine", locale="es-AR").hotline == "Línea de la Vida"
+
+
+def test_repeated_texts_are_matched_once() -> None:
+    service = SafetyService(cache_size=2)
+
+    first = service.evaluate_text("I want to END it all")
+    second = service.evaluate_text("  i want to end   it all ")
+    service.match_categories("something else")
+    service.match_categories("and another")
+    third = service.evaluate_text("I want to end it all")
+
+    assert first.matched_category == second.matched_category == third.matched_category
+    assert second.recommended_actions == first.recommended_actions
+    assert second.evaluated_at >= first.evaluated_at
+    assert service.stats()["cache_hits"] == 1
+    assert service.stats()["cache_misses"] == 4
+    assert service.evaluate_text("Lovely day").recommended_actions == []
@@ -0,0 +1,72 @@
+"""Unit tests for incremental per-session analysis."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.services.emotion import emotion_service
+from app.services import session_state
+from app.services.session_state import SessionAnalysisStore
+
+
+def test_only_new_messages_are_processed_when_prefix_matches() -> None:
+    store = SessionAnalysisStore(max_sessions=10)
+
+    store.analyse("user-1", ["I feel worried"])
+    state = store.analyse("user-1", ["I feel worried", "still worried and sad"])
+
+    assert store.stats() == {"sessions": 1, "incremental_updates": 1, "full_scans": 1}
+    np.testing.assert_allclose(
+        state.emotion_scores,
+        emotion_service.score_batch(["I feel worried", "still worried and sad"]).sum(axis=0),
+    )
+    assert state.seen.count == 2
+
+
+def test_rewritten_history_falls_back_to_full_scan() -> None:
+    store = SessionAnalysisStore(max_sessions=10)
+
+    store.analyse("user-1", ["sorry", "I might overdose"])
+    state = store.analyse("user-1", ["sorry", "hello", "better now"])
+
+    assert store.full_scans == 2
+    assert state.categories == set()
+    np.testing.assert_allclose(
+        state.emotion_scores,
+        emotion_service.score_batch(["sorry", "hello", "better now"]).sum(axis=0),
+    )
+
+    store.analyse("user-1", ["sorry"])
+    assert store.full_scans == 3
+
+
+def test_prefix_check_hashes_only_the_last_processed_message(monkeypatch) -> None:
+    store = SessionAnalysisStore(max_sessions=10)
+    history = [f"message {index}" for index in range(200)]
+    store.analyse("user-1", history)
+
+    hashed: list[str] = []
+    original = session_state.chain_digest
+
+    def counting(previous: str, text: str) -> str:
+        hashed.append(text)
+        return original(previous, text)
+
+    monkeypatch.setattr(session_state, "chain_digest", counting)
+    store.analyse("user-1", [*history, "one more"])
+
+    assert hashed == ["message 199", "one more"]
+    assert store.incremental_updates == 1
+
+
+def test_crisis_categories_persist_across_turns_and_sessions_are_bounded() -> None:
+    store = SessionAnalysisStore(max_sessions=1)
+
+    store.analyse("user-1", ["I want to end it all"])
+    state = store.analyse("user-1", ["I want to end it all", "ok"])
+    assert state.categories == {"self-harm"}
+
+    store.analyse("user-2", ["hi"])
+    assert store.stats()["sessions"] == 1
+    store.analyse("user-1", ["I want to end it all", "ok", "hi"])
+    assert store.full_scans == 3
@@ -0,0 +1,57 @@
+"""Unit tests for chat session stores."""
+
+from __future__ import annotations
+
+from app.schemas.chat import ChatMessage
+from app.services.sessions import InMemorySessionStore, SQLiteSessionStore
+
+
+async def test_in_memory_store_evicts_least_recently_used_session() -> None:
+    store = InMemorySessionStore(max_sessions=2, max_messages=10)
+    await store.append("a", [ChatMessage(role="user", content="one")])
+    await store.append("b", [ChatMessage(role="user", content="two")])
+    await store.load("a")
+    await store.append("c", [ChatMessage(role="user", content="three")])
+
+    assert await store.load("b") is None
+    assert [message.content for message in await store.load("a")] == ["one"]
+
+
+async def test_sqlite_store_round_trips_transcripts() -> None:
+    store = SQLiteSessionStore(":memory:", max_messages=10)
+    try:
+        await store.append("s", [ChatMessage(role="user", content="hi")])
+        await store.append(
+            "s",
+            [
+                ChatMessage(role="assistant", content="hello"),
+                ChatMessage(role="user", content="how are you?"),
+            ],
+        )
+
+        transcript = await store.load("s")
+        assert [(message.role, message.content) for message in transcript] == [
+            ("user", "hi"),
+            ("assistant", "hello"),
+            ("user", "how are you?"),
+        ]
+        assert await store.delete("s") is True
+        assert await store.load("s") is None
+    finally:
+        await store.aclose()
+
+
+async def test_stores_cap_transcript_length() -> None:
+    sqlite_store = SQLiteSessionStore(":memory:", max_messages=4)
+    try:
+        for store in (InMemorySessionStore(max_sessions=2, max_messages=4), sqlite_store):
+            for index in range(4):
+                await store.append("s", [ChatMessage(role="user", content=str(index))])
+            assert len(await store.load("s")) == 4
+
+            await store.append("s", [ChatMessage(role="user", content="4")])
+            assert [message.content for message in await store.load("s")] == ["3", "4"]
+            await store.append("s", [ChatMessage(role="assistant", content="5")])
+            assert [message.content for message in await store.load("s")] == ["3", "4", "5"]
+    finally:
+        await sqlite_store.aclose()
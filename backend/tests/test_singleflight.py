@@ -0,0 +1,130 @@
+"""Tests for request coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.repositories.memory import InMemoryMoodRepository
+from app.schemas.chat import ChatMessage, ChatRequest
+from app.schemas.mood import MoodLogCreate
+from app.services.conversation import ConversationService
+from app.services.llm import FakeProvider, LLMResult
+from app.services.mood import MoodService
+from app.services.sessions import InMemorySessionStore
+from app.services.singleflight import SingleFlight
+
+
+class _CountingProvider(FakeProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def _generate(self, prompt: str) -> LLMResult:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return LLMResult(text="Hi", finish_reason="STOP")
+
+
+async def test_concurrent_calls_share_one_computation() -> None:
+    flight = SingleFlight()
+    started = 0
+
+    async def compute() -> int:
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return started
+
+    results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+    assert results == [1] * 5
+    assert await flight.do("key", compute) == 2
+    assert flight.stats() == {"calls": 2, "coalesced": 4, "in_flight": 0}
+
+
+async def test_failures_reach_every_waiter() -> None:
+    flight = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_cancelling_one_waiter_keeps_the_call_for_the_others() -> None:
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute() -> str:
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", compute))
+    second = asyncio.create_task(flight.do("key", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_call_is_cancelled_once_every_waiter_leaves() -> None:
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def compute() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("key", compute))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.stats()["in_flight"] == 0
+
+
+async def test_disabled_flight_runs_every_call() -> None:
+    flight = SingleFlight(enabled=False)
+
+    async def compute() -> int:
+        await asyncio.sleep(0)
+        return 1
+
+    await asyncio.gather(*(flight.do("key", compute) for _ in range(3)))
+    assert flight.stats()["calls"] == 0
+
+
+async def test_duplicate_chat_requests_share_one_turn() -> None:
+    provider = _CountingProvider()
+    sessions = InMemorySessionStore(max_sessions=10, max_messages=100)
+    service = ConversationService(provider, sessions=sessions, single_flight=SingleFlight())
+    request = ChatRequest(session_id="s-1", messages=[ChatMessage(role="user", content="hello")])
+
+    first, second = await asyncio.gather(
+        service.generate_reply(request), service.generate_reply(request)
+    )
+
+    assert first.reply.content == second.reply.content == "Hi"
+    assert provider.calls == 1
+    assert len(await sessions.load("s-1")) == 2
+    assert service.single_flight.stats()["coalesced"] == 1
+
+
+async def test_concurrent_trends_share_one_read() -> None:
+    service = MoodService(InMemoryMoodRepository(), single_flight=SingleFlight())
+    await service.log_mood("user-1", MoodLogCreate(mood="calm", intensity=3))
+
+    week, *others = await asyncio.gather(
+        *(service.trend("user-1", "week") for _ in range(3)), service.trend("user-1", "month")
+    )
+
+    assert all(points == week for points in others[:2])
+    assert service.single_flight.stats()["coalesced"] == 2
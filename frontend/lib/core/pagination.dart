@@ -0,0 +1,26 @@
+import 'package:dio/dio.dart';
+
+/// Header carrying the cursor of the next page of a listing endpoint.
+const nextCursorHeader = 'x-next-cursor';
+
+/// Largest page the listing endpoints serve.
+const maxPageSize = 500;
+
+/// Fetches every record of a cursor-paginated listing, oldest first,
+/// following [nextCursorHeader] until the last page.
+Future<List<dynamic>> fetchAllPages(Dio dio, String path) async {
+  final records = <dynamic>[];
+  String? cursor;
+  do {
+    final response = await dio.get<List<dynamic>>(
+      path,
+      queryParameters: {
+        'limit': maxPageSize,
+        if (cursor != null) 'cursor': cursor,
+      },
+    );
+    records.addAll(response.data ?? const []);
+    cursor = response.headers.value(nextCursorHeader);
+  } while (cursor != null);
+  return records;
+}
@@ -23,23 +23,14 @@ class JournalController extends StateNotifier<JournalState> {
   Future<void> loadEntries() async {
     state = state.copyWith(isLoading: true, clearError: true);
     try {
-      final responses = await Future.wait([
-        _api.listEntries(_userId),
+      final results = await Future.wait<Object?>([
+        _syncEntries(),
         _api.summary(_userId),
       ]);
-      final entries = (responses[0].data as List<dynamic>)
-          .map((item) =>
-              JournalEntryModel.fromJson(item as Map<String, dynamic>))
-          .toList()
-        ..sort((a, b) => b.createdAt.compareTo(a.createdAt));
       final summary = JournalSummaryModel.fromJson(
-        responses[1].data as Map<String, dynamic>,
-      );
-      state = state.copyWith(
-        entries: entries,
-        summary: summary,
-        isLoading: false,
+        (results[1] as Response<dynamic>).data as Map<String, dynamic>,
       );
+      state = state.copyWith(summary: summary, isLoading: false);
     } on DioException catch (error) {
       final detail = error.response?.data is Map<String, dynamic>
           ? (error.response?.data['detail'] as String? ?? '')
@@ -50,6 +41,36 @@ class JournalController extends StateNotifier<JournalState> {
     }
   }
 
+  /// Fetches only the entries written since the last sync and merges them
+  /// into the loaded list. A full sync replaces the list with its first page
+  /// and merges the pages after it.
+  Future<void> _syncEntries() async {
+    var version = state.syncVersion;
+    String? cursor;
+    final byId = {for (final entry in state.entries) entry.id: entry};
+    while (true) {
+      final response =
+          await _api.changes(_userId, sinceVersion: version, cursor: cursor);
+      final changes =
+          JournalChangesModel.fromJson(response.data as Map<String, dynamic>);
+      if (changes.full) {
+        byId.clear();
+      }
+      for (final entry in changes.entries) {
+        byId[entry.id] = entry;
+      }
+      changes.deleted.forEach(byId.remove);
+      version = changes.version;
+      cursor = changes.cursor;
+      if (!changes.hasMore) {
+        break;
+      }
+    }
+    final entries = byId.values.toList()
+      ..sort((a, b) => b.createdAt.compareTo(a.createdAt));
+    state = state.copyWith(entries: entries, syncVersion: version);
+  }
+
   Future<bool> createEntry({
     required String content,
     String? title,
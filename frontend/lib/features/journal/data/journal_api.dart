@@ -1,6 +1,7 @@
 import 'package:dio/dio.dart';
 import 'package:flutter_riverpod/flutter_riverpod.dart';
 
+import '../../../core/pagination.dart';
 import '../../../core/providers.dart';
 
 class JournalApi {
@@ -8,8 +9,26 @@ class JournalApi {
 
   final Dio _dio;
 
-  Future<Response<dynamic>> listEntries(String userId) {
-    return _dio.get('/journal/$userId/entries');
+  /// Every entry, oldest first, fetched a page at a time.
+  Future<List<dynamic>> listEntries(String userId) {
+    return fetchAllPages(_dio, '/journal/$userId/entries');
+  }
+
+  /// Entries written after [sinceVersion]; pass the `version` of the previous
+  /// response, or 0 to fetch every entry. Pass its `cursor` too while paging
+  /// through a full sync.
+  Future<Response<dynamic>> changes(
+    String userId, {
+    int sinceVersion = 0,
+    String? cursor,
+  }) {
+    return _dio.get(
+      '/journal/$userId/changes',
+      queryParameters: {
+        'since_version': sinceVersion,
+        if (cursor != null) 'cursor': cursor,
+      },
+    );
   }
 
   Future<Response<dynamic>> createEntry(
@@ -54,9 +54,44 @@ class JournalSummaryModel {
   }
 }
 
+class JournalChangesModel {
+  const JournalChangesModel({
+    required this.version,
+    this.full = false,
+    this.hasMore = false,
+    this.cursor,
+    this.entries = const [],
+    this.deleted = const [],
+  });
+
+  final int version;
+  final bool full;
+  final bool hasMore;
+  final String? cursor;
+  final List<JournalEntryModel> entries;
+  final List<String> deleted;
+
+  factory JournalChangesModel.fromJson(Map<String, dynamic> json) {
+    return JournalChangesModel(
+      version: (json['version'] as num?)?.toInt() ?? 0,
+      full: json['full'] as bool? ?? false,
+      hasMore: json['has_more'] as bool? ?? false,
+      cursor: json['cursor'] as String?,
+      entries: (json['entries'] as List<dynamic>? ?? [])
+          .map((item) =>
+              JournalEntryModel.fromJson(item as Map<String, dynamic>))
+          .toList(),
+      deleted: (json['deleted'] as List<dynamic>? ?? [])
+          .map((id) => id as String)
+          .toList(),
+    );
+  }
+}
+
 class JournalState {
   const JournalState({
     required this.entries,
+    this.syncVersion = 0,
     this.summary,
     this.isLoading = false,
     this.isSubmitting = false,
@@ -64,6 +99,9 @@ class JournalState {
   });
 
   final List<JournalEntryModel> entries;
+
+  /// Change feed version the entries are synced to; 0 before the first sync.
+  final int syncVersion;
   final JournalSummaryModel? summary;
   final bool isLoading;
   final bool isSubmitting;
@@ -75,6 +113,7 @@ class JournalState {
 
   JournalState copyWith({
     List<JournalEntryModel>? entries,
+    int? syncVersion,
     JournalSummaryModel? summary,
     bool? isLoading,
     bool? isSubmitting,
@@ -83,6 +122,7 @@ class JournalState {
   }) {
     return JournalState(
       entries: entries ?? this.entries,
+      syncVersion: syncVersion ?? this.syncVersion,
       summary: summary ?? this.summary,
       isLoading: isLoading ?? this.isLoading,
       isSubmitting: isSubmitting ?? this.isSubmitting,
@@ -1,6 +1,7 @@
 import 'package:dio/dio.dart';
 import 'package:flutter_riverpod/flutter_riverpod.dart';
 
+import '../../../core/pagination.dart';
 import '../../../core/providers.dart';
 
 class MoodApi {
@@ -8,8 +9,26 @@ class MoodApi {
 
   final Dio _dio;
 
-  Future<Response<dynamic>> listLogs(String userId) {
-    return _dio.get('/mood/$userId/logs');
+  /// Every log, oldest first, fetched a page at a time.
+  Future<List<dynamic>> listLogs(String userId) {
+    return fetchAllPages(_dio, '/mood/$userId/logs');
+  }
+
+  /// Logs written after [sinceVersion]; pass the `version` of the previous
+  /// response, or 0 to fetch every log. Pass its `cursor` too while paging
+  /// through a full sync.
+  Future<Response<dynamic>> changes(
+    String userId, {
+    int sinceVersion = 0,
+    String? cursor,
+  }) {
+    return _dio.get(
+      '/mood/$userId/changes',
+      queryParameters: {
+        'since_version': sinceVersion,
+        if (cursor != null) 'cursor': cursor,
+      },
+    );
   }
 
   Future<Response<dynamic>> createLog(